@@ -2,24 +2,104 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
 import threading
 import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import re
 import json
 import shutil
 import subprocess
+import logging
+import logging.handlers
+import queue
+import collections
+import concurrent.futures
 import numpy as np
-import pandas as pd
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.backends.backend_pdf import PdfPages
+from cloud_upload import CloudUploadWorker, write_queue_file_atomic
+from report_pdf import ReportCancelled, ReportWorker
+import columnar_export
+import synthetic_eis
+import replay
+import tasks
+from tasks import TaskBusy
+import device_io
+from device_io import AsyncInstrumentManager, DeviceIOLoop
+import event_log
+from event_log import EventBus, JsonlSink, trace_categories_from_env
+from metrics import Metrics, format_snapshot, timed
+from outliers import MAX_REMEASURE_POINTS, StreamingOutlierDetector, remeasure_groups
+from overlay import RunOverlay
+from reference_library import ReferenceLibrary
+from resample import GridResampler, sweep_log_magnitude
+from sweep import Sweep, SweepBuffer
+from assets import UNASSIGNED, AssetIndex, normalize_asset_id, summarize_delta
+from duration import DurationEstimator, SweepProgress, format_duration
+from forecast import FAIL_Z_OHM, ForecastBank, describe_forecast
+from journal import SweepJournal, read_journal, recover_journals
+from lazy_imports import LazyModule, optional_module, preload
+
+# Heavy or optional modules are imported on first use so the window appears quickly.
+pd = LazyModule("pandas")
+# Fake instrument for load/soak testing the real streaming path without hardware.
+PALMSENS_MODULE_NAME = "mock_palmsens" if os.environ.get("EIS_MOCK_PALMSENS") else "pypalmsens"
+# Warmed up in a background thread shortly after the window is ready.
+DEFERRED_IMPORTS = ("pandas", PALMSENS_MODULE_NAME, "matplotlib.backends.backend_pdf")
+# Default Bode window (Hz, Ohm); overlaid runs outside it widen the view.
+BODE_FREQ_LIMITS = (1e-2, 1e5)
+BODE_Z_LIMITS = (1e2, 1e10)
+
+_IMPORTS_DONE = time.perf_counter()
+
+
+def palmsens_module():
+    """pypalmsens (or mock_palmsens when EIS_MOCK_PALMSENS is set), imported on first use; None if missing."""
+    return optional_module(PALMSENS_MODULE_NAME)
 
-try:
-    import pypalmsens as ps
-except Exception:
-    ps = None
 
 class EisAnalysisTool:
+    # Output-log filtering: lowercase substrings hidden from the technician view,
+    # and prefix rewrites (None drops the line). Both compile to one regex at import time.
+    LOG_DROP_PATTERNS = (
+        "measurement still running",
+        "frequency jump detected",
+        "quality detail:",
+        "curve-fit residual",
+        "bode trend fit is weak",
+        "curve roughness",
+        "average deviation vs reference",
+        "peak deviation vs reference",
+        "scanning for palmsens instruments",
+        "discovery (",
+        "discovered ",
+        "configured mac",
+        "using configured mac match",
+        "connect attempt ",
+        "hint: ftdi",
+        "diagnosis based on low freq impedance",
+        "data quality check: reference",
+    )
+    LOG_REWRITE_RULES = {
+        "Connected to ": lambda text: "Device connected." if "(Serial:" in text else text,
+        "Measurement finished:": "Measurement complete.",
+        "Running EIS over Bluetooth:": "Running measurement...",
+        "Running calibration stage ": "Running calibration measurement...",
+        "Starting test using ": "Starting simulated test...",
+        "Starting messy-data test using ": "Starting messy-data test...",
+        "Starting calibration sequence using ": "Starting calibration sequence...",
+        "Stop signal sent using manager.": "Stop command sent.",
+        "Stop method ": None,
+        "No supported stop method found": "Unable to stop from software. Disconnect device if needed.",
+        "Disconnect warning:": "Disconnected with warning.",
+    }
+    # Matching lowercase text without re.IGNORECASE keeps the regex on its fast literal path.
+    _LOG_DROP_RE = re.compile("|".join(re.escape(p.lower()) for p in LOG_DROP_PATTERNS))
+    _LOG_REWRITE_RE = re.compile("(" + "|".join(re.escape(p) for p in sorted(LOG_REWRITE_RULES, key=len, reverse=True)) + ")")
+
     def __init__(self, root):
+        self._init_started = time.perf_counter()
         self.root = root
         self.root.title("EIS Analysis Tool")
         self.root.geometry("1080x760")
@@ -87,6 +167,8 @@ class EisAnalysisTool:
         style.configure("TNotebook", background=self.theme["bg"], borderwidth=0, tabmargins=(2, 2, 2, 0))
         style.configure("TNotebook.Tab", font=("Segoe UI Semibold", 10), background=self.theme["tab_bg"], foreground=self.theme["tab_text"], padding=(16, 8))
         style.map("TNotebook.Tab", background=[("selected", self.theme["panel"]), ("active", self.theme["tab_hover"])], foreground=[("selected", self.theme["text"]), ("active", self.theme["text"])])
+        style.configure("Card.TRadiobutton", background=self.theme["panel"], foreground=self.theme["text"], font=("Segoe UI", 10))
+        style.map("Card.TRadiobutton", background=[("active", self.theme["panel"])])
         style.configure("Hint.Card.TLabel", background=self.theme["panel_alt"], foreground=self.theme["muted"], font=("Segoe UI", 9))
         style.configure("Green.Horizontal.TProgressbar", troughcolor=self.theme["entry_bg"], background=self.theme["accent"], bordercolor=self.theme["line"], lightcolor=self.theme["accent"], darkcolor=self.theme["accent"])
 
@@ -154,43 +236,30 @@ class EisAnalysisTool:
         # Shared progress variable for progress bars (defined before any bar uses it)
         self.progress_var = tk.DoubleVar(value=0.0)
 
-        # PyPalmSens runtime state
-        self.ps_manager = None
-        self.ps_instrument = None
-        self.connection_mode = None  # "sensit_bt" or "simulated" or "messy" or "calibration"
-        self.connection_in_progress = False
-        self.cancel_connect_requested = False
-        self.expected_points = 0
-        self.measurement_in_progress = False
-        self.target_mac = "00:16:A4:79:4E:03"
-        self.measurement_start_time = None
-        self.last_point_time = None
-        self.last_point_count = 0
-        self.last_progress_log_time = 0.0
-        self.stop_requested = False
-        self.callback_debug_count = 0
-        self.last_plot_update_time = 0  # Throttle plot updates (milliseconds)
-        self.latest_plot_data = {
-            'frequency': np.array([]),
-            'z_real': np.array([]),
-            'z_imag': np.array([]),
-        }
-        self.last_diagnosis_result = "No diagnosis yet"
-        self.last_quality_result = None
-        self.last_quality_summary = "No quality check yet"
-        self.last_low_freq_impedance = np.nan
-        self.last_low_freq_hz = np.nan
-        self.run_history = []
-        self.max_run_history = 200
-        self.profile_store_path = os.path.join(os.path.dirname(__file__), "test_profiles.json")
-        self.test_profiles = {}
+        # Output log: producers append to a bounded ring buffer, the Tk thread drains it
+        # in batches; the full (unfiltered) stream goes to a rotating file on disk.
+        self._log_lock = threading.Lock()
+        self._log_buffer = collections.deque(maxlen=5000)
+        self._log_dropped = 0
+        self.log_flush_interval_ms = 100
+        self.max_log_lines = 2000
+        self.log_dir = os.path.join(os.path.dirname(__file__), "logs")
+        self._file_logger, self._log_listener = self._create_file_logger()
+
+        # Everything that does not need Tk (also used by the headless benchmarks).
+        self._init_state()
+
+        # Diagnostics are structured events. The Output Log only subscribes to technician-level
+        # "app" events; traced categories (EIS_TRACE=callback,...) only reach events.jsonl.
+        self._event_sink = self._create_event_sink()
+        self.events.subscribe(self._queue_output_log_event, min_level=event_log.NOTICE, categories=("app",))
+        if self._file_logger is not None:
+            self.events.subscribe(self._write_file_log_event, min_level=event_log.INFO)
+        if self._event_sink is not None:
+            self.events.subscribe(self._event_sink, min_level=event_log.INFO, accept_trace=True)
+
         self.current_profile_name = tk.StringVar(value="Recommended")
-        self.test_run_counter = 0
-        self.sim_reference_profile = None
-        self.shared_progress_frame = None
-        self.shared_progress = None
-        self.shared_progress_label = None
-        self.nyquist_enabled = False
+        self.asset_id_var = tk.StringVar(value="")
         self._measurement_drag_active = False
         self._log_drag_last_y = None
         self._osk_launch_cmd = self._detect_onscreen_keyboard_command()
@@ -255,6 +324,13 @@ class EisAnalysisTool:
         )
         self.delete_profile_btn.pack(side="left")
 
+        asset_row = ttk.Frame(load_frame, style="Card.TFrame")
+        asset_row.pack(fill="x", pady=(0, 8))
+        ttk.Label(asset_row, text="Asset / Panel ID", style="Card.TLabel").pack(side="left", padx=(0, 8))
+        asset_entry = ttk.Entry(asset_row, textvariable=self.asset_id_var, width=26)
+        asset_entry.pack(side="left", padx=(0, 8))
+        self._bind_entry_touch_focus(asset_entry)
+
         self.param_vars = {}
         params_frame = ttk.Frame(load_frame, style="InnerCard.TFrame", padding=(12, 10))
         params_frame.pack(fill="x", pady=(0, 8))
@@ -337,20 +413,28 @@ class EisAnalysisTool:
         self.run_test_btn.config(command=self.toggle_run_stop_test)
         self.stop_test_btn.pack_forget()
 
+        self.resume_test_btn = ttk.Button(
+            controls_frame,
+            text="Resume Sweep",
+            command=self.resume_sweep,
+            style="Secondary.TButton",
+            state="disabled"
+        )
+        self.resume_test_btn.pack(side="left", padx=(10, 0))
+
         self.load_progress_lbl = ttk.Label(load_frame, text="No test running", style="Muted.Card.TLabel")
         self.load_progress_lbl.pack(anchor="w", pady=(4, 0))
         self._bind_drag_scroll_to_descendants(self.eis_scroll_content)
         # --- END OF CHANGES TO TAB 1 ---
 
         # --- Hidden Nyquist Surface (not shown as a tab) ---
+        # The figure/canvas is built by _ensure_nyquist_plot() the first time it is needed.
         self.nyquist_hidden_frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.nyquist_fig = Figure(figsize=(6, 4), dpi=100, facecolor=self.theme["panel"])
-        self.nyquist_ax = self.nyquist_fig.add_subplot(111)
-        self.nyquist_canvas = FigureCanvasTkAgg(self.nyquist_fig, master=self.nyquist_hidden_frame)
-        nyquist_widget = self.nyquist_canvas.get_tk_widget()
-        nyquist_widget.configure(bg=self.theme["panel"], highlightthickness=0, bd=0)
-        nyquist_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=10, pady=(10, 6))
-        
+        self.nyquist_fig = None
+        self.nyquist_ax = None
+        self.nyquist_canvas = None
+        self.nyquist_annot = None
+
         nyquist_export_frame = ttk.Frame(self.nyquist_hidden_frame, style="Card.TFrame")
         nyquist_export_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
 
@@ -372,27 +456,28 @@ class EisAnalysisTool:
         )
         self.export_nyquist_cloud_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(6, 0))
 
-        self.nyquist_ax.plot_data = ([], []) 
         self.nyquist_line = None
         self.nyquist_diag_text = None
         self.nyquist_quality_text = None
         self.nyquist_calibration_text = None
         
-        # --- Tab 3: Bode Plot (Magnitude Only) ---
+        # --- Tab 3: Bode Plot (Magnitude and Phase) ---
         self.bode_tab = ttk.Frame(self.notebook, style="Card.TFrame")
         self.notebook.add(self.bode_tab, text='Bode Plot')
         
         self.bode_fig = Figure(figsize=(6, 4), dpi=100, facecolor=self.theme["panel"])
         
         # Leave room for the log tick labels and keep the threshold bar
-        # flush against the plot's left edge.
-        self.bode_ax_mag = self.bode_fig.add_axes([0.206, 0.22, 0.72, 0.68], zorder=1)
-        self.bode_cbar_ax = self.bode_fig.add_axes([0.206, 0.22, 0.028, 0.68], zorder=2)
+        # flush against the magnitude plot's left edge; phase sits below on the same x axis.
+        self.bode_ax_mag = self.bode_fig.add_axes([0.206, 0.42, 0.72, 0.5], zorder=1)
+        self.bode_cbar_ax = self.bode_fig.add_axes([0.206, 0.42, 0.028, 0.5], zorder=2)
+        self.bode_ax_phase = self.bode_fig.add_axes([0.206, 0.12, 0.72, 0.24], sharex=self.bode_ax_mag)
         
         self.bode_ax_mag.patch.set_alpha(0) 
         self.bode_ax_mag.plot_data = ([], []) 
 
         self.bode_line = None
+        self.bode_phase_line = None
         self.bode_diag_text = None
         self.bode_quality_text = None
         self.bode_calibration_text = None
@@ -431,29 +516,30 @@ class EisAnalysisTool:
         self.history_tab = ttk.Frame(self.notebook, style="Card.TFrame")
         self.notebook.add(self.history_tab, text='Run History')
 
-        self.history_fig = Figure(figsize=(6, 2.4), dpi=100, facecolor=self.theme["panel"])
-        self.history_ax = self.history_fig.add_subplot(111)
-        self.history_canvas = FigureCanvasTkAgg(self.history_fig, master=self.history_tab)
-        history_widget = self.history_canvas.get_tk_widget()
-        history_widget.configure(bg=self.theme["panel"], highlightthickness=0, bd=0)
-        history_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=False, padx=10, pady=(10, 6))
+        # The trend figure is built by _ensure_history_plot() when the tab is first selected.
+        self.history_fig = None
+        self.history_ax = None
+        self.history_canvas = None
 
         history_table_frame = ttk.Frame(self.history_tab, style="Card.TFrame", padding=(10, 6))
+        self.history_table_frame = history_table_frame
         history_table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         history_table_frame.columnconfigure(0, weight=1)
         history_table_frame.rowconfigure(0, weight=1)
         self.history_tree = ttk.Treeview(
             history_table_frame,
-            columns=("time", "mode", "profile", "diagnosis", "lowz"),
+            columns=("time", "asset", "mode", "profile", "diagnosis", "lowz"),
             show="headings",
             height=8,
         )
         self.history_tree.heading("time", text="Time")
+        self.history_tree.heading("asset", text="Asset")
         self.history_tree.heading("mode", text="Mode")
         self.history_tree.heading("profile", text="Profile")
         self.history_tree.heading("diagnosis", text="Diagnosis")
         self.history_tree.heading("lowz", text="Low-Freq |Z| (Ohm)")
         self.history_tree.column("time", width=135, anchor="w")
+        self.history_tree.column("asset", width=100, anchor="w")
         self.history_tree.column("mode", width=100, anchor="w")
         self.history_tree.column("profile", width=120, anchor="w")
         self.history_tree.column("diagnosis", width=260, anchor="w")
@@ -462,7 +548,71 @@ class EisAnalysisTool:
         history_scroll = ttk.Scrollbar(history_table_frame, orient="vertical", command=self.history_tree.yview)
         history_scroll.grid(row=0, column=1, sticky="ns")
         self.history_tree.configure(yscrollcommand=history_scroll.set)
-        self.init_history_plot()
+
+        self.history_tree.bind("<<TreeviewSelect>>", lambda _e: self._update_forecast_label())
+
+        history_actions = ttk.Frame(history_table_frame, style="Card.TFrame")
+        history_actions.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(6, 0))
+        self.forecast_var = tk.StringVar(value="")
+        ttk.Label(history_table_frame, textvariable=self.forecast_var, style="Muted.Card.TLabel").grid(
+            row=2, column=0, columnspan=2, sticky="w", pady=(6, 0)
+        )
+        self.batch_report_btn = ttk.Button(
+            history_actions,
+            text="Batch Report (PDF)",
+            style="Secondary.TButton",
+            command=self.open_batch_report_dialog,
+        )
+        self.batch_report_btn.pack(side=tk.LEFT)
+        self.export_history_btn = ttk.Button(
+            history_actions,
+            text="Export History",
+            style="Secondary.TButton",
+            command=self.export_history_archive,
+        )
+        self.export_history_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.overlay_btn = ttk.Button(
+            history_actions,
+            text="Overlay on Plots",
+            style="Secondary.TButton",
+            command=self.toggle_overlay_selected_runs,
+        )
+        self.overlay_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.clear_overlay_btn = ttk.Button(
+            history_actions,
+            text="Clear Overlay",
+            style="Secondary.TButton",
+            command=self.clear_run_overlay,
+        )
+        self.clear_overlay_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.set_baseline_btn = ttk.Button(
+            history_actions,
+            text="Set Baseline",
+            style="Secondary.TButton",
+            command=self.set_selected_run_as_baseline,
+        )
+        self.set_baseline_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.save_reference_btn = ttk.Button(
+            history_actions,
+            text="Save as Reference",
+            style="Secondary.TButton",
+            command=self.save_selected_run_as_reference,
+        )
+        self.save_reference_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.asset_trend_btn = ttk.Button(
+            history_actions,
+            text="Asset Trend",
+            style="Secondary.TButton",
+            command=self.open_asset_trend,
+        )
+        self.asset_trend_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.diagnostics_btn = ttk.Button(
+            history_actions,
+            text="Diagnostics",
+            style="Secondary.TButton",
+            command=self.open_diagnostics_panel,
+        )
+        self.diagnostics_btn.pack(side=tk.RIGHT)
 
         # --- Tab 5: Output Log ---
         self.log_tab = ttk.Frame(self.notebook, style="Card.TFrame", padding=(10, 10))
@@ -489,19 +639,15 @@ class EisAnalysisTool:
         self.output_text.pack(fill="both", expand=True, padx=4, pady=4)
         self._bind_output_log_touch_scroll()
         self.log_message("No Device Connected")
+        self.root.after(self.log_flush_interval_ms, self._flush_log_buffer)
+        self._load_run_history()
+        self._load_asset_index()
+        self.durations.rebuild(self.run_history)
+        self.refresh_run_history_views()
 
         # --- Initialize Plots & Annotations ---
-        self.init_nyquist_plot()
         self.init_bode_plot()
 
-        self.nyquist_annot = self.nyquist_ax.annotate("", xy=(0,0), xytext=(15,15),
-            textcoords="offset points",
-            bbox=dict(boxstyle="round,pad=0.35", fc=self.theme["panel_alt"], ec=self.theme["line"], alpha=0.95),
-            color=self.theme["text"],
-            arrowprops=dict(arrowstyle="->", color=self.theme["muted"]))
-        self.nyquist_annot.set_visible(False)
-        self.nyquist_annot.set_clip_on(False)
-
         self.bode_annot = self.bode_ax_mag.annotate("", xy=(0,0), xytext=(15,15),
             textcoords="offset points",
             bbox=dict(boxstyle="round,pad=0.35", fc=self.theme["panel_alt"], ec=self.theme["line"], alpha=0.95),
@@ -509,17 +655,108 @@ class EisAnalysisTool:
             arrowprops=dict(arrowstyle="->", color=self.theme["muted"]))
         self.bode_annot.set_visible(False)
         self.bode_annot.set_clip_on(False)
-        self.nyquist_annot.set_zorder(200)
         self.bode_annot.set_zorder(200)
 
-        self.nyquist_canvas.mpl_connect("motion_notify_event", self.on_plot_hover)
         self.bode_canvas.mpl_connect("motion_notify_event", self.on_plot_hover)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_notebook_tab_changed, add="+")
         try:
             self.notebook.select(self.eis_frame)
         except Exception:
             pass
         self.root.after(0, self._apply_top_bottom_split)
         self._refresh_top_action_buttons()
+        self._start_cloud_uploader()
+        self._init_finished = time.perf_counter()
+        self.root.after_idle(self._report_startup_timing)
+        self.root.after(500, self._recover_interrupted_sweeps)
+
+    def _init_state(self, data_dir=None):
+        """Runtime, history and analysis state that needs no Tk widgets.
+
+        data_dir holds the history, baselines, profiles, journals and upload queue
+        (default: next to app.py).
+        """
+        if data_dir is None:
+            data_dir = os.path.dirname(__file__)
+        self.events = EventBus()
+        self.events.set_trace(trace_categories_from_env())
+
+        # PyPalmSens runtime state
+        self.ps_manager = None
+        self.ps_instrument = None
+        self.connection_mode = None  # "sensit_bt" or "simulated" or "messy" or "calibration"
+        # Connect and measure jobs run on the task runtime and share the "device" slot,
+        # so they cannot overlap. The in-progress / cancel flags are derived from them.
+        self.tasks = tasks.TaskRuntime(dispatch=self._dispatch_to_ui, on_error=self._log_task_error)
+        self.connect_task = None
+        self.measurement_task = None
+        # Every PalmSens SDK call goes through this one asyncio loop (per-operation timeouts).
+        self.device_io = DeviceIOLoop()
+        self.expected_points = 0
+        self.target_mac = "00:16:A4:79:4E:03"
+        self.measurement_start_time = None
+        self.last_point_time = None
+        self.last_point_count = 0
+        self.last_progress_log_time = 0.0
+        self.replay_speed = replay.speed_from_env()
+        self.callback_debug_count = 0
+        self.last_plot_update_time = 0  # Throttle plot updates (milliseconds)
+        self.latest_sweep = Sweep.empty()
+        self.last_diagnosis_result = "No diagnosis yet"
+        self.last_quality_result = None
+        self.last_quality_summary = "No quality check yet"
+        self.last_low_freq_impedance = np.nan
+        self.last_low_freq_hz = np.nan
+        self.run_history = []
+        self.max_run_history = 200
+        # Historical sweeps drawn behind the live trace (toggled from the Run History tab).
+        self.run_overlay = RunOverlay()
+        self.history_store_path = os.path.join(data_dir, "run_history.json")
+        self._history_save_lock = threading.Lock()
+        # One writer thread drains the newest unsaved history snapshot (see _save_run_history).
+        self._history_pending_lock = threading.Lock()
+        self._history_pending = None  # (snapshot, journals) not yet handed to the writer
+        self._history_unsaved_journals = []  # journals of a failed save; retried with the next snapshot
+        self._history_writer_active = False
+        # Runs indexed by asset (panel/structure) with one baseline sweep per asset.
+        # Cached log-frequency interpolation weights shared by quality checks and asset deltas.
+        self.resampler = GridResampler()
+        self.asset_index = AssetIndex(self.resampler)
+        # Incremental per-asset |Z| trend fits for the failure-time forecast.
+        self.forecasts = ForecastBank(resampler=self.resampler)
+        # Per-profile sweep duration fits (from recorded point times) for ETA and slot planning.
+        self.durations = DurationEstimator()
+        self.sweep_progress = None
+        self.asset_baselines_path = os.path.join(data_dir, "asset_baselines.json")
+        self.asset_window = None
+        # Stage timers/counters: run_metrics is reset per measurement and saved with its
+        # history entry; session_metrics covers work outside a run (connect, reports).
+        self.run_metrics = Metrics()
+        self.session_metrics = Metrics()
+        self.diagnostics_window = None
+        self.profile_store_path = os.path.join(data_dir, "test_profiles.json")
+        self.test_profiles = {}
+        self.test_run_counter = 0
+        self.sim_reference_profile = None
+        # Quality-check references, memory-mapped on first use (seeded from the bundled CSV).
+        self.reference_library = None
+        self.reference_library_dir = os.path.join(data_dir, "reference_library")
+        self.journal_dir = os.path.join(data_dir, "sweep_journal")
+        self._finished_journals = []  # deleted once the run history holding their runs is saved
+        self.pending_resume = None
+        self.shared_progress_frame = None
+        self.shared_progress = None
+        self.shared_progress_label = None
+        self.nyquist_enabled = False
+        # Optional synthetic scenario (see synthetic_eis.SCENARIOS) streamed in Simulated Mode instead of the CSV.
+        self.simulation_scenario = os.environ.get("EIS_SIM_SCENARIO", "").strip() or None
+        self.upload_queue_dir = os.path.join(data_dir, "cloud_upload_queue")
+        self.upload_config_path = os.path.join(data_dir, "cloud_upload.json")
+        self.cloud_uploader = None
+        self.report_worker = None
+        self.report_job = None
+        self.batch_report_worker = None
+        self.batch_report_job = None
 
     # --- REMOVED _create_param_entry ---
 
@@ -586,14 +823,160 @@ class EisAnalysisTool:
 
         filename = self._generate_export_filename(default_name)
         destination = os.path.join(flash_root, filename)
-        try:
-            export_df.to_csv(destination, index=False)
+
+        def _on_saved():
             self.log_message(f"Bode data saved to flash drive: {destination}")
             messagebox.showinfo("Save Complete", f"Bode data saved to:\n{destination}")
-        except Exception as e:
+
+        def _on_failed(e):
             self.log_message(f"Flash drive save failed: {e}")
             messagebox.showerror("Save Error", f"Could not save to flash drive:\n{e}")
 
+        self._write_export_in_background(export_df, destination, _on_saved, _on_failed)
+        self.queue_export_for_upload(export_df, default_name)
+
+    def _write_export_in_background(self, export_df, filepath, on_success, on_error):
+        """Write CSV off the Tk thread; completion callbacks run back on the Tk thread."""
+        def _write():
+            try:
+                export_df.to_csv(filepath, index=False)
+            except Exception as e:
+                self.root.after(0, on_error, e)
+                return
+            self.root.after(0, on_success)
+
+        threading.Thread(target=_write, daemon=True).start()
+
+    def _load_cloud_upload_config(self):
+        """Read cloud_upload.json; EIS_UPLOAD_ENDPOINT / EIS_UPLOAD_TOKEN override the file."""
+        config = {}
+        if os.path.exists(self.upload_config_path):
+            try:
+                with open(self.upload_config_path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                if isinstance(raw, dict):
+                    config = raw
+            except Exception as e:
+                self.log_message(f"Could not load cloud upload settings: {e}")
+
+        config["endpoint"] = os.environ.get("EIS_UPLOAD_ENDPOINT", "").strip() or str(config.get("endpoint", "")).strip()
+        token = os.environ.get("EIS_UPLOAD_TOKEN", "").strip() or config.get("token")
+        config["token"] = str(token).strip() if token else None
+        return config
+
+    def _start_cloud_uploader(self):
+        """Start the background queue uploader when an endpoint is configured."""
+        config = self._load_cloud_upload_config()
+        if not config["endpoint"]:
+            return
+        try:
+            self.cloud_uploader = CloudUploadWorker(
+                self.upload_queue_dir,
+                config["endpoint"],
+                token=config["token"],
+                batch_max_files=int(config.get("batch_max_files", 20)),
+                poll_interval=float(config.get("poll_interval_s", 10.0)),
+                max_attempts=int(config.get("max_attempts", 6)),
+                log=self.log_message,
+            )
+            self.cloud_uploader.start()
+            self.log_message("Cloud upload enabled.")
+        except Exception as e:
+            self.cloud_uploader = None
+            self.log_message(f"Cloud upload disabled: {e}")
+
+    def queue_export_for_upload(self, export_df, base_name):
+        """Stage a copy of an export in cloud_upload_queue (background write) when uploads are enabled.
+
+        The write's outcome comes back on the Tk thread: the uploader is woken once the
+        file is queued, and a failed write is reported to the user.
+        """
+        uploader = self.cloud_uploader
+        if uploader is None:
+            return
+        filename = self._generate_export_filename(base_name)
+
+        def _write():
+            return write_queue_file_atomic(self.upload_queue_dir, filename, lambda path: export_df.to_csv(path, index=False))
+
+        def _on_failed(e):
+            self.log_message(f"Could not queue export for cloud upload: {e}")
+            messagebox.showwarning("Cloud Upload", f"The export was not queued for cloud upload:\n{e}")
+
+        self._run_in_background(_write, lambda _path: uploader.wake(), _on_failed)
+
+    # --- Task runtime ---
+
+    def _dispatch_to_ui(self, fn, *args):
+        """Task runtime dispatcher: run fn(*args) on the Tk thread."""
+        self.root.after(0, fn, *args)
+
+    def _log_task_error(self, what, error):
+        self.events.warning("task", "{what}: {error}", what=what, error=str(error))
+
+    @property
+    def measurement_in_progress(self):
+        task = self.measurement_task
+        return task is not None and not task.done()
+
+    @property
+    def stop_requested(self):
+        # The "device" slot is held until the worker exits, so measurement_task is always
+        # the job of whichever worker is asking.
+        task = self.measurement_task
+        return task is not None and task.token.cancelled
+
+    @property
+    def connection_in_progress(self):
+        task = self.connect_task
+        return task is not None and not task.done()
+
+    @property
+    def cancel_connect_requested(self):
+        task = self.connect_task
+        return task is not None and task.token.cancelled
+
+    def _measurement_token(self):
+        """Cancel token of the active measurement (a fresh one when run outside the runtime)."""
+        task = self.measurement_task
+        return task.token if task is not None else tasks.CancelToken()
+
+    def _connect_token(self):
+        task = self.connect_task
+        return task.token if task is not None else tasks.CancelToken()
+
+    def shutdown(self):
+        """Stop background workers before the window is destroyed."""
+        self.tasks.shutdown(timeout=1.0)
+        self.device_io.stop()
+        if self.cloud_uploader is not None:
+            try:
+                self.cloud_uploader.stop()
+            except Exception:
+                pass
+            self.cloud_uploader = None
+        for attr in ("report_worker", "batch_report_worker"):
+            worker = getattr(self, attr, None)
+            if worker is None:
+                continue
+            try:
+                worker.shutdown()
+            except Exception:
+                pass
+            setattr(self, attr, None)
+        if self._event_sink is not None:
+            try:
+                self._event_sink.close()
+            except Exception:
+                pass
+            self._event_sink = None
+        if self._log_listener is not None:
+            try:
+                self._log_listener.stop()
+            except Exception:
+                pass
+            self._log_listener = None
+
     def _refresh_top_action_buttons(self):
         """Keep top action buttons in sync with current connection/test state."""
         try:
@@ -627,29 +1010,55 @@ class EisAnalysisTool:
             pass
 
         try:
-            has_plot_data = len(np.asarray(self.latest_plot_data.get('frequency', np.array([])))) > 0
+            has_plot_data = len(self.latest_sweep) > 0
             self.top_save_btn.config(state="normal" if has_plot_data and not self.measurement_in_progress else "disabled")
         except Exception:
             pass
 
+        try:
+            can_resume = (
+                self.pending_resume is not None
+                and self.connection_mode in ("sensit_bt", "sensit_usb")
+                and not self.measurement_in_progress
+            )
+            self.resume_test_btn.config(state="normal" if can_resume else "disabled")
+        except Exception:
+            pass
+
     def start_connect_thread(self):
         """Connect to selected device mode."""
         selected_device = self.device_var.get().strip()
-        self.connection_in_progress = True
-        self.cancel_connect_requested = False
+        try:
+            self.connect_task = self.tasks.submit(
+                self.connect_device,
+                name="connect",
+                slot="device",
+                on_done=self._on_connect_task_done,
+            )
+        except TaskBusy:
+            self.log_message(f"Cannot connect now: {self._device_busy_text()}")
+            return
         self.log_message(f"Connect requested for {selected_device}.")
         if selected_device != "Sensit BT":
             self.connect_btn.config(state="disabled")
         self.run_test_btn.config(state="disabled")
         self._refresh_top_action_buttons()
         self.status_label.config(text="Status: Connecting (USB)...", foreground=self.theme["warning"])
-        threading.Thread(target=self.connect_device, daemon=True).start()
+
+    def _on_connect_task_done(self, handle):
+        """Tk-thread completion hook for connect jobs."""
+        if handle.exception() is not None:
+            self.log_message(f"Connection failed: {self._connection_error_reason(handle.exception())}")
+            self.connection_mode = None
+            self._set_disconnected_ui()
+            return
+        self._refresh_top_action_buttons()
 
     def request_cancel_connect(self):
         """Request cancellation of an in-progress real Bluetooth connection attempt."""
         if not self.connection_in_progress:
             return
-        self.cancel_connect_requested = True
+        self.connect_task.cancel("user")
         self.connect_btn.config(state="disabled")
         self._refresh_top_action_buttons()
         self.status_label.config(text="Status: Cancelling connection...", foreground=self.theme["warning"])
@@ -657,8 +1066,6 @@ class EisAnalysisTool:
 
     def _finish_connection_cancelled(self):
         """Finalize UI state after a cancelled connection attempt."""
-        self.connection_in_progress = False
-        self.cancel_connect_requested = False
         self._set_disconnected_ui()
         self.log_message("Connection attempt cancelled.")
 
@@ -719,19 +1126,23 @@ class EisAnalysisTool:
             self.connection_mode = None
             self.root.after(0, self._set_disconnected_ui)
 
+    @timed("connect_device", attr="session_metrics")
     def connect_device(self):
         """Discover and connect to a PalmSens instrument over USB."""
+        ps = palmsens_module()
         if ps is None:
             self.log_message("ERROR: PyPalmSens is not installed. Install with: pip install pypalmsens")
             self.connection_mode = None
             self.root.after(0, self._set_disconnected_ui)
             return
 
+        io = self.device_io
+        cancel_event = self._connect_token().event
         try:
             # Best-effort cleanup of an existing manager before reconnecting
             try:
                 if self.ps_manager is not None:
-                    self.ps_manager.disconnect()
+                    io.run(AsyncInstrumentManager(io, self.ps_manager).disconnect())
             except Exception:
                 pass
             self.ps_manager = None
@@ -739,15 +1150,21 @@ class EisAnalysisTool:
 
             self.log_message("Scanning for PalmSens instruments over USB...")
             try:
-                instruments = list(
-                    ps.discover(
+                instruments = io.run(
+                    device_io.discover(
+                        io,
+                        ps,
                         ftdi=True,
                         usbcdc=True,
                         winusb=True,
                         serial=True,
                         ignore_errors=True,
-                    )
+                    ),
+                    cancel_event=cancel_event,
                 )
+            except concurrent.futures.CancelledError:
+                self.root.after(0, self._finish_connection_cancelled)
+                return
             except Exception as discover_error:
                 self.log_message(f"Device scan failed: {self._connection_error_reason(discover_error)}")
                 self.root.after(0, self._set_disconnected_ui)
@@ -786,23 +1203,24 @@ class EisAnalysisTool:
                     return
                 try:
                     self.ps_manager = ps.InstrumentManager(self.ps_instrument)
-                    self.ps_manager.connect()
+                    io.run(AsyncInstrumentManager(io, self.ps_manager).connect())
                     break
                 except Exception as e:
                     last_err = e
                     self.log_message(f"Connect attempt {attempt}/2 failed: {self._connection_error_reason(e)}")
                     try:
                         if self.ps_manager is not None:
-                            self.ps_manager.disconnect()
+                            io.run(AsyncInstrumentManager(io, self.ps_manager).disconnect())
                     except Exception:
                         pass
                     self.ps_manager = None
-                    if attempt < 2:
-                        time.sleep(1.0)
+                    if attempt < 2 and self._connect_token().wait(1.0):
+                        self.root.after(0, self._finish_connection_cancelled)
+                        return
             if self.ps_manager is None:
                 raise last_err if last_err is not None else RuntimeError("Unknown connection error")
 
-            serial = self.ps_manager.get_instrument_serial()
+            serial = io.run(AsyncInstrumentManager(io, self.ps_manager).serial())
             self.connection_mode = "sensit_usb"
             mode_label = "Sensit BT"
             self.log_message(f"Connected to {self.ps_instrument.name} (Serial: {serial})")
@@ -904,10 +1322,17 @@ class EisAnalysisTool:
         return 'bluetooth' in str(interface).lower()
 
     def disconnect_device(self):
-        """Disconnect active PalmSens instrument."""
+        """Disconnect active PalmSens instrument (the SDK call finishes on the device I/O loop)."""
+        if self.connection_in_progress:
+            self.connect_task.cancel("disconnect")
         try:
             if self.ps_manager is not None:
-                self.ps_manager.disconnect()
+                future = self.device_io.submit(AsyncInstrumentManager(self.device_io, self.ps_manager).disconnect())
+                self.device_io.deliver(
+                    future,
+                    self._dispatch_to_ui,
+                    on_error=lambda e: self.log_message(f"Disconnect warning: {e}"),
+                )
         except Exception as e:
             self.log_message(f"Disconnect warning: {e}")
         finally:
@@ -918,8 +1343,6 @@ class EisAnalysisTool:
             self.log_message("Device disconnected.")
 
     def _set_connected_ui(self, connected_label="Connected"):
-        self.connection_in_progress = False
-        self.cancel_connect_requested = False
         self.status_label.config(text=f"Status: Connected ({connected_label})", foreground=self.theme["success"])
         self._set_measurement_status("Connected. Ready to start test.")
         self.run_test_btn.config(state="normal")
@@ -1059,6 +1482,77 @@ class EisAnalysisTool:
         self._save_test_profiles()
         self.log_message(f"Deleted test profile: {profile_name}")
 
+    def _report_startup_timing(self):
+        """Log how long imports, UI construction and the first idle took, then warm deferred imports."""
+        now = time.perf_counter()
+        imports_s = _IMPORTS_DONE - _IMPORT_STARTED
+        build_s = self._init_finished - self._init_started
+        ready_s = now - _IMPORT_STARTED
+        self.session_metrics.add_time("startup_imports", imports_s)
+        self.session_metrics.add_time("startup_ui_build", build_s)
+        self.session_metrics.add_time("startup_until_ready", ready_s)
+        self.events.info(
+            "startup", "Startup: imports {imports:.0f} ms, UI build {build:.0f} ms, ready after {ready:.0f} ms",
+            imports=imports_s * 1000.0, build=build_s * 1000.0, ready=ready_s * 1000.0,
+        )
+        self.root.after(1500, lambda: preload(DEFERRED_IMPORTS))
+
+    def _on_notebook_tab_changed(self, _event=None):
+        """Build deferred figures the first time their tab is shown."""
+        try:
+            selected = self.notebook.nametowidget(self.notebook.select())
+        except Exception:
+            return
+        if selected is self.history_tab:
+            self._ensure_history_plot()
+        elif selected is self.nyquist_hidden_frame:
+            self._ensure_nyquist_plot()
+
+    def _ensure_history_plot(self):
+        if self.history_ax is not None:
+            return
+        started = time.perf_counter()
+        self.history_fig = Figure(figsize=(6, 2.4), dpi=100, facecolor=self.theme["panel"])
+        self.history_ax = self.history_fig.add_subplot(111)
+        self.history_canvas = FigureCanvasTkAgg(self.history_fig, master=self.history_tab)
+        history_widget = self.history_canvas.get_tk_widget()
+        history_widget.configure(bg=self.theme["panel"], highlightthickness=0, bd=0)
+        history_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=False, padx=10, pady=(10, 6), before=self.history_table_frame)
+        self.init_history_plot()
+        self.refresh_run_history_views()
+        self.session_metrics.add_time("build_history_plot", time.perf_counter() - started)
+
+    def _ensure_nyquist_plot(self):
+        if self.nyquist_ax is not None:
+            return
+        started = time.perf_counter()
+        self.nyquist_fig = Figure(figsize=(6, 4), dpi=100, facecolor=self.theme["panel"])
+        self.nyquist_ax = self.nyquist_fig.add_subplot(111)
+        self.nyquist_canvas = FigureCanvasTkAgg(self.nyquist_fig, master=self.nyquist_hidden_frame)
+        nyquist_widget = self.nyquist_canvas.get_tk_widget()
+        nyquist_widget.configure(bg=self.theme["panel"], highlightthickness=0, bd=0)
+        nyquist_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=10, pady=(10, 6))
+        self.nyquist_ax.plot_data = ([], [])
+        self.init_nyquist_plot()
+
+        self.nyquist_annot = self.nyquist_ax.annotate("", xy=(0,0), xytext=(15,15),
+            textcoords="offset points",
+            bbox=dict(boxstyle="round,pad=0.35", fc=self.theme["panel_alt"], ec=self.theme["line"], alpha=0.95),
+            color=self.theme["text"],
+            arrowprops=dict(arrowstyle="->", color=self.theme["muted"]))
+        self.nyquist_annot.set_visible(False)
+        self.nyquist_annot.set_clip_on(False)
+        self.nyquist_annot.set_zorder(200)
+        self.nyquist_canvas.mpl_connect("motion_notify_event", self.on_plot_hover)
+        self.session_metrics.add_time("build_nyquist_plot", time.perf_counter() - started)
+
+    def _nyquist_active(self):
+        """True when Nyquist plotting is enabled; builds the figure on first use."""
+        if not self.nyquist_enabled:
+            return False
+        self._ensure_nyquist_plot()
+        return True
+
     def init_history_plot(self):
         self.history_ax.clear()
         self.history_ax.set_facecolor(self.theme["panel"])
@@ -1075,13 +1569,27 @@ class EisAnalysisTool:
         self.history_ax.set_yscale('log')
         self.history_canvas.draw_idle()
 
-    def record_run_history(self, mode_label, freq_data, z_mag_data):
+    def record_run_history(self, mode_label, freq_data, z_mag_data, z_real_data=None, z_imag_data=None, time_data=None, **fields):
+        """Append one run; fields override the entry's defaults (timestamp, profile, diagnosis, ...).
+
+        time_data (seconds per point, NaN where unknown) is kept with the sweep to fit
+        the profile's duration model.
+        """
         try:
             freq = np.asarray(freq_data, dtype=float)
             z_mag = np.asarray(z_mag_data, dtype=float)
+            if z_real_data is not None and z_imag_data is not None:
+                z_real = np.asarray(z_real_data, dtype=float)
+                z_imag = np.asarray(z_imag_data, dtype=float)
+            else:
+                z_real = z_mag
+                z_imag = np.zeros_like(z_mag)
             valid = np.isfinite(freq) & np.isfinite(z_mag) & (freq > 0) & (z_mag > 0)
             freq = freq[valid]
             z_mag = z_mag[valid]
+            z_real = z_real[valid]
+            z_imag = z_imag[valid]
+            times = None if time_data is None else np.asarray(time_data, dtype=float)[valid]
             if freq.size == 0:
                 return
 
@@ -1092,24 +1600,268 @@ class EisAnalysisTool:
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "mode": mode_label,
                 "profile": self.current_profile_name.get().strip() or "Recommended",
+                "asset_id": normalize_asset_id(self.asset_id_var.get()),
                 "diagnosis": self.last_diagnosis_result,
                 "quality": self.last_quality_summary,
                 "low_freq_hz": low_freq,
                 "low_freq_z": low_z,
                 "points": int(freq.size),
+                "run_id": self._new_run_id(),
+                "metrics": self.run_metrics.snapshot(),
+                "sweep": {
+                    "frequency": freq.tolist(),
+                    "z_real": z_real.tolist(),
+                    "z_imag": z_imag.tolist(),
+                },
             }
+            if times is not None:
+                # JSON has no NaN; unknown times are stored as null.
+                entry["sweep"]["time_s"] = [round(float(t), 3) if np.isfinite(t) else None for t in times]
+            entry.update(fields)
             self._append_run_history_entry(entry)
         except Exception as e:
             self.log_message(f"Could not record run history: {e}")
 
     def _append_run_history_entry(self, entry):
+        self._track_asset_run(entry)
+        self._update_asset_forecast(entry)
+        self.durations.add_run(entry)
         self.run_history.append(entry)
         if len(self.run_history) > self.max_run_history:
+            dropped = self.run_history[:-self.max_run_history]
             self.run_history = self.run_history[-self.max_run_history:]
+            self.run_overlay.forget(e.get("run_id") for e in self.run_history)
+            self.asset_index.evict(dropped)
+            for old in dropped:
+                self.durations.remove_run(old)
 
         self.last_low_freq_hz = entry.get("low_freq_hz", np.nan)
         self.last_low_freq_impedance = entry.get("low_freq_z", np.nan)
         self.refresh_run_history_views()
+        self._save_run_history()
+
+    def _track_asset_run(self, entry):
+        """Index the run under its asset and store its delta summary vs the asset baseline."""
+        had_baseline = normalize_asset_id(entry.get("asset_id")) in self.asset_index.baselines
+        row = self.asset_index.add_run(entry)
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        if not had_baseline and asset_id in self.asset_index.baselines:
+            self.log_message(f"Asset {asset_id}: this run is now the baseline.")
+            self._save_asset_baselines()
+            return
+        if row is None:
+            return
+        summary = summarize_delta(self.asset_index.baselines[asset_id].freq, row)
+        if summary is not None:
+            entry["baseline_delta"] = summary
+            self.log_message(
+                f"Asset {asset_id}: log|Z| vs baseline {summary['mean_decades']:+.2f} decades (mean), "
+                f"{summary['low_freq_decades']:+.2f} at {summary['low_freq_hz']:.2e} Hz"
+            )
+
+    def _load_asset_index(self):
+        try:
+            self.asset_index.load_baselines(self.asset_baselines_path)
+        except Exception as e:
+            self.log_message(f"Could not load asset baselines: {e}")
+        self.asset_index.rebuild(self.run_history)
+        self._rebuild_forecasts()
+
+    def _rebuild_forecasts(self):
+        self.forecasts.rebuild(self.run_history, lambda e: normalize_asset_id(e.get("asset_id")))
+
+    def _update_asset_forecast(self, entry):
+        """Fold the new run into its asset's trend fit (rank-one update) and log the forecast."""
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        self.forecasts.add_run(entry, asset_id)
+        forecast = self.forecasts.forecast(asset_id)
+        if forecast["status"] != "insufficient":
+            entry["forecast"] = {key: value for key, value in forecast.items() if value is not None}
+            self.log_message(describe_forecast(asset_id, forecast))
+
+    def _update_forecast_label(self):
+        """Show the forecast for the selected run's asset (latest run when nothing is selected)."""
+        entry = self._selected_history_entry()
+        if entry is None and self.run_history:
+            entry = self.run_history[-1]
+        if entry is None:
+            self.forecast_var.set("")
+            return
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        self.forecast_var.set(describe_forecast(asset_id, self.forecasts.forecast(asset_id)))
+
+    def _save_asset_baselines(self):
+        """Persist asset baselines off the Tk thread (atomic replace)."""
+        snapshot = self.asset_index.baselines_snapshot()
+
+        def _work():
+            with self._history_save_lock:
+                tmp_path = self.asset_baselines_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.asset_baselines_path)
+
+        self._run_in_background(_work, lambda _result: None, lambda e: self.log_message(f"Could not save asset baselines: {e}"))
+
+    def _selected_history_entry(self):
+        selected = self.history_tree.selection()
+        if not selected:
+            return None
+        return next((e for e in self.run_history if e.get("run_id") == selected[0]), None)
+
+    def set_selected_run_as_baseline(self):
+        entry = self._selected_history_entry()
+        if entry is None:
+            messagebox.showinfo("Set Baseline", "Select a run in the history table first.")
+            return
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        if not self.asset_index.set_baseline(asset_id, entry, self.run_history):
+            messagebox.showwarning("Set Baseline", "This run has no stored sweep to use as a baseline.")
+            return
+        self._save_asset_baselines()
+        self.log_message(f"Asset {asset_id}: baseline set to run {entry.get('timestamp', entry.get('run_id'))}.")
+        if self.asset_window is not None:
+            self.asset_window.destroy()
+            self.asset_window = None
+            self.open_asset_trend(asset_id)
+
+    def open_asset_trend(self, asset_id=None):
+        """Plot one asset's log|Z| delta vs its baseline over time (selected run's asset by default)."""
+        if asset_id is None:
+            entry = self._selected_history_entry()
+            if entry is None and self.run_history:
+                entry = self.run_history[-1]
+            if entry is None:
+                messagebox.showinfo("Asset Trend", "No runs recorded yet.")
+                return
+            asset_id = normalize_asset_id(entry.get("asset_id"))
+        result = self.asset_index.degradation(asset_id)
+        if result is None or len(result[0]) == 0:
+            messagebox.showinfo("Asset Trend", f"No baseline comparison available for asset {asset_id}.")
+            return
+        run_ids, freq, matrix = result
+        by_id = {e.get("run_id"): e for e in self.run_history}
+
+        if self.asset_window is not None:
+            try:
+                self.asset_window.destroy()
+            except Exception:
+                pass
+        window = tk.Toplevel(self.root)
+        window.title(f"Asset Trend: {asset_id}")
+        window.configure(bg=self.theme["panel"])
+        window.geometry("760x560")
+        self.asset_window = window
+
+        def _close():
+            self.asset_window = None
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", _close)
+
+        fig = Figure(figsize=(7.4, 5.4), dpi=100, facecolor=self.theme["panel"])
+        trend_ax = fig.add_subplot(2, 1, 1)
+        map_ax = fig.add_subplot(2, 1, 2)
+        runs = np.arange(1, len(run_ids) + 1)
+        with np.errstate(all="ignore"):
+            mean_delta = np.nanmean(matrix, axis=1)
+        trend_ax.plot(runs, matrix[:, int(np.argmin(freq))], 'o-', color=self.theme["accent"], markersize=4, label=f"{freq.min():.2e} Hz")
+        trend_ax.plot(runs, mean_delta, 's--', color=self.theme["muted"], markersize=3, label="mean")
+        trend_ax.axhline(0.0, color=self.theme["line"], linewidth=1)
+        trend_ax.set_ylabel("Δ log10|Z| (decades)")
+        trend_ax.set_title(f"{asset_id}: change vs baseline")
+        trend_ax.legend(loc="best", fontsize=8)
+        limit = max(0.1, float(np.nanmax(np.abs(matrix))) if np.isfinite(matrix).any() else 0.1)
+        image = map_ax.imshow(
+            matrix.T,
+            aspect="auto",
+            origin="lower",
+            cmap="RdBu",
+            vmin=-limit,
+            vmax=limit,
+            extent=(0.5, len(run_ids) + 0.5, np.log10(freq.min()), np.log10(freq.max())),
+            interpolation="nearest",
+        )
+        map_ax.set_xlabel("Run")
+        map_ax.set_ylabel("log10 f (Hz)")
+        fig.colorbar(image, ax=map_ax, label="Δ decades")
+        labels = [by_id.get(run_id, {}).get("timestamp", "") for run_id in run_ids]
+        if len(labels) <= 12:
+            map_ax.set_xticks(runs)
+            map_ax.set_xticklabels([label[5:16] for label in labels], rotation=30, fontsize=7)
+        fig.tight_layout()
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
+        canvas.draw()
+
+    def _new_run_id(self):
+        return f"{time.strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}"
+
+    def _load_run_history(self):
+        """Load persisted runs (with their sweeps) so history and batch reports survive restarts."""
+        if not os.path.exists(self.history_store_path):
+            return
+        try:
+            with open(self.history_store_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if not isinstance(raw, list):
+                return
+            entries = []
+            for entry in raw:
+                if not isinstance(entry, dict):
+                    continue
+                entry.setdefault("run_id", self._new_run_id())
+                entries.append(entry)
+            self.run_history = entries[-self.max_run_history:]
+        except Exception as e:
+            self.log_message(f"Could not load run history: {e}")
+
+    def _save_run_history(self):
+        """Persist run history off the Tk thread (atomic replace, latest snapshot wins).
+
+        Snapshots go through one writer thread that always takes the newest pending
+        one, so an older snapshot can never land after a newer one. Sweep journals of
+        runs in a snapshot are deleted once a snapshot holding them is on disk; after
+        a failed save they wait for the next snapshot.
+        """
+        snapshot = list(self.run_history)
+        journals, self._finished_journals = self._finished_journals, []
+        with self._history_pending_lock:
+            if self._history_pending is not None:
+                # Superseded before it was written; its journals wait for this snapshot.
+                journals = self._history_pending[1] + journals
+            journals, self._history_unsaved_journals = self._history_unsaved_journals + journals, []
+            self._history_pending = (snapshot, journals)
+            if self._history_writer_active:
+                return
+            self._history_writer_active = True
+        threading.Thread(target=self._run_history_writer, name="history-writer", daemon=True).start()
+
+    def _run_history_writer(self):
+        while True:
+            with self._history_pending_lock:
+                pending, self._history_pending = self._history_pending, None
+                if pending is None:
+                    self._history_writer_active = False
+                    return
+            snapshot, journals = pending
+            with self._history_save_lock:
+                try:
+                    tmp_path = self.history_store_path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(snapshot, f)
+                    os.replace(tmp_path, self.history_store_path)
+                except Exception as e:
+                    self.log_message(f"Could not save run history: {e}")
+                    # Keep the journals on disk and discard them after the next successful save.
+                    with self._history_pending_lock:
+                        if self._history_pending is not None:
+                            self._history_pending = (self._history_pending[0], journals + self._history_pending[1])
+                        else:
+                            self._history_unsaved_journals = journals + self._history_unsaved_journals
+                    continue
+            for journal in journals:
+                journal.discard()
 
     def refresh_run_history_views(self):
         try:
@@ -1122,8 +1874,10 @@ class EisAnalysisTool:
                 self.history_tree.insert(
                     "",
                     "end",
+                    iid=entry.get("run_id"),
                     values=(
                         entry.get("timestamp", ""),
+                        normalize_asset_id(entry.get("asset_id")),
                         entry.get("mode", ""),
                         entry.get("profile", ""),
                         entry.get("diagnosis", ""),
@@ -1132,7 +1886,10 @@ class EisAnalysisTool:
                 )
         except Exception:
             pass
+        self._update_forecast_label()
 
+        if self.history_ax is None:
+            return  # Trend figure not built yet; drawn from run_history when the tab opens.
         try:
             self.history_ax.clear()
             self.history_ax.set_facecolor(self.theme["panel"])
@@ -1156,6 +1913,7 @@ class EisAnalysisTool:
                 y = np.array([e["low_freq_z"] for e in valid_entries], dtype=float)
                 x = np.arange(1, len(y) + 1)
                 self.history_ax.plot(x, y, 'o-', color=self.theme["accent"], markersize=4)
+                self.history_ax.axhline(FAIL_Z_OHM, color=self.theme["diag_fail"], linestyle="--", linewidth=1)
                 self.history_ax.set_xlim(1, max(2, len(x)))
             self.history_canvas.draw_idle()
         except Exception:
@@ -1257,8 +2015,6 @@ class EisAnalysisTool:
         self.eis_canvas.itemconfigure(self.eis_canvas_window, width=event.width)
 
     def _set_disconnected_ui(self):
-        self.connection_in_progress = False
-        self.cancel_connect_requested = False
         self.run_test_btn.config(state="disabled")
         self.calibrate_btn.config(state="disabled")
         self.status_label.config(text="Status: Disconnected", foreground=self.theme["danger"])
@@ -1300,6 +2056,7 @@ class EisAnalysisTool:
                 fontsize=11,
             )
         
+        self.run_overlay.attach(self.nyquist_ax, "nyquist")
         self.nyquist_fig.subplots_adjust(left=0.1, right=0.95, top=0.9, bottom=0.15)
         self.nyquist_canvas.draw()
         
@@ -1308,10 +2065,9 @@ class EisAnalysisTool:
         
         self.bode_ax_mag.clear()
         self.bode_ax_mag.set_facecolor(self.theme["panel"])
-        self.bode_ax_mag.set_ylim(1e2, 1e10)
-        self.bode_ax_mag.set_xlim(1e-2, 1e5)
+        self.bode_ax_mag.set_ylim(*BODE_Z_LIMITS)
+        self.bode_ax_mag.set_xlim(*BODE_FREQ_LIMITS)
         self.bode_ax_mag.set_ylabel('|Z| (Ohm)')
-        self.bode_ax_mag.set_xlabel('Frequency (Hz)')
         self.bode_ax_mag.set_title("Bode Plot")
         self.bode_ax_mag.grid(True, which='both', color=self.theme["line"], linewidth=0.8, alpha=0.8)
         self.bode_ax_mag.tick_params(colors=self.theme["muted"])
@@ -1322,22 +2078,41 @@ class EisAnalysisTool:
             spine.set_color(self.theme["line"])
         self.bode_ax_mag.set_yscale('log')
         self.bode_ax_mag.set_xscale('log')
+        self.bode_ax_mag.tick_params(labelbottom=False)
+
+        self.bode_ax_phase.clear()
+        self.bode_ax_phase.set_facecolor(self.theme["panel"])
+        self.bode_ax_phase.set_ylim(0, 90)
+        self.bode_ax_phase.set_yticks([0, 45, 90])
+        self.bode_ax_phase.set_ylabel('-Phase (°)')
+        self.bode_ax_phase.set_xlabel('Frequency (Hz)')
+        self.bode_ax_phase.grid(True, which='both', color=self.theme["line"], linewidth=0.8, alpha=0.8)
+        self.bode_ax_phase.tick_params(colors=self.theme["muted"])
+        self.bode_ax_phase.xaxis.label.set_color(self.theme["text"])
+        self.bode_ax_phase.yaxis.label.set_color(self.theme["text"])
+        for spine in self.bode_ax_phase.spines.values():
+            spine.set_color(self.theme["line"])
+        self.bode_ax_phase.set_xscale('log')
+        self.bode_ax_mag.set_xlim(*BODE_FREQ_LIMITS)
         
         self.bode_cbar_ax.clear()
         self.bode_cbar_ax.set_facecolor(self.theme["panel"])
         self.bode_cbar_ax.set_yscale('log')
-        self.bode_cbar_ax.set_ylim(1e2, 1e10)
+        self.bode_cbar_ax.set_ylim(*BODE_Z_LIMITS)
         
-        self.bode_cbar_ax.axhspan(1e2, 1e5, facecolor=self.theme['diag_fail'], alpha=0.45) # Red
+        # Bands run past the default window so they still fill it when overlays widen the view.
+        self.bode_cbar_ax.axhspan(1e-3, 1e5, facecolor=self.theme['diag_fail'], alpha=0.45) # Red
         self.bode_cbar_ax.axhspan(1e5, 1e7, facecolor=self.theme['diag_caution'], alpha=0.45) # Yellow
-        self.bode_cbar_ax.axhspan(1e7, 1e10, facecolor=self.theme['diag_pass'], alpha=0.45) # Green
+        self.bode_cbar_ax.axhspan(1e7, 1e15, facecolor=self.theme['diag_pass'], alpha=0.45) # Green
 
         self.bode_cbar_ax.set_xticks([])
         self.bode_cbar_ax.set_yticks([])
         self.bode_cbar_ax.set_yticklabels([])
         
         self.bode_cbar_ax.patch.set_alpha(0.6)
-        
+
+        self.run_overlay.attach(self.bode_ax_mag, "bode")
+        self._fit_bode_to_overlay()
         self.bode_canvas.draw()
 
     # --- Plot Hover Logic (Unchanged) ---
@@ -1365,7 +2140,7 @@ class EisAnalysisTool:
             if self.bode_annot.get_visible():
                 self.bode_annot.set_visible(False)
                 self.bode_canvas.draw_idle()
-            if self.nyquist_annot.get_visible():
+            if self.nyquist_annot is not None and self.nyquist_annot.get_visible():
                 self.nyquist_annot.set_visible(False)
                 self.nyquist_canvas.draw_idle()
             return
@@ -1398,79 +2173,105 @@ class EisAnalysisTool:
     # --- Measurement Logic (Replaced with Load Logic) ---
 
     def log_message(self, msg):
-        msg = self._sanitize_log_message(msg)
+        """Thread-safe: publish msg as a technician-level event (Output Log + log files)."""
+        events = getattr(self, "events", None)
+        if events is not None:
+            events.notice("app", str(msg).strip())
+
+    def _queue_output_log_event(self, event):
+        """Event subscriber: queue the sanitized message for the Output Log."""
+        msg = self._sanitize_log_message(event.message)
         if not msg:
             return
 
-        if not hasattr(self, "output_text"):
-            return
+        line = f"{time.strftime('%H:%M:%S', time.localtime(event.ts))} - {msg}"
+        with self._log_lock:
+            if len(self._log_buffer) == self._log_buffer.maxlen:
+                self._log_dropped += 1
+            self._log_buffer.append(line)
 
-        def _log():
-            self.output_text.configure(state="normal")
-            self.output_text.insert(tk.END, f"{time.strftime('%H:%M:%S')} - {msg}\n")
-            self.output_text.see(tk.END)
-            self.output_text.configure(state="disabled")
-        self.root.after(0, _log)
+    def _create_file_logger(self):
+        """Rotating log file written by a QueueListener thread so callers never block on disk I/O."""
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(self.log_dir, "eis_output.log"),
+                maxBytes=2 * 1024 * 1024,
+                backupCount=5,
+                encoding="utf-8",
+            )
+            file_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, file_handler)
+            listener.start()
+
+            logger = logging.getLogger(f"eis.output.{id(self)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            return logger, listener
+        except Exception:
+            return None, None
 
-    def _sanitize_log_message(self, msg):
-        """Keep output log concise and technician-focused."""
-        text = str(msg).strip()
-        if not text:
+    def _write_file_log_event(self, event):
+        """Event subscriber: unfiltered text log; non-app events carry their level and category."""
+        if event.category == "app":
+            self._file_logger.info(event.message)
+        else:
+            self._file_logger.info(f"[{event.level_name} {event.category}] {event.message}")
+
+    def _create_event_sink(self):
+        """Structured JSONL event stream (logs/events.jsonl) with size-based rotation."""
+        try:
+            return JsonlSink(os.path.join(self.log_dir, "events.jsonl"), max_bytes=5 * 1024 * 1024, backup_count=5)
+        except Exception:
             return None
 
-        low = text.lower()
-        drop_patterns = (
-            "[debug",
-            "measurement still running",
-            "frequency jump detected",
-            "quality detail:",
-            "curve-fit residual",
-            "bode trend fit is weak",
-            "curve roughness",
-            "average deviation vs simulated reference",
-            "peak deviation vs simulated reference",
-            "scanning for palmsens instruments",
-            "discovery (",
-            "discovered ",
-            "configured mac",
-            "using configured mac match",
-            "connect attempt ",
-            "hint: ftdi",
-            "diagnosis based on low freq impedance",
-            "data quality check: reference",
-            "callback error:",
-            "impedance data detected at frequency",
-            "queueing buffered frequencies",
-            "dedupe skipped freq=",
-            "buffering: freq=",
-        )
-        if any(pattern in low for pattern in drop_patterns):
+    def _flush_log_buffer(self):
+        """Drain buffered lines into the Output Log in one insert and trim old lines."""
+        try:
+            with self._log_lock:
+                lines = list(self._log_buffer)
+                self._log_buffer.clear()
+                dropped, self._log_dropped = self._log_dropped, 0
+
+            if lines:
+                if dropped:
+                    lines.insert(0, f"{time.strftime('%H:%M:%S')} - ... {dropped} log line(s) skipped (see log file)")
+                at_bottom = self.output_text.yview()[1] >= 0.999
+                self.output_text.configure(state="normal")
+                self.output_text.insert(tk.END, "\n".join(lines) + "\n")
+                line_count = int(self.output_text.index("end-1c").split(".")[0])
+                excess = line_count - self.max_log_lines
+                if excess > 0:
+                    self.output_text.delete("1.0", f"{excess + 1}.0")
+                self.output_text.configure(state="disabled")
+                if at_bottom:
+                    self.output_text.see(tk.END)
+        except Exception:
+            pass
+        finally:
+            try:
+                self.root.after(self.log_flush_interval_ms, self._flush_log_buffer)
+            except Exception:
+                pass
+
+    def _sanitize_log_message(self, msg):
+        """Keep output log concise and technician-focused."""
+        text = str(msg).strip()
+        if not text:
             return None
 
-        if text.startswith("Connected to ") and "(Serial:" in text:
-            return "Device connected."
-        if text.startswith("Measurement finished:"):
-            return "Measurement complete."
-        if text.startswith("Running EIS over Bluetooth:"):
-            return "Running measurement..."
-        if text.startswith("Running calibration stage "):
-            return "Running calibration measurement..."
-        if text.startswith("Starting test using "):
-            return "Starting simulated test..."
-        if text.startswith("Starting messy-data test using "):
-            return "Starting messy-data test..."
-        if text.startswith("Starting calibration sequence using "):
-            return "Starting calibration sequence..."
-        if text.startswith("Stop signal sent using manager."):
-            return "Stop command sent."
-        if text.startswith("Stop method "):
+        if self._LOG_DROP_RE.search(text.lower()):
             return None
-        if text.startswith("No supported stop method found"):
-            return "Unable to stop from software. Disconnect device if needed."
-        if text.startswith("Disconnect warning:"):
-            return "Disconnected with warning."
 
-        return text
+        match = self._LOG_REWRITE_RE.match(text)
+        if match is None:
+            return text
+        rewrite = self.LOG_REWRITE_RULES[match.group(1)]
+        if callable(rewrite):
+            return rewrite(text)
+        return rewrite
 
     def _set_measurement_status(self, text):
         """Update measurement status in setup tab and in top connection bar."""
@@ -1485,9 +2286,9 @@ class EisAnalysisTool:
         self._refresh_top_action_buttons()
 
     def _clear_measurement_state(self):
-        """Reset measurement flags and refresh action buttons."""
-        self.measurement_in_progress = False
-        self.stop_requested = False
+        """Forget a finished measurement task and refresh action buttons."""
+        if self.measurement_task is not None and self.measurement_task.done():
+            self.measurement_task = None
         try:
             self.root.after(0, self._refresh_top_action_buttons)
         except Exception:
@@ -1497,18 +2298,16 @@ class EisAnalysisTool:
         """Clear previous plot traces immediately when starting a new run."""
         try:
             self.bode_line = None
+            self.bode_phase_line = None
             self.nyquist_line = None
             self.init_bode_plot()
             self.bode_ax_mag.plot_data = ([], [])
             self.clear_bode_threshold_indicator()
-            self.init_nyquist_plot()
-            self.nyquist_ax.plot_data = ([], [])
-            self.latest_plot_data = {
-                'frequency': np.array([]),
-                'z_real': np.array([]),
-                'z_imag': np.array([]),
-            }
-            self.nyquist_canvas.draw_idle()
+            if self.nyquist_ax is not None:
+                self.init_nyquist_plot()
+                self.nyquist_ax.plot_data = ([], [])
+                self.nyquist_canvas.draw_idle()
+            self.latest_sweep = Sweep.empty()
             self.bode_canvas.draw_idle()
         except Exception as e:
             self.log_message(f"Could not reset plots: {e}")
@@ -1582,31 +2381,21 @@ class EisAnalysisTool:
                 self.log_message("  Required: " + ", ".join(required_cols))
                 return
 
-            # Extract data into numpy arrays
-            freq = df['Frequency (Hz)'].to_numpy()
-            z_real = df["Z' (Ω)"].to_numpy()
-            z_imag_neg = df["-Z'' (Ω)"].to_numpy()
-            z_imag = -z_imag_neg # Negate the -Z'' column to get Z''
+            # One complex sweep (with the Time column) shared by plots, exports and reports.
+            sweep = Sweep.from_dataframe(df)
             z_mag = df["Z (Ω)"].to_numpy()
-            
-            # Create the data dictionary for plotting
-            data = {
-                'frequency': freq,
-                'z_real': z_real,
-                'z_imag': z_imag # Pass the calculated Z_imag
-            }
-            
-            self.log_message(f"Acquired {len(data['frequency'])} data points.")
-            
+
+            self.log_message(f"Acquired {len(sweep)} data points.")
+
             # --- Run Diagnosis ---
             # Pass the magnitude and frequency data directly
-            diagnosis_result = self.diagnose_coating(z_mag, data['frequency'])
+            diagnosis_result = self.diagnose_coating(z_mag, sweep.freq)
             self.log_message(f"Diagnosis: {diagnosis_result}")
-            self.report_bode_data_quality(data['frequency'], z_mag)
-            self.root.after(0, self.record_run_history, self._current_mode_label(), data['frequency'], z_mag)
+            self.report_bode_data_quality(sweep.freq, z_mag)
+            self.root.after(0, self.record_run_history, self._current_mode_label(), sweep.freq, z_mag, sweep.z_real, sweep.z_imag, sweep.time_s)
 
             # --- Draw full Plots (on main thread) ---
-            self.root.after(0, self.draw_plots, data)
+            self.root.after(0, self.draw_plots, sweep)
 
         except Exception as e:
             self.log_message(f"Error processing file: {e}")
@@ -1640,7 +2429,7 @@ class EisAnalysisTool:
 
             if low_freq_z_mag >= 1e7:
                 diagnosis = "Healthy Coating (Pass)"
-            elif low_freq_z_mag >= 1e5:
+            elif low_freq_z_mag >= FAIL_Z_OHM:
                 diagnosis = "Coating needs monitoring (Caution)"
             else:
                 diagnosis = "Defective Coating, needs maintenance (Fail)"
@@ -1695,6 +2484,75 @@ class EisAnalysisTool:
             self.log_message(f"Data quality check: failed to load reference profile ({e}).")
             return None
 
+    def _get_reference_library(self):
+        """Open the reference library, creating it from the bundled test-cell CSV on first run."""
+        if self.reference_library is not None:
+            return self.reference_library
+        library = ReferenceLibrary(self.reference_library_dir, self.resampler.target_log_freq)
+        try:
+            if not library.load():
+                ref = self._get_simulated_reference_profile()
+                if ref is None:
+                    return None
+                library.add(
+                    "Bundled test cell",
+                    self.resampler.interp(library.log_freq, ref["logf"], ref["logz"]),
+                    default=True,
+                    source="11_12_25_test5.csv",
+                )
+                library.save()
+                self.log_message("Data quality check: reference library created from the bundled test-cell CSV.")
+        except Exception as e:
+            self.log_message(f"Data quality check: reference library unavailable ({e}).")
+            return None
+        self.reference_library = library
+        return library
+
+    def _select_quality_reference(self):
+        """(name, log10 f grid, log10|Z| row) of the reference for the current asset/profile, or None."""
+        library = self._get_reference_library()
+        if library is None:
+            return None
+        try:
+            asset_id = normalize_asset_id(self.asset_id_var.get())
+            profile = self.current_profile_name.get().strip()
+        except Exception:
+            asset_id, profile = UNASSIGNED, ""
+        row = library.select(asset=None if asset_id == UNASSIGNED else asset_id, profile=profile)
+        if row is None:
+            return None
+        return library.name(row), library.log_freq, library.curve(row)
+
+    def save_selected_run_as_reference(self):
+        """Store the selected run as the quality reference for its profile (and asset, if tagged)."""
+        entry = self._selected_history_entry()
+        if entry is None:
+            messagebox.showinfo("Save as Reference", "Select a run in the history table first.")
+            return
+        library = self._get_reference_library()
+        curve = sweep_log_magnitude(entry)
+        if library is None or curve is None:
+            messagebox.showwarning("Save as Reference", "This run has no stored sweep to use as a reference.")
+            return
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        profile = entry.get("profile") or None
+        label = asset_id if asset_id != UNASSIGNED else (profile or "Run")
+        name = f"{label} {entry.get('timestamp', '')}".strip()
+        try:
+            library.add(
+                name,
+                self.resampler.interp(library.log_freq, curve[0], curve[1]),
+                asset=None if asset_id == UNASSIGNED else asset_id,
+                profile=profile,
+                source=entry.get("run_id", ""),
+            )
+            library.save()
+        except Exception as e:
+            self.log_message(f"Could not save reference: {e}")
+            return
+        self.log_message(f"Saved reference '{name}' ({len(library)} references in library).")
+
+    @timed("assess_bode_data_quality", attr="run_metrics")
     def assess_bode_data_quality(self, freq_data, z_mag_data):
         """Assess Bode data cleanliness via curve fit, smoothness, and reference matching."""
         result = {
@@ -1744,17 +2602,16 @@ class EisAnalysisTool:
                 roughness = 0.0
             result["metrics"]["roughness"] = roughness
 
-            ref = self._get_simulated_reference_profile()
+            ref = self._select_quality_reference()
             if ref is not None:
-                common_min = max(float(np.min(logf)), float(np.min(ref["logf"])))
-                common_max = min(float(np.max(logf)), float(np.max(ref["logf"])))
-                common_mask = (logf >= common_min) & (logf <= common_max)
+                ref_name, ref_logf, ref_logz = ref
+                result["metrics"]["reference"] = ref_name
+                # Compare on the library grid, where the reference was precomputed.
+                test_logz = self.resampler.interp(ref_logf, logf, logz)
+                common_mask = np.isfinite(test_logz) & np.isfinite(ref_logz)
 
                 if np.count_nonzero(common_mask) >= 6:
-                    test_logf = logf[common_mask]
-                    test_logz = logz[common_mask]
-                    ref_logz = np.interp(test_logf, ref["logf"], ref["logz"])
-                    delta = test_logz - ref_logz
+                    delta = test_logz[common_mask] - ref_logz[common_mask]
                     result["metrics"]["reference_mae_log10"] = float(np.mean(np.abs(delta)))
                     result["metrics"]["reference_max_log10"] = float(np.max(np.abs(delta)))
                 else:
@@ -1771,9 +2628,9 @@ class EisAnalysisTool:
             mae_ref = result["metrics"].get("reference_mae_log10")
             max_ref = result["metrics"].get("reference_max_log10")
             if mae_ref is not None and mae_ref > 0.22:
-                result["warnings"].append(f"Average deviation vs simulated reference is high ({mae_ref:.3f} decades).")
+                result["warnings"].append(f"Average deviation vs reference '{ref_name}' is high ({mae_ref:.3f} decades).")
             if max_ref is not None and max_ref > 0.55:
-                result["warnings"].append(f"Peak deviation vs simulated reference is high ({max_ref:.3f} decades).")
+                result["warnings"].append(f"Peak deviation vs reference '{ref_name}' is high ({max_ref:.3f} decades).")
 
             if result["warnings"]:
                 result["ok"] = False
@@ -1869,7 +2726,7 @@ class EisAnalysisTool:
             if warning_text:
                 badge_style = dict(boxstyle='round', facecolor=self.theme['diag_fail'], alpha=0.92)
 
-                if self.nyquist_enabled:
+                if self._nyquist_active():
                     if self.nyquist_quality_text is None:
                         self.nyquist_quality_text = self.nyquist_ax.text(
                             0.5, 0.04, warning_text,
@@ -1901,7 +2758,7 @@ class EisAnalysisTool:
                 if self.bode_quality_text is not None:
                     self.bode_quality_text.set_visible(False)
 
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 try:
                     self.nyquist_canvas.draw_idle()
                 except Exception:
@@ -1919,7 +2776,7 @@ class EisAnalysisTool:
             if status_text:
                 badge_style = dict(boxstyle='round', facecolor=self.theme['warning'], alpha=0.95)
 
-                if self.nyquist_enabled:
+                if self._nyquist_active():
                     if self.nyquist_calibration_text is None:
                         self.nyquist_calibration_text = self.nyquist_ax.text(
                             0.5, 0.90, status_text,
@@ -1951,7 +2808,7 @@ class EisAnalysisTool:
                 if self.bode_calibration_text is not None:
                     self.bode_calibration_text.set_visible(False)
 
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 try:
                     self.nyquist_canvas.draw_idle()
                 except Exception:
@@ -2080,10 +2937,11 @@ class EisAnalysisTool:
 
             self.clear_bode_threshold_indicator()
 
-            try:
-                self.nyquist_canvas.draw_idle()
-            except Exception:
-                pass
+            if self.nyquist_canvas is not None:
+                try:
+                    self.nyquist_canvas.draw_idle()
+                except Exception:
+                    pass
             try:
                 self.bode_canvas.draw_idle()
             except Exception:
@@ -2121,19 +2979,14 @@ class EisAnalysisTool:
         self.log_message(stage_text)
         self.log_message(separator)
     
-    def draw_plots(self, data):
+    def draw_plots(self, sweep):
         try:
-            freq, z_real, z_imag = data['frequency'], data['z_real'], data['z_imag']
-            self.latest_plot_data = {
-                'frequency': np.asarray(freq),
-                'z_real': np.asarray(z_real),
-                'z_imag': np.asarray(z_imag),
-            }
-            z_mag = np.sqrt(z_real**2 + z_imag**2)
-            z_imag_neg = -z_imag
+            self.latest_sweep = sweep
+            freq, z_real, z_mag = sweep.freq, sweep.z_real, sweep.magnitude
+            z_imag_neg = -sweep.z_imag
             
             # --- 1. Nyquist Plot ---
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 self.init_nyquist_plot() # Clears, sets formatters
                 self.nyquist_ax.plot(z_real, z_imag_neg, 'o-', markersize=4, color=self.theme["accent"])
                 self.nyquist_ax.plot_data = (z_real, z_imag_neg)
@@ -2146,6 +2999,8 @@ class EisAnalysisTool:
             self.init_bode_plot() 
             self.bode_ax_mag.loglog(freq, z_mag, 'o-', markersize=4, color=self.theme["accent"], zorder=10)
             self.bode_ax_mag.plot_data = (freq, z_mag)
+            self.bode_ax_phase.plot(freq, -sweep.phase_deg, 'o-', markersize=3, color=self.theme["accent"], zorder=10)
+            self._fit_phase_axis(-sweep.phase_deg)
             self.show_bode_threshold_indicator(freq, z_mag)
             self.bode_canvas.draw()
             
@@ -2156,8 +3011,12 @@ class EisAnalysisTool:
             self.log_message(f"Failed to draw plots: {e}")
 
     # --- New: Streaming load for Run Test ---
-    def start_run_test_thread(self):
-        """Starts a real EIS measurement using the connected PalmSens instrument."""
+    def start_run_test_thread(self, resume=False):
+        """Starts a real EIS measurement using the connected PalmSens instrument.
+
+        With resume=True an interrupted device sweep (pending_resume) is continued
+        instead of starting over.
+        """
         if self.connection_mode is None:
             self.log_message("ERROR: No device connected. Click Connect first.")
             return
@@ -2167,9 +3026,11 @@ class EisAnalysisTool:
         if self.measurement_in_progress:
             self.log_message("Measurement already in progress.")
             return
+        if self.tasks.active("device") is not None:
+            self.log_message(f"Device is busy: {self._device_busy_text()}")
+            return
 
-        self.measurement_in_progress = True
-        self.stop_requested = False
+        self.run_metrics.reset()
         self.measurement_start_time = time.time()
         self.last_point_time = self.measurement_start_time
         self.last_point_count = 0
@@ -2225,18 +3086,67 @@ class EisAnalysisTool:
             self._set_measurement_status("Starting calibration sequence (3 tests)...")
         else:
             self._set_measurement_status("Starting measurement...")
-        self.root.after(5000, self.measurement_watchdog_tick)
+        csv_path = os.path.join(os.path.dirname(__file__), "11_12_25_test5.csv")
         if self.connection_mode == "simulated":
-            csv_path = os.path.join(os.path.dirname(__file__), "11_12_25_test5.csv")
-            threading.Thread(target=self.stream_load_data, args=(csv_path,), daemon=True).start()
+            self._start_measurement_task(self.stream_load_data, csv_path)
         elif self.connection_mode == "messy":
-            csv_path = os.path.join(os.path.dirname(__file__), "11_12_25_test5.csv")
-            threading.Thread(target=self.stream_load_data_messy, args=(csv_path,), daemon=True).start()
+            self._start_measurement_task(self.stream_load_data_messy, csv_path)
         elif self.connection_mode == "calibration":
-            csv_path = os.path.join(os.path.dirname(__file__), "11_12_25_test5.csv")
-            threading.Thread(target=self.run_calibration_sequence, args=(csv_path,), daemon=True).start()
+            self._start_measurement_task(self.run_calibration_sequence, csv_path)
         else:
-            threading.Thread(target=self.run_real_eis_measurement, daemon=True).start()
+            partial, self.pending_resume = self.pending_resume, None
+            if partial is not None and not resume:
+                # A fresh sweep replaces the interrupted one; keep what it measured.
+                self._record_recovered_sweep(partial)
+                partial = None
+            # Fresh sweeps hold the device slot for the profile's expected time until their own ETA takes over.
+            expected = None
+            if partial is None:
+                try:
+                    expected = self.estimate_sweep_seconds()
+                except (KeyError, ValueError):
+                    pass
+            self._start_measurement_task(self.run_real_eis_measurement, resume=partial, expected_seconds=expected)
+
+    def resume_sweep(self):
+        """Continue the interrupted device sweep from its last completed frequency."""
+        if self.pending_resume is None:
+            self.log_message("No interrupted sweep to resume.")
+            return
+        if self.connection_mode not in ("sensit_bt", "sensit_usb") or self.ps_manager is None:
+            self.log_message("ERROR: Connect the instrument before resuming the sweep.")
+            return
+        self.start_run_test_thread(resume=True)
+
+    def _start_measurement_task(self, target, *args, **kwargs):
+        """Run a measurement path on the task runtime; buttons are restored by _on_measurement_task_done."""
+        self.sweep_progress = None  # set by device sweeps once their grid is known
+        self.measurement_task = self.tasks.submit(
+            target,
+            *args,
+            name=target.__name__,
+            slot="device",
+            on_done=self._on_measurement_task_done,
+            **kwargs,
+        )
+        self._refresh_top_action_buttons()
+        self.root.after(5000, self.measurement_watchdog_tick)
+
+    def _on_measurement_task_done(self, handle):
+        """Tk-thread cleanup shared by every measurement path, however it ended."""
+        if handle is not self.measurement_task:
+            return
+        if handle.exception() is not None:
+            self.log_message(f"Measurement failed: {handle.exception()}")
+            self._set_measurement_status("Measurement failed")
+            self._safe_set_shared_progress_text("0%")
+        self.run_test_btn.config(state="normal")
+        if self.connection_mode in ("sensit_bt", "sensit_usb") and self.ps_manager is not None:
+            self.calibrate_btn.config(state="normal")
+        else:
+            self.calibrate_btn.config(state="disabled")
+        self.stop_test_btn.config(state="disabled")
+        self._refresh_top_action_buttons()
 
     def request_stop_measurement(self):
         """Request cancellation of the active EIS measurement."""
@@ -2244,14 +3154,14 @@ class EisAnalysisTool:
             self.log_message("No active measurement to stop.")
             return
 
-        self.stop_requested = True
+        self.measurement_task.cancel("user")
         self.stop_test_btn.config(state="disabled")
         self._set_measurement_status("Stopping measurement...")
         if self.connection_mode in ("simulated", "messy", "calibration"):
             self.log_message("Stop requested for simulated test.")
         else:
             self.log_message("Stop requested. Sending stop signal to potentiostat...")
-            threading.Thread(target=self._send_stop_signal_to_instrument, daemon=True).start()
+            self._send_stop_signal_to_instrument()
             self.root.after(1200, self._force_stop_if_still_running)
 
     def _force_stop_if_still_running(self):
@@ -2266,14 +3176,49 @@ class EisAnalysisTool:
         except Exception:
             pass
 
-    def _interruptible_sleep(self, total_seconds, step_seconds=0.05):
-        """Sleep in short steps so stop requests can interrupt quickly."""
-        end_time = time.time() + max(0.0, float(total_seconds))
-        while time.time() < end_time:
-            if self.stop_requested:
-                return False
-            time.sleep(min(step_seconds, end_time - time.time()))
-        return True
+    def _interruptible_sleep(self, total_seconds):
+        """Sleep until total_seconds pass or a stop is requested (returns False if stopped)."""
+        return not self._measurement_token().wait(max(0.0, float(total_seconds)))
+
+    def _new_replay(self, freq, z_real, z_imag, times=None, duration=10.0):
+        """Clocked replay of a sweep, paced by EIS_REPLAY_SPEED and stopped by the measurement token."""
+        return replay.SweepReplay(
+            freq, z_real, z_imag,
+            times=times,
+            duration=duration,
+            speed=self.replay_speed,
+            stop_event=self._measurement_token().event,
+        )
+
+    def _post_replay_tick(self, replay_run, count, status_text, ui_state):
+        """Schedule progress and plot updates for count released points.
+
+        In fast mode the UI is refreshed at most ~30 times per second (and on the last
+        point) so the Tk queue is not flooded.
+        """
+        if replay_run.fast and count < replay_run.n:
+            now = time.monotonic()
+            if now - ui_state.get("last", 0.0) < 1.0 / 30.0:
+                return
+            ui_state["last"] = now
+        # Time-weighted, like device sweeps: the replay clock is the recorded time profile.
+        percent = replay_run.offsets[count - 1] / replay_run.offsets[-1] * 100.0 if count else 0.0
+        self.root.after(0, self._set_measurement_status, status_text)
+        self.root.after(0, self.progress_var.set, percent)
+        self.root.after(0, self._safe_set_shared_progress_text, f"{percent:.0f}%")
+        self.root.after(0, self.update_plots_incremental, replay_run.sweep_view(count))
+
+    @staticmethod
+    def _replay_times(df, valid=None, order=None):
+        """Recorded Time (s) column aligned with the filtered/sorted sweep, or None."""
+        if "Time (s)" not in df.columns:
+            return None
+        times = pd.to_numeric(df["Time (s)"], errors='coerce').to_numpy(dtype=float)
+        if valid is not None:
+            times = times[valid]
+        if order is not None:
+            times = times[order]
+        return times
 
     def start_calibration_thread(self):
         """Run 3 real calibration tests on connected Sensit BT instrument."""
@@ -2283,9 +3228,11 @@ class EisAnalysisTool:
         if self.measurement_in_progress:
             self.log_message("Measurement already in progress.")
             return
+        if self.tasks.active("device") is not None:
+            self.log_message(f"Device is busy: {self._device_busy_text()}")
+            return
 
-        self.measurement_in_progress = True
-        self.stop_requested = False
+        self.run_metrics.reset()
         self.measurement_start_time = time.time()
         self.last_point_time = self.measurement_start_time
         self.last_point_count = 0
@@ -2328,8 +3275,7 @@ class EisAnalysisTool:
 
         self.root.after(0, self.progress_var.set, 0.0)
         self._set_measurement_status("Starting calibration sequence (3 tests)...")
-        self.root.after(5000, self.measurement_watchdog_tick)
-        threading.Thread(target=self.run_real_calibration_sequence, daemon=True).start()
+        self._start_measurement_task(self.run_real_calibration_sequence)
 
     def run_real_calibration_sequence(self):
         """Execute 3 real EIS tests; first two are calibration passes, third is final."""
@@ -2354,7 +3300,6 @@ class EisAnalysisTool:
                 self.root.after(0, self._safe_set_shared_progress_text, "0%")
 
                 self.run_real_eis_measurement(
-                    manage_lifecycle=False,
                     is_calibration_stage=True,
                     calibration_stage=test_index,
                     calibration_total=3,
@@ -2369,12 +3314,6 @@ class EisAnalysisTool:
                     self._interruptible_sleep(0.6)
 
             self.root.after(0, self.show_calibration_status_on_plots, None)
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            if self.connection_mode in ("sensit_bt", "sensit_usb") and self.ps_manager is not None:
-                self.root.after(0, self.calibrate_btn.config, {"state": "normal"})
-            else:
-                self.root.after(0, self.calibrate_btn.config, {"state": "disabled"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
 
             if self.stop_requested:
                 self.root.after(0, self._set_measurement_status, "Calibration sequence stopped")
@@ -2386,22 +3325,11 @@ class EisAnalysisTool:
                 self.root.after(0, self._safe_set_shared_progress_text, "100%")
                 self.root.after(0, self._show_calibration_result_popup, True)
                 self.root.after(0, self.set_export_buttons_enabled, True)
-
-            self.measurement_in_progress = False
-            self.stop_requested = False
         except Exception as e:
             self.log_message(f"Real calibration sequence failed: {e}")
             self.root.after(0, self.show_calibration_status_on_plots, None)
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            if self.connection_mode in ("sensit_bt", "sensit_usb") and self.ps_manager is not None:
-                self.root.after(0, self.calibrate_btn.config, {"state": "normal"})
-            else:
-                self.root.after(0, self.calibrate_btn.config, {"state": "disabled"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self.progress_var.set, 0.0)
             self.root.after(0, self._safe_set_shared_progress_text, "0%")
-            self.measurement_in_progress = False
-            self.stop_requested = False
 
     def run_calibration_sequence(self, filepath):
         """Run simulated test three times; first two runs are calibration passes."""
@@ -2409,20 +3337,12 @@ class EisAnalysisTool:
             self.log_message(f"Starting calibration sequence using {filepath}")
             if not os.path.exists(filepath):
                 self.log_message("ERROR: CSV file not found in project directory.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             df = pd.read_csv(filepath)
             required_cols = {'Frequency (Hz)', "Z' (Ω)", "-Z'' (Ω)", "Z (Ω)", "-Phase (°)", "Time (s)"}
             if not required_cols.issubset(df.columns):
                 self.log_message("ERROR: CSV file is missing required columns for calibration mode.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             freq = pd.to_numeric(df['Frequency (Hz)'], errors='coerce').to_numpy(dtype=float)
@@ -2434,13 +3354,10 @@ class EisAnalysisTool:
             freq = freq[valid]
             z_real = z_real[valid]
             z_imag = z_imag[valid]
+            times = self._replay_times(df, valid)
 
             if len(freq) < 8:
                 self.log_message("ERROR: Not enough valid points for calibration mode.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             # Preserve simulated sweep direction (high -> low frequency)
@@ -2448,10 +3365,9 @@ class EisAnalysisTool:
             freq = freq[order]
             z_real = z_real[order]
             z_imag = z_imag[order]
+            times = None if times is None else times[order]
 
             n = len(freq)
-            total_time_per_test = 8.0
-            interval = total_time_per_test / max(n, 1)
 
             for test_index in range(1, 4):
                 if self.stop_requested:
@@ -2473,49 +3389,36 @@ class EisAnalysisTool:
                 self.root.after(0, self.progress_var.set, 0.0)
                 self.root.after(0, self._safe_set_shared_progress_text, "0%")
 
-                x_buf, yr_buf, yi_buf = [], [], []
-                for i in range(n):
-                    if self.stop_requested:
-                        self.log_message("Calibration sequence stopped by user.")
-                        break
-
-                    x_buf.append(freq[i])
-                    yr_buf.append(z_real[i])
-                    yi_buf.append(z_imag[i])
-
-                    percent = (i + 1) / n * 100.0
-                    if test_index < 3:
-                        self.root.after(0, self._set_measurement_status, f"Measuring: {i+1}/{n} points (Calibration {test_index}/3)")
-                    else:
-                        self.root.after(0, self._set_measurement_status, f"Measuring: {i+1}/{n} points (Final 3/3)")
-                    self.root.after(0, self.progress_var.set, percent)
-                    self.root.after(0, self._safe_set_shared_progress_text, f"{percent:.0f}%")
-                    self.root.after(0, self.update_plots_incremental, np.array(x_buf), np.array(yr_buf), np.array(yi_buf))
-                    if not self._interruptible_sleep(interval):
-                        break
+                # Each pass replays the recorded time profile squeezed into 8 seconds.
+                replay_run = self._new_replay(freq, z_real, z_imag, times=times, duration=8.0)
+                stage_text = f"Calibration {test_index}/3" if test_index < 3 else "Final 3/3"
+                ui_state = {}
+                for count in replay_run.ticks():
+                    self._post_replay_tick(replay_run, count, f"Measuring: {count}/{n} points ({stage_text})", ui_state)
 
                 if self.stop_requested:
+                    self.log_message("Calibration sequence stopped by user.")
                     break
+                sweep = replay_run.sweep_view()
 
                 if test_index < 3:
                     self.log_message(f"Calibration: Test {test_index}/3 complete.")
                     self.root.after(0, self.progress_var.set, 100.0)
                     self.root.after(0, self._safe_set_shared_progress_text, "100%")
-                    self._interruptible_sleep(0.6)
+                    if not replay_run.pause(0.6):
+                        break
                     continue
 
                 # Final pass: run diagnosis and quality checks.
                 self.root.after(0, self.show_calibration_status_on_plots, None)
-                current_freq = np.array(x_buf)
-                current_z_mag = np.sqrt(np.array(yr_buf) ** 2 + np.array(yi_buf) ** 2)
+                current_freq = sweep.freq
+                current_z_mag = sweep.magnitude
                 diagnosis_result = self.diagnose_coating(current_z_mag, current_freq)
                 self.log_message(f"Diagnosis: {diagnosis_result}")
                 self.report_bode_data_quality(current_freq, current_z_mag)
                 self.root.after(0, self.show_bode_threshold_indicator, current_freq, current_z_mag)
                 self.root.after(0, self.show_diagnosis_on_plots, diagnosis_result)
 
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             if self.stop_requested:
                 self.root.after(0, self.show_calibration_status_on_plots, None)
                 self.root.after(0, self._set_measurement_status, "Calibration sequence stopped")
@@ -2528,54 +3431,35 @@ class EisAnalysisTool:
                 self.root.after(0, self._safe_set_shared_progress_text, "100%")
                 self.root.after(0, self._show_calibration_result_popup, True)
                 self.root.after(0, self.set_export_buttons_enabled, True)
-
-            self.measurement_in_progress = False
-            self.stop_requested = False
         except Exception as e:
             self.log_message(f"Calibration sequence failed: {e}")
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self.progress_var.set, 0.0)
             self.root.after(0, self._safe_set_shared_progress_text, "0%")
-            self.measurement_in_progress = False
-            self.stop_requested = False
 
     def _send_stop_signal_to_instrument(self):
-        """Best-effort stop/abort command dispatch for different SDK versions."""
+        """Best-effort stop/abort command dispatch for different SDK versions (non-blocking)."""
         manager = self.ps_manager
         if manager is None:
             self.log_message("Stop request: no active instrument manager.")
             return
 
-        stop_method_names = (
-            'stop_measurement',
-            'abort_measurement',
-            'cancel_measurement',
-            'break_measurement',
-            'stop',
-            'abort',
+        def _on_result(outcome):
+            used, failures = outcome
+            for failure in failures:
+                self.log_message(f"Stop method {failure}")
+            if used is None:
+                self.log_message("No supported stop method found on this SDK version; you may need to disconnect to force-stop.")
+            else:
+                self.log_message(f"Stop signal sent using {used}.")
+
+        future = self.device_io.submit(AsyncInstrumentManager(self.device_io, manager).stop())
+        self.device_io.deliver(
+            future,
+            self._dispatch_to_ui,
+            _on_result,
+            lambda e: self.log_message(f"Stop request failed: {e}"),
         )
 
-        for method_name in stop_method_names:
-            method = getattr(manager, method_name, None)
-            if not callable(method):
-                continue
-            try:
-                method()
-                self.log_message(f"Stop signal sent using manager.{method_name}().")
-                return
-            except TypeError:
-                try:
-                    method(True)
-                    self.log_message(f"Stop signal sent using manager.{method_name}(True).")
-                    return
-                except Exception as e:
-                    self.log_message(f"Stop method {method_name} failed: {e}")
-            except Exception as e:
-                self.log_message(f"Stop method {method_name} failed: {e}")
-
-        self.log_message("No supported stop method found on this SDK version; you may need to disconnect to force-stop.")
-
     def measurement_watchdog_tick(self):
         """Periodic UI/log heartbeat while EIS measurement is running."""
         if not self.measurement_in_progress:
@@ -2583,36 +3467,106 @@ class EisAnalysisTool:
 
         now = time.time()
         count = self.last_point_count
-        n = max(self.expected_points, 1)
+        _percent, detail = self._measurement_progress(count)
 
-        self._set_measurement_status(f"Measuring: {count}/{n} points")
+        self._set_measurement_status(f"Measuring: {detail}")
 
         if now - self.last_progress_log_time >= 15.0:
             self.last_progress_log_time = now
-            self.log_message(f"Progress: {count}/{n} points scanned.")
+            self.log_message(f"Progress: {detail}.")
 
         self.root.after(5000, self.measurement_watchdog_tick)
 
-    def build_eis_method(self):
-        """Build EIS method from GUI parameters."""
+    def _measurement_progress(self, count):
+        """(percent, "i/n points[, about ETA left]") for count points of the running sweep.
+
+        With a duration model the percent is time-weighted (low frequencies take
+        longest) and the status carries the ETA, which also updates the device task's
+        expected run time for slot planning.
+        """
+        n = max(self.expected_points, 1)
+        progress = self.sweep_progress
+        if progress is None:
+            return min(100.0, (count / n) * 100.0), f"{count}/{n} points"
+        eta = progress.eta_seconds(count)
+        self._set_device_task_eta(eta)
+        return progress.fraction(count) * 100.0, f"{count}/{n} points, about {format_duration(eta)} left"
+
+    def _device_busy_text(self):
+        """Which job holds the device slot and, when it has an estimate, when the slot should be free."""
+        task = self.tasks.active("device")
+        if task is None:
+            return "wait for the current operation to finish."
+        free_in = self.tasks.expected_free_in("device")
+        if free_in is None:
+            return f"{task.name} is still running; wait for it to finish."
+        return f"{task.name} is still running, expected to finish in about {format_duration(free_in)}."
+
+    def _set_device_task_eta(self, remaining_seconds):
+        """Expected run time of the device task (tasks.expected_free_in) from the sweep's ETA."""
+        task = self.tasks.active("device")
+        if task is not None and task.started_at is not None:
+            task.expected_seconds = (time.monotonic() - task.started_at) + remaining_seconds
+
+    def planned_sweep_frequencies(self, values=None):
+        """The grid build_eis_method asks for, from a profile's values (default: the setup inputs)."""
+        if values is None:
+            values = {name: var.get() for name, var in self.param_vars.items()}
+        return synthetic_eis.sweep_frequencies(
+            float(values["Start Frequency (Hz)"]),
+            float(values["End Frequency (Hz)"]),
+            float(values["Points per Decade"]),
+        )
+
+    def estimate_sweep_seconds(self, profile_name=None):
+        """Expected device sweep time for a saved profile (default: the current inputs and profile)."""
+        if profile_name is None:
+            profile_name = self.current_profile_name.get().strip() or "Recommended"
+            values = None
+        else:
+            values = self.test_profiles[profile_name]
+        return self.durations.model(profile_name).sweep_seconds(self.planned_sweep_frequencies(values))
+
+    def build_eis_method(self, max_frequency=None, min_frequency=None, n_frequencies=None, amplitude_mv=None, resume_from=None):
+        """Build EIS method from GUI parameters.
+
+        With explicit max/min frequency and point count (targeted re-measurement scans)
+        only the amplitude comes from the GUI, unless given too, and expected_points is
+        left alone. resume_from (a journal ResumePlan) builds the reduced scan over the
+        interrupted run's remaining frequencies at that run's amplitude.
+        """
+        ps = palmsens_module()
         if ps is None:
             raise RuntimeError("PyPalmSens is not installed")
 
-        start_freq = float(self.param_vars["Start Frequency (Hz)"].get())
-        end_freq = float(self.param_vars["End Frequency (Hz)"].get())
-        amplitude_mv = float(self.param_vars["Voltage Amplitude (mV)"].get())
-        points_per_decade = float(self.param_vars["Points per Decade"].get())
+        if resume_from is not None:
+            max_frequency = resume_from.max_frequency
+            min_frequency = resume_from.min_frequency
+            n_frequencies = resume_from.scan_points
+            amplitude_mv = resume_from.amplitude_v * 1000.0
+
+        if amplitude_mv is None:
+            amplitude_mv = float(self.param_vars["Voltage Amplitude (mV)"].get())
+        amplitude_mv = float(amplitude_mv)
+        if n_frequencies is not None:
+            start_freq, end_freq = float(max_frequency), float(min_frequency)
+            n_frequencies = max(2, int(n_frequencies))
+        else:
+            start_freq = float(self.param_vars["Start Frequency (Hz)"].get())
+            end_freq = float(self.param_vars["End Frequency (Hz)"].get())
+            points_per_decade = float(self.param_vars["Points per Decade"].get())
+            if points_per_decade <= 0:
+                raise ValueError("Points per Decade must be > 0")
 
         if start_freq <= 0 or end_freq <= 0:
             raise ValueError("Start/End frequency must be positive")
         if start_freq <= end_freq:
             raise ValueError("Start Frequency must be greater than End Frequency")
-        if points_per_decade <= 0:
-            raise ValueError("Points per Decade must be > 0")
 
-        decades = np.log10(start_freq / end_freq)
-        n_frequencies = max(2, int(round(decades * points_per_decade)) + 1)
-        self.expected_points = n_frequencies
+        if n_frequencies is None:
+            decades = np.log10(start_freq / end_freq)
+            n_frequencies = max(2, int(round(decades * points_per_decade)) + 1)
+            self.expected_points = n_frequencies
 
         method = ps.ElectrochemicalImpedanceSpectroscopy(
             max_frequency=start_freq,
@@ -2624,9 +3578,115 @@ class EisAnalysisTool:
         )
         return method
 
-    def run_real_eis_measurement(self, manage_lifecycle=True, is_calibration_stage=False, calibration_stage=1, calibration_total=1, final_calibration_stage=True):
-        """Execute EIS measurement via PyPalmSens and stream callback data into plots."""
+    @staticmethod
+    def _datapoint_impedance(point):
+        """(freq, ZRe, ZIm) from one SDK data point; ZRe/ZIm are NaN while impedance is missing."""
+        freq = float(point.get('Frequency', np.nan))
+        zre = float(point.get('ZRe', np.nan))
+        zim = float(point.get('ZIm', np.nan))
+        z_mag = float(point.get('Z', np.nan))
+
+        # If ZRe/ZIm are NaN but Z (magnitude) is available, derive them
+        # This handles SDK batches where component data lags behind magnitude data
+        if (np.isnan(zre) or np.isnan(zim)) and not np.isnan(z_mag):
+            # Use Z as magnitude, and phase to construct components if available
+            phase = float(point.get('Phase', np.nan))  # in degrees, typically
+            if not np.isnan(phase):
+                phase_rad = np.radians(phase)
+                zre = z_mag * np.cos(phase_rad)
+                zim = -z_mag * np.sin(phase_rad)  # negative for -Z''
+            else:
+                # Fall back to using Z as real part, zero imaginary
+                zre = z_mag
+                zim = 0.0
+        return freq, zre, zim
+
+    def _remeasure_suspect_points(self, freq_buf, zre_buf, zim_buf, rows, lead_in=0):
+        """Re-measure the given buffer rows with short scans and merge the new values in place.
+
+        Returns the rows that were replaced. Rows a scan cannot reach (inside the lead-in
+        at the top of the sweep) are left out first; the rest are skipped when too many
+        are suspect, since that points at the setup rather than at a few bad readings.
+        """
+        if not rows:
+            return []
+        plans = remeasure_groups(freq_buf, [freq_buf[i] for i in rows], lead_in)
+        scanned = {target for _max_f, _min_f, _n, targets in plans for target in targets}
+        unreachable = [row for row in rows if float(freq_buf[row]) not in scanned]
+        if unreachable:
+            rows = [row for row in rows if float(freq_buf[row]) in scanned]
+            plans = remeasure_groups(freq_buf, [freq_buf[i] for i in rows], lead_in)
+            # Measured points keep their readings; gaps without one are dropped by the caller.
+            kept = [row for row in unreachable if np.isfinite(zre_buf[row]) and np.isfinite(zim_buf[row])]
+            if kept:
+                self.log_message(
+                    f"{len(kept)} suspect point(s) at the top of the sweep fall in the instrument's lead-in "
+                    "and keep their current values."
+                )
+        if not rows:
+            return []
+        if len(rows) > MAX_REMEASURE_POINTS:
+            self.log_message(
+                f"{len(rows)} suspect points is too many for a targeted re-measurement; check wiring and setup."
+            )
+            return []
+        self.log_message(f"Re-measuring {len(rows)} suspect point(s) in {len(plans)} short scan(s)...")
+        self.root.after(0, self._set_measurement_status, f"Re-measuring {len(rows)} point(s)")
+
+        replaced = []
+        manager = AsyncInstrumentManager(self.device_io, self.ps_manager)
+        for max_f, min_f, n_points, targets in plans:
+            if self.stop_requested:
+                break
+            collected = []
+
+            def _collect(data):
+                try:
+                    points = list(data.new_datapoints())
+                except Exception:
+                    last = data.last_datapoint()
+                    points = [last] if last else []
+                for point in points:
+                    if isinstance(point, dict):
+                        freq, zre, zim = self._datapoint_impedance(point)
+                        if freq > 0 and np.isfinite(zre) and np.isfinite(zim):
+                            collected.append((freq, zre, zim))
+
+            try:
+                method = self.build_eis_method(max_frequency=max_f, min_frequency=min_f, n_frequencies=n_points)
+                self.device_io.run(manager.measure(method, _collect))
+            except Exception as e:
+                self.log_message(f"Re-measurement scan failed: {e}")
+                continue
+            if not collected:
+                continue
+            # The scan lands on the sweep's own log-spaced grid; match within half a step.
+            tolerance = 0.5 * np.log10(max_f / min_f) / max(n_points - 1, 1)
+            got_log_f = np.log10([c[0] for c in collected])
+            target_log_f = np.log10(targets)
+            for row in rows:
+                row_log_f = np.log10(freq_buf[row])
+                if np.min(np.abs(target_log_f - row_log_f)) > tolerance:
+                    continue
+                nearest = int(np.argmin(np.abs(got_log_f - row_log_f)))
+                if abs(got_log_f[nearest] - row_log_f) <= tolerance:
+                    _, zre_buf[row], zim_buf[row] = collected[nearest]
+                    replaced.append(row)
+        self.run_metrics.incr("points_remeasured", len(replaced))
+        self.log_message(f"Re-measurement replaced {len(replaced)}/{len(rows)} suspect point(s).")
+        return replaced
+
+    def run_real_eis_measurement(self, is_calibration_stage=False, calibration_stage=1, calibration_total=1, final_calibration_stage=True, resume=None):
+        """Execute EIS measurement via PyPalmSens and stream callback data into plots.
+
+        resume is a RecoveredSweep from the sweep journal: its points seed the buffers,
+        only the frequencies below its last completed point are scanned, and points
+        are matched to the original grid so the stitched sweep has no duplicates.
+        """
         freq_buf, zre_buf, zim_buf = [], [], []
+        time_buf = []  # seconds since this run started; NaN for placeholder and carried-over rows
+        stream = SweepBuffer()  # streaming copy of the buffers; plot updates get head(n) views of it
+        started = time.monotonic()
         seen_points = set()
         last_freq_seen = [None]
         callback_call_count = [0]
@@ -2634,11 +3694,54 @@ class EisAnalysisTool:
         buffered_by_index = {}  # Map index -> (freq, zre, zim) for frequency-only points
         replay_queue = []  # Queue of buffered points to replay gradually
         last_replay_time = [time.time()]  # Track last replay time
+        # Per-point outlier flags while streaming; detector rows map to measured buffer rows only.
+        detector = StreamingOutlierDetector()
+        detector_rows = []
+        estimated_rows = []  # lead-in frequencies replayed with a placeholder impedance
+        gap_rows = []  # resumed sweeps: grid points missing from the buffers, NaN until re-measured
+        journal = None  # crash-safe copy of the buffers (not for calibration stages)
+        plan = None  # resumed sweeps: the original grid and which of its points are in the buffers
+        index_offset = 0  # resumed scans count SDK indices from their own first point
+
+        run_metrics = self.run_metrics
+
+        def flag_outliers(row):
+            detector_rows.append(row)
+            for k in detector.push(freq_buf[row], float(np.hypot(zre_buf[row], zim_buf[row]))):
+                run_metrics.incr("outliers_flagged")
+                self.events.info("callback", "Suspect point at {freq:.2e} Hz queued for re-measurement", freq=freq_buf[detector_rows[k]])
+
+        def journal_row(row, estimated=False):
+            if journal is not None:
+                journal.record(row, freq_buf[row], zre_buf[row], zim_buf[row], estimated)
+
+        if resume is not None:
+            plan = resume.resume_plan()
+            if plan is None:
+                # Nothing left to resume; keep what it measured instead of losing it.
+                self.root.after(0, self._record_recovered_sweep, resume)
+                raise ValueError("the interrupted sweep has nothing left to measure")
+            index_offset = plan.offset
+            freq_buf.extend(resume.freq.tolist())
+            zre_buf.extend(resume.z_real.tolist())
+            zim_buf.extend(resume.z_imag.tolist())
+            time_buf.extend([float('nan')] * len(resume))
+            estimated_rows.extend(resume.estimated)
+            stream.extend(freq_buf, zre_buf, zim_buf)
+            for row in range(len(freq_buf)):
+                if row not in resume.estimated:
+                    flag_outliers(row)
+            self.root.after(0, self.update_plots_incremental, stream.head())
 
         def eis_callback(data):
+            cb_start = time.perf_counter()
             try:
                 callback_call_count[0] += 1
                 call_num = callback_call_count[0]
+                # Raw structure dumps are limited to the first few calls; per-point trace events
+                # are cheap guards that only build fields when "callback" tracing is enabled.
+                trace_points = self.events.is_enabled(event_log.DEBUG, "callback")
+                trace = trace_points and call_num <= 8
 
                 if self.stop_requested:
                     return
@@ -2646,41 +3749,43 @@ class EisAnalysisTool:
                 points = []
 
                 # Log raw callback structure for first few processed calls (after skip)
-                if call_num <= 8:
-                    self.log_message(f"[DEBUG Callback #{call_num}] data type: {type(data).__name__}, dir: {[x for x in dir(data) if not x.startswith('_')]}")
+                if trace:
+                    self.events.debug(
+                        "callback", "Callback #{call}: data type {data_type}, attributes {attrs}",
+                        call=call_num, data_type=type(data).__name__, attrs=[x for x in dir(data) if not x.startswith('_')],
+                    )
 
                 # Primary path: batched points from SDK callback
                 try:
                     points = list(data.new_datapoints())
-                    if points and call_num <= 8:
-                        self.log_message(f"[DEBUG Callback #{call_num}] new_datapoints() returned {len(points)} point(s)")
-                        for i, pt in enumerate(points[:1]):
-                            self.log_message(f"[DEBUG Callback #{call_num}] point[0] keys: {list(pt.keys()) if isinstance(pt, dict) else 'N/A'}")
-                            if isinstance(pt, dict):
-                                # Log ALL fields from the point
-                                for k in pt.keys():
-                                    v = pt.get(k)
-                                    self.log_message(f"[DEBUG Callback #{call_num}]   {k}={v}")
+                    if points and trace:
+                        pt = points[0]
+                        self.events.debug(
+                            "callback", "Callback #{call}: new_datapoints() returned {count} point(s); first point {point}",
+                            call=call_num, count=len(points), point=dict(pt) if isinstance(pt, dict) else repr(pt),
+                        )
                 except Exception as e:
-                    if call_num <= 8:
-                        self.log_message(f"[DEBUG Callback #{call_num}] new_datapoints() failed: {e}")
+                    if trace:
+                        self.events.debug("callback", "Callback #{call}: new_datapoints() failed: {error}", call=call_num, error=str(e))
                     points = []
 
                 # Fallback path: some SDK/transport paths may only expose last point
                 if not points:
                     try:
                         last = data.last_datapoint()
-                        if last and call_num <= 8:
-                            self.log_message(f"[DEBUG Callback #{call_num}] last_datapoint() returned: {last}")
+                        if last and trace:
+                            self.events.debug("callback", "Callback #{call}: last_datapoint() returned {point}", call=call_num, point=last)
                         if last:
                             points = [last]
                     except Exception as e:
-                        if call_num <= 8:
-                            self.log_message(f"[DEBUG Callback #{call_num}] last_datapoint() failed: {e}")
+                        if trace:
+                            self.events.debug("callback", "Callback #{call}: last_datapoint() failed: {error}", call=call_num, error=str(e))
                         points = []
 
-                if not points and call_num <= 8:
-                    self.log_message(f"[DEBUG Callback #{call_num}] WARNING: No points extracted.")
+                if not points and trace:
+                    self.events.debug("callback", "Callback #{call}: no points extracted", call=call_num)
+                run_metrics.incr("callback_points", len(points))
+                run_metrics.peak("points_per_callback", len(points))
 
                 # Gradually replay buffered frequencies (add a few from the queue each callback)
                 current_time = time.time()
@@ -2694,6 +3799,10 @@ class EisAnalysisTool:
                         freq_buf.append(buff_freq)
                         zre_buf.append(buff_zre)
                         zim_buf.append(buff_zim)
+                        time_buf.append(float('nan'))
+                        stream.append(buff_freq, buff_zre, buff_zim)
+                        estimated_rows.append(len(freq_buf) - 1)
+                        journal_row(len(freq_buf) - 1, estimated=True)
                         last_freq_seen[0] = buff_freq
                         last_replay_time[0] = current_time
 
@@ -2701,29 +3810,12 @@ class EisAnalysisTool:
                     if not isinstance(point, dict):
                         continue
 
-                    freq = float(point.get('Frequency', np.nan))
-                    zre = float(point.get('ZRe', np.nan))
-                    zim = float(point.get('ZIm', np.nan))
-                    z_mag = float(point.get('Z', np.nan))
-                    
-                    # If ZRe/ZIm are NaN but Z (magnitude) is available, derive them
-                    # This handles SDK batches where component data lags behind magnitude data
-                    if (np.isnan(zre) or np.isnan(zim)) and not np.isnan(z_mag):
-                        # Use Z as magnitude, and phase to construct components if available
-                        phase = float(point.get('Phase', np.nan))  # in degrees, typically
-                        if not np.isnan(phase):
-                            phase_rad = np.radians(phase)
-                            zre = z_mag * np.cos(phase_rad)
-                            zim = -z_mag * np.sin(phase_rad)  # negative for -Z''
-                        else:
-                            # Fall back to using Z as real part, zero imaginary
-                            zre = z_mag
-                            zim = 0.0
-                    
+                    freq, zre, zim = self._datapoint_impedance(point)
+
                     # Reject if no frequency
                     if np.isnan(freq):
-                        if call_num <= 8:
-                            self.log_message(f"[DEBUG Callback #{call_num}] Skipped: freq=NaN (no frequency data)")
+                        if trace_points:
+                            self.events.debug("callback", "Callback #{call}: skipped point without frequency", call=call_num)
                         continue
                     
                     idx = point.get('index')
@@ -2731,31 +3823,45 @@ class EisAnalysisTool:
                     # If impedance is missing, buffer this frequency point by index for later gradual replay
                     if (np.isnan(zre) or np.isnan(zim)):
                         if idx is not None and not impedance_started[0]:
-                            if call_num <= 8:
-                                self.log_message(f"[DEBUG Callback #{call_num}] Buffering: freq={freq:.2e} Hz, index={idx}")
+                            if trace_points:
+                                self.events.debug(
+                                    "callback", "Callback #{call}: buffering freq={freq:.2e} Hz, index={index}",
+                                    call=call_num, freq=freq, index=idx,
+                                )
                             buffered_by_index[idx] = (freq, float('nan'), float('nan'))
                         continue
                     
                     # Impedance arrived! Start plotting and queue buffered frequencies for gradual replay
                     if not impedance_started[0]:
                         impedance_started[0] = True
-                        self.log_message(f"Impedance data detected at frequency {freq:.2e} Hz (index {idx}). Queuing buffered frequencies for gradual replay...")
+                        self.events.info(
+                            "callback", "Impedance data detected at {freq:.2e} Hz (index {index}); replaying {buffered} buffered frequencies",
+                            freq=freq, index=idx, buffered=len(buffered_by_index),
+                        )
                         
+                        if journal is not None and plan is None:
+                            journal.note(lead_in=len(buffered_by_index))
                         # Queue up all buffered frequencies (in sorted index order) for gradual replay
                         for buff_idx in sorted(buffered_by_index.keys()):
                             buff_freq, _, _ = buffered_by_index[buff_idx]
+                            # A resumed scan's lead-in falls on frequencies that are already measured.
+                            if plan is not None and not plan.claim(buff_freq):
+                                continue
                             # Use current impedance as estimate
                             replay_queue.append((buff_freq, zre, zim))
                         buffered_by_index.clear()
+                        run_metrics.peak("replay_queue_depth", len(replay_queue))
 
                     # Some SDK paths can reuse/reshape point indices, so dedupe by data signature.
                     if idx is not None:
-                        sig = (int(idx), round(freq, 8))
+                        sig = (int(idx) + index_offset, round(freq, 8))
                     else:
                         sig = (round(freq, 8), round(zre, 6), round(zim, 6))
-                    if sig in seen_points:
-                        if call_num <= 8:
-                            self.log_message(f"[DEBUG Callback #{call_num}] Dedupe skipped freq={freq:.2e} Hz (already seen)")
+                    # Resumed scans also skip grid points that are already in the buffers.
+                    if sig in seen_points or (plan is not None and not plan.claim(freq)):
+                        run_metrics.incr("dedupe_hits")
+                        if trace_points:
+                            self.events.debug("callback", "Callback #{call}: dedupe skipped freq={freq:.2e} Hz", call=call_num, freq=freq)
                         continue
                     seen_points.add(sig)
 
@@ -2764,27 +3870,55 @@ class EisAnalysisTool:
                     freq_buf.append(freq)
                     zre_buf.append(zre)
                     zim_buf.append(zim)
+                    time_buf.append(time.monotonic() - started)
+                    stream.append(freq, zre, zim, time_buf[-1])
+                    flag_outliers(len(freq_buf) - 1)
+                    journal_row(len(freq_buf) - 1)
                     self.last_point_time = time.time()
 
                     i = len(freq_buf)
                     self.last_point_count = i
-                    n = max(self.expected_points, 1)
-                    percent = min(100.0, (i / n) * 100.0)
+                    percent, detail = self._measurement_progress(i)
                     self.root.after(0, self.progress_var.set, percent)
-                    self.root.after(0, self._set_measurement_status, f"Measuring: {i}/{n} points")
+                    self.root.after(0, self._set_measurement_status, f"Measuring: {detail}")
                     self.root.after(0, self._safe_set_shared_progress_text, f"{percent:.0f}%")
                     
                     # Throttle plot updates to prevent overwhelming the UI and blocking mouse events
                     current_time = time.time() * 1000  # ms
                     if current_time - self.last_plot_update_time >= 100:  # Update max every 100ms
                         self.last_plot_update_time = current_time
-                        self.root.after(0, self.update_plots_incremental, np.array(freq_buf), np.array(zre_buf), np.array(zim_buf))
+                        self.root.after(0, self.update_plots_incremental, stream.head(i))
             except Exception as cb_err:
-                self.log_message(f"Callback error: {cb_err}")
+                run_metrics.incr("callback_errors")
+                self.events.warning("callback", "Callback error: {error}", error=str(cb_err))
+            finally:
+                run_metrics.add_time("eis_callback", time.perf_counter() - cb_start)
 
         try:
-            method = self.build_eis_method()
-            if is_calibration_stage:
+            if plan is not None:
+                self.log_message(
+                    f"Resuming interrupted sweep from {resume.header.get('started', '?')}: "
+                    f"{len(freq_buf)} saved point(s), {plan.remaining} frequencies left."
+                )
+                # Only gaps left (no frequencies below the last completed one): nothing to scan.
+                method = self.build_eis_method(resume_from=plan) if plan.scan_points else None
+                self.expected_points = plan.grid.size
+            else:
+                method = self.build_eis_method()
+            if not is_calibration_stage:
+                journal = self._open_sweep_journal(method, resume)
+            if method is not None:
+                profile = self.current_profile_name.get().strip() or "Recommended"
+                model = self.durations.model(profile)
+                grid = plan.grid if plan is not None else np.logspace(
+                    np.log10(method.max_frequency), np.log10(method.min_frequency), method.n_frequencies
+                )
+                self.sweep_progress = SweepProgress(model, grid, done=len(freq_buf))
+                self._set_device_task_eta(self.sweep_progress.remaining)
+                self.log_message(f"Estimated sweep time: about {format_duration(self.sweep_progress.remaining)} ({model.describe()}).")
+            if method is None:
+                pass
+            elif is_calibration_stage:
                 self.log_message(
                     f"Running calibration stage {calibration_stage}/{calibration_total} over Bluetooth: "
                     f"fmax={method.max_frequency:.2e} Hz, fmin={method.min_frequency:.2e} Hz, "
@@ -2797,8 +3931,14 @@ class EisAnalysisTool:
                     f"Vac={method.ac_potential:.3f} V"
                 )
 
-            measurement = self.ps_manager.measure(method, callback=eis_callback)
-            self.log_message(f"Measurement finished: {measurement.title}")
+            # Not cancellable from here: the SDK call returns after the stop signal / force-stop,
+            # and the "device" slot stays held until it does.
+            if method is not None:
+                measurement = self.device_io.run(AsyncInstrumentManager(self.device_io, self.ps_manager).measure(method, eis_callback))
+                self.log_message(f"Measurement finished: {measurement.title}")
+                if self.ps_manager is None and not is_calibration_stage and len(freq_buf) < self.expected_points:
+                    # Force-stopped (disconnected) mid-sweep: handled like a dropped link so it can be resumed.
+                    raise ConnectionError("instrument disconnected before the sweep finished")
 
             # Flush any remaining queued replay points
             for buff_freq, buff_zre, buff_zim in replay_queue:
@@ -2808,18 +3948,61 @@ class EisAnalysisTool:
                     freq_buf.append(buff_freq)
                     zre_buf.append(buff_zre)
                     zim_buf.append(buff_zim)
+                    time_buf.append(float('nan'))
+                    estimated_rows.append(len(freq_buf) - 1)
+                    journal_row(len(freq_buf) - 1, estimated=True)
             replay_queue.clear()
 
+            lead_in = plan.lead_in if plan is not None and plan.lead_in else len(estimated_rows)
+            if plan is not None and not self.stop_requested:
+                # Grid points missing above the resumed scan (or dropped during it) join the re-measurement.
+                for gap_freq in plan.gaps():
+                    freq_buf.append(gap_freq)
+                    zre_buf.append(float('nan'))
+                    zim_buf.append(float('nan'))
+                    time_buf.append(float('nan'))
+                    gap_rows.append(len(freq_buf) - 1)
+
+            # Targeted re-measurement of flagged points and resume gaps. Lead-in placeholders sit at
+            # the top of the sweep, inside every scan's own lead-in, so they are not re-measured.
+            suspect_rows = sorted(set(detector_rows[k] for k in detector.finish()) | set(gap_rows))
+            if suspect_rows and not self.stop_requested:
+                # Only replaced rows are re-journaled; they now hold measured values.
+                for row in self._remeasure_suspect_points(freq_buf, zre_buf, zim_buf, suspect_rows, lead_in=lead_in):
+                    journal_row(row)
+
+            if plan is not None:
+                # One descending sweep; gap points that could not be re-measured are dropped.
+                order = sorted(
+                    (row for row in range(len(freq_buf)) if np.isfinite(zre_buf[row]) and np.isfinite(zim_buf[row])),
+                    key=lambda row: -freq_buf[row],
+                )
+                freq_buf[:] = [freq_buf[row] for row in order]
+                zre_buf[:] = [zre_buf[row] for row in order]
+                zim_buf[:] = [zim_buf[row] for row in order]
+                time_buf[:] = [time_buf[row] for row in order]
+
+            # The journal is deleted once the run history with this run is on disk.
+            if journal is not None:
+                if len(freq_buf) > 0:
+                    self.root.after(0, self._finished_journals.append, journal)
+                else:
+                    journal.discard()
+            elif resume is not None:
+                # Resumed without a new journal: the interrupted one goes once this run is saved.
+                self.root.after(0, self._finished_journals.append, resume)
+
             if len(freq_buf) > 0:
-                z_mag = np.sqrt(np.array(zre_buf) ** 2 + np.array(zim_buf) ** 2)
+                sweep = Sweep.from_components(freq_buf, zre_buf, zim_buf, time_buf)
+                z_mag = sweep.magnitude
                 # Final plot update to show all data
-                self.root.after(0, self.update_plots_incremental, np.array(freq_buf), np.array(zre_buf), np.array(zim_buf))
+                self.root.after(0, self.update_plots_incremental, sweep)
                 if (not is_calibration_stage) or final_calibration_stage:
-                    diagnosis_result = self.diagnose_coating(z_mag, np.array(freq_buf))
+                    diagnosis_result = self.diagnose_coating(z_mag, sweep.freq)
                     self.log_message(f"Diagnosis: {diagnosis_result}")
-                    self.report_bode_data_quality(np.array(freq_buf), z_mag)
-                    self.root.after(0, self.record_run_history, self._current_mode_label(), np.array(freq_buf), z_mag)
-                    self.root.after(0, self.show_bode_threshold_indicator, np.array(freq_buf), z_mag)
+                    self.report_bode_data_quality(sweep.freq, z_mag)
+                    self.root.after(0, self.record_run_history, self._current_mode_label(), sweep.freq, z_mag, sweep.z_real, sweep.z_imag, sweep.time_s)
+                    self.root.after(0, self.show_bode_threshold_indicator, sweep.freq, z_mag)
                     self.root.after(0, self.show_diagnosis_on_plots, diagnosis_result)
 
             if self.stop_requested:
@@ -2831,6 +4014,20 @@ class EisAnalysisTool:
                 self.root.after(0, self.set_export_buttons_enabled, True)
             self.root.after(0, self._safe_set_shared_progress_text, "100%" if not self.stop_requested else "Stopped")
         except Exception as e:
+            if journal is not None:
+                # A dropped link or a force-stop leaves the partial sweep resumable.
+                journal.close()
+                try:
+                    partial = read_journal(journal.path) if freq_buf else None
+                except OSError:
+                    partial = None
+                if partial is not None and partial.resume_plan() is not None:
+                    self.root.after(0, self._offer_resume, partial)
+                else:
+                    journal.discard()
+            elif resume is not None:
+                # Failed before the resumed journal took over; the interrupted sweep is still on disk.
+                self.root.after(0, self._offer_resume, resume)
             if self.stop_requested:
                 self.log_message("Measurement stop completed.")
                 self.root.after(0, self._set_measurement_status, "Measurement stopped")
@@ -2839,81 +4036,162 @@ class EisAnalysisTool:
                 self.root.after(0, self.progress_var.set, 0.0)
                 self.root.after(0, self._set_measurement_status, "Measurement failed")
             self.root.after(0, self._safe_set_shared_progress_text, "0%" if not self.stop_requested else "Stopped")
-        finally:
-            if manage_lifecycle:
-                self.measurement_in_progress = False
-                self.stop_requested = False
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                if self.connection_mode in ("sensit_bt", "sensit_usb") and self.ps_manager is not None:
-                    self.root.after(0, self.calibrate_btn.config, {"state": "normal"})
-                else:
-                    self.root.after(0, self.calibrate_btn.config, {"state": "disabled"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
 
-    def stream_load_data(self, filepath):
-        """Reads CSV then streams data points progressively over the sample time."""
+    def _open_sweep_journal(self, method, resume=None):
+        """Start the crash-safe journal for a device sweep; None (logged) when it cannot be written."""
+        if resume is not None:
+            # Keep the original grid and start time so a resumed run can itself be resumed.
+            header = {key: value for key, value in resume.header.items() if key != "journal"}
+            header.update(run_id=self._new_run_id(), resumed_from=resume.run_id)
+            rows = resume.rows()
+        else:
+            header = {
+                "run_id": self._new_run_id(),
+                "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "mode": self._current_mode_label(),
+                "profile": self.current_profile_name.get().strip() or "Recommended",
+                "asset_id": normalize_asset_id(self.asset_id_var.get()),
+                "method": {
+                    "max_frequency": float(method.max_frequency),
+                    "min_frequency": float(method.min_frequency),
+                    "n_frequencies": int(method.n_frequencies),
+                    "ac_potential": float(method.ac_potential),
+                },
+            }
+            rows = ()
         try:
-            self.log_message(f"Starting test using {filepath}")
-            if not os.path.exists(filepath):
-                self.log_message("ERROR: CSV file not found in project directory.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                return
-
-            df = pd.read_csv(filepath)
+            journal = SweepJournal(self.journal_dir, header, rows)
+        except Exception as e:
+            self.log_message(f"Sweep journal unavailable; continuing without crash recovery: {e}")
+            return None
+        if resume is not None:
+            resume.discard()  # its points are durable in the new journal
+        return journal
+
+    def _offer_resume(self, partial):
+        """Keep an interrupted device sweep for Resume Sweep (Tk thread)."""
+        if self.pending_resume is not None and self.pending_resume is not partial:
+            self._record_recovered_sweep(self.pending_resume)
+        self.pending_resume = partial
+        plan = partial.resume_plan()
+        self.log_message(
+            f"Sweep interrupted after {len(partial)} point(s) (saved in the sweep journal). "
+            f"Reconnect if needed and press Resume Sweep to measure the remaining {plan.remaining} frequencies."
+        )
+        self._refresh_top_action_buttons()
 
-            required_cols = {'Frequency (Hz)', "Z' (Ω)", "-Z'' (Ω)", "Z (Ω)", "-Phase (°)", "Time (s)"}
-            if not required_cols.issubset(df.columns):
-                self.log_message("ERROR: CSV file is missing required columns for streaming test.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                return
+    def _recover_interrupted_sweeps(self):
+        """Put runs that never finished back into the history; offer to resume the latest one."""
+        try:
+            recovered = recover_journals(self.journal_dir)
+        except Exception as e:
+            self.log_message(f"Could not read sweep journals: {e}")
+            return
+        for position, sweep in enumerate(recovered):
+            last = sweep.last_completed_frequency()
+            if last is None:
+                sweep.discard()
+                continue
+            started = sweep.header.get("started", "unknown time")
+            self.log_message(f"Recovered interrupted sweep from {started}: {len(sweep)} point(s), measured down to {last:.2e} Hz.")
+            plan = sweep.resume_plan()
+            if position == len(recovered) - 1 and plan is not None and messagebox.askyesno(
+                "Interrupted Sweep",
+                f"A sweep started {started} was interrupted after {len(sweep)} point(s) "
+                f"(down to {last:.2e} Hz).\n\nKeep it to finish with Resume Sweep once the instrument is connected?\n"
+                "Choose No to keep the partial sweep in the run history.",
+            ):
+                asset_id = sweep.header.get("asset_id")
+                self.asset_id_var.set("" if asset_id in (None, UNASSIGNED) else asset_id)
+                profile = sweep.header.get("profile")
+                if profile in self.test_profiles:
+                    self.current_profile_name.set(profile)
+                    self._apply_profile_to_inputs(profile, log_change=False)
+                self._offer_resume(sweep)
+                continue
+            self._record_recovered_sweep(sweep)
+
+    def _record_recovered_sweep(self, sweep):
+        """History entry for an interrupted sweep; its journal goes with the next history save."""
+        header = sweep.header
+        self._finished_journals.append(sweep)
+        self.record_run_history(
+            f"{header.get('mode', 'Unknown Mode')} (interrupted)",
+            sweep.freq,
+            np.hypot(sweep.z_real, sweep.z_imag),
+            sweep.z_real,
+            sweep.z_imag,
+            timestamp=header.get("started") or time.strftime("%Y-%m-%d %H:%M:%S"),
+            profile=header.get("profile") or "Recommended",
+            asset_id=normalize_asset_id(header.get("asset_id")),
+            diagnosis="Interrupted sweep (not diagnosed)",
+            quality="Recovered from sweep journal",
+            metrics={},
+            interrupted=True,
+        )
 
-            freq = df['Frequency (Hz)'].to_numpy()
-            z_real = df["Z' (Ω)"].to_numpy()
-            z_imag_neg = df["-Z'' (Ω)"].to_numpy()
-            z_imag = -z_imag_neg
+    def _synthetic_sweep_frequencies(self):
+        """Frequency grid from the setup parameters (falls back to 10 kHz .. 10 mHz, 10/decade)."""
+        try:
+            return synthetic_eis.sweep_frequencies(
+                float(self.param_vars["Start Frequency (Hz)"].get()),
+                float(self.param_vars["End Frequency (Hz)"].get()),
+                float(self.param_vars["Points per Decade"].get()),
+            )
+        except Exception:
+            return synthetic_eis.sweep_frequencies()
 
-            n = len(freq)
-            # Streaming duration is fixed at 10 seconds total
-            total_time = 10.0
-            interval = total_time / max(n, 1)
+    def stream_load_data(self, filepath):
+        """Reads CSV (or a synthetic scenario) then streams data points progressively over the sample time."""
+        try:
+            scenario = self.simulation_scenario
+            if scenario and scenario not in synthetic_eis.SCENARIOS:
+                self.log_message(f"Unknown simulation scenario '{scenario}'; using the built-in CSV.")
+                scenario = None
+
+            if scenario:
+                self.log_message(f"Starting test using synthetic scenario '{scenario}'")
+                freq, z_real, z_imag, _band = synthetic_eis.single_sweep(scenario, freq=self._synthetic_sweep_frequencies())
+                times = None
+            else:
+                self.log_message(f"Starting test using {filepath}")
+                if not os.path.exists(filepath):
+                    self.log_message("ERROR: CSV file not found in project directory.")
+                    return
 
-            # Stream points
-            x_buf = []
-            yr_buf = []
-            yi_buf = []
+                df = pd.read_csv(filepath)
 
-            for i in range(n):
-                if self.stop_requested:
-                    self.log_message("Simulated measurement stopped by user.")
-                    break
+                required_cols = {'Frequency (Hz)', "Z' (Ω)", "-Z'' (Ω)", "Z (Ω)", "-Phase (°)", "Time (s)"}
+                if not required_cols.issubset(df.columns):
+                    self.log_message("ERROR: CSV file is missing required columns for streaming test.")
+                    return
 
-                x_buf.append(freq[i])
-                yr_buf.append(z_real[i])
-                yi_buf.append(z_imag[i])
-
-                # Update progress label on main thread
-                percent = (i+1) / n * 100.0
-                self.root.after(0, self._set_measurement_status, f"Measuring: {i+1}/{n} points")
-                # Update progress variable
-                self.root.after(0, self.progress_var.set, percent)
-                # Update shared progress label if present
-                self.root.after(0, self._safe_set_shared_progress_text, f"{percent:.0f}%")
-
-                # Update plots with current subset
-                self.root.after(0, self.update_plots_incremental, np.array(x_buf), np.array(yr_buf), np.array(yi_buf))
-                if not self._interruptible_sleep(interval):
-                    break
+                freq = df['Frequency (Hz)'].to_numpy()
+                z_real = df["Z' (Ω)"].to_numpy()
+                z_imag_neg = df["-Z'' (Ω)"].to_numpy()
+                z_imag = -z_imag_neg
+                times = self._replay_times(df)
+
+            # Demo pacing squeezes the recorded time profile into 10 seconds (see replay.py).
+            replay_run = self._new_replay(freq, z_real, z_imag, times=times, duration=10.0)
+            n = replay_run.n
+            ui_state = {}
+            for count in replay_run.ticks():
+                self._post_replay_tick(replay_run, count, f"Measuring: {count}/{n} points", ui_state)
+            if self.stop_requested:
+                self.log_message("Simulated measurement stopped by user.")
 
-            if len(x_buf) > 0:
+            sweep = replay_run.sweep_view()
+            if len(sweep) > 0:
                 self.log_message("Test complete. Full data loaded." if not self.stop_requested else "Test stopped.")
                 # Determine coating health based on the measured impedance magnitude
                 try:
-                    current_z_mag = np.sqrt(np.array(yr_buf)**2 + np.array(yi_buf)**2)
-                    current_freq = np.array(x_buf)
+                    current_z_mag = sweep.magnitude
+                    current_freq = sweep.freq
                     diagnosis_result = self.diagnose_coating(current_z_mag, current_freq)
                     self.log_message(f"Diagnosis: {diagnosis_result}")
                     self.report_bode_data_quality(current_freq, current_z_mag)
-                    self.root.after(0, self.record_run_history, self._current_mode_label(), current_freq, current_z_mag)
+                    self.root.after(0, self.record_run_history, self._current_mode_label(), current_freq, current_z_mag, sweep.z_real, sweep.z_imag, sweep.time_s)
                     self.root.after(0, self.show_bode_threshold_indicator, current_freq, current_z_mag)
                     # Show diagnosis visually on plots
                     self.root.after(0, self.show_diagnosis_on_plots, diagnosis_result)
@@ -2923,24 +4201,15 @@ class EisAnalysisTool:
             # destroy shared progress UI if present
             self.root.after(0, self._destroy_shared_progress_ui)
             # Re-enable button and reset progress
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self._set_measurement_status, "Test finished" if not self.stop_requested else "Measurement stopped")
             if not self.stop_requested:
                 self.root.after(0, self.progress_var.set, 100.0)
                 self.root.after(0, self.set_export_buttons_enabled, True)
             self.root.after(0, self._safe_set_shared_progress_text, "100%" if not self.stop_requested else "Stopped")
-            self.measurement_in_progress = False
-            self.stop_requested = False
-
         except Exception as e:
             self.log_message(f"Error streaming test data: {e}")
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self.progress_var.set, 0.0)
             self.root.after(0, self._safe_set_shared_progress_text, "0%")
-            self.measurement_in_progress = False
-            self.stop_requested = False
 
     def stream_load_data_messy(self, filepath):
         """Stream a noisy/distorted variant of built-in simulated data for setup quality testing."""
@@ -2948,20 +4217,12 @@ class EisAnalysisTool:
             self.log_message(f"Starting messy-data test using {filepath}")
             if not os.path.exists(filepath):
                 self.log_message("ERROR: CSV file not found in project directory.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             df = pd.read_csv(filepath)
             required_cols = {'Frequency (Hz)', "Z' (Ω)", "-Z'' (Ω)", "Z (Ω)", "-Phase (°)", "Time (s)"}
             if not required_cols.issubset(df.columns):
                 self.log_message("ERROR: CSV file is missing required columns for messy streaming test.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             freq = pd.to_numeric(df['Frequency (Hz)'], errors='coerce').to_numpy(dtype=float)
@@ -2973,13 +4234,10 @@ class EisAnalysisTool:
             freq = freq[valid]
             z_real_base = z_real_base[valid]
             z_imag_base = z_imag_base[valid]
+            times = self._replay_times(df, valid)
 
             if len(freq) < 8:
                 self.log_message("ERROR: Not enough valid points to generate messy data.")
-                self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-                self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
-                self.measurement_in_progress = False
-                self.stop_requested = False
                 return
 
             rng = np.random.default_rng(20260226)
@@ -2988,106 +4246,66 @@ class EisAnalysisTool:
             freq = freq[order]
             z_real_base = z_real_base[order]
             z_imag_base = z_imag_base[order]
+            times = None if times is None else times[order]
 
-            # Build stronger "bad connection" artifacts: heavy ripple, drift, broadband noise, and spikes.
-            normalized = np.linspace(0.0, 1.0, len(freq))
-            ripple = 0.42 * np.sin(2 * np.pi * 5.1 * normalized)
-            drift = 0.55 * (normalized - 0.5)
-            burst = 0.18 * np.sign(np.sin(2 * np.pi * 9.0 * normalized + 0.7))
-            mag_scale = 1.0 + ripple + drift
-            mag_scale = np.clip(mag_scale + burst, 0.20, 2.8)
-
-            z_real = z_real_base * mag_scale * (1.0 + rng.normal(0.0, 0.22, size=len(freq)))
-            z_imag = z_imag_base * mag_scale * (1.0 + rng.normal(0.0, 0.26, size=len(freq)))
-
-            # Inject a handful of outlier spikes to emulate loose leads/contact issues.
-            n_spikes = max(6, len(freq) // 7)
-            spike_idx = rng.choice(len(freq), size=n_spikes, replace=False)
-            spike_factor = rng.uniform(2.2, 5.0, size=n_spikes)
-            z_real[spike_idx] *= spike_factor
-            z_imag[spike_idx] *= spike_factor
-
-            # Add occasional dip-outs (partial contact loss) for stronger mismatch.
-            n_dips = max(3, len(freq) // 14)
-            dip_idx = rng.choice(len(freq), size=n_dips, replace=False)
-            dip_factor = rng.uniform(0.18, 0.45, size=n_dips)
-            z_real[dip_idx] *= dip_factor
-            z_imag[dip_idx] *= dip_factor
+            # "Bad connection" artifacts from the synthetic scenario library: broadband noise,
+            # drift over the sweep, 50/60 Hz pickup and contact loss (dip-outs and spikes).
+            z = (z_real_base + 1j * z_imag_base)[None, :]
+            z = synthetic_eis.apply_noise(z, rng, 0.24)
+            for artifact in synthetic_eis.SCENARIOS["messy_setup"][1]:
+                z = synthetic_eis.apply_artifact(artifact, freq, z, rng)
+            z_real = z[0].real
+            z_imag = z[0].imag
 
             # Preserve sign conventions and avoid zeros.
             z_real = np.sign(z_real_base) * np.maximum(np.abs(z_real), 1e-3)
             z_imag = np.sign(z_imag_base) * np.maximum(np.abs(z_imag), 1e-3)
 
-            n = len(freq)
-            total_time = 10.0
-            interval = total_time / max(n, 1)
-
-            x_buf, yr_buf, yi_buf = [], [], []
-
-            for i in range(n):
-                if self.stop_requested:
-                    self.log_message("Messy simulated measurement stopped by user.")
-                    break
-
-                x_buf.append(freq[i])
-                yr_buf.append(z_real[i])
-                yi_buf.append(z_imag[i])
-
-                percent = (i + 1) / n * 100.0
-                self.root.after(0, self._set_measurement_status, f"Measuring: {i+1}/{n} points")
-                self.root.after(0, self.progress_var.set, percent)
-                self.root.after(0, self._safe_set_shared_progress_text, f"{percent:.0f}%")
-                self.root.after(0, self.update_plots_incremental, np.array(x_buf), np.array(yr_buf), np.array(yi_buf))
-                if not self._interruptible_sleep(interval):
-                    break
+            replay_run = self._new_replay(freq, z_real, z_imag, times=times, duration=10.0)
+            n = replay_run.n
+            ui_state = {}
+            for count in replay_run.ticks():
+                self._post_replay_tick(replay_run, count, f"Measuring: {count}/{n} points", ui_state)
+            if self.stop_requested:
+                self.log_message("Messy simulated measurement stopped by user.")
 
-            if len(x_buf) > 0:
+            sweep = replay_run.sweep_view()
+            if len(sweep) > 0:
                 self.log_message("Messy-data test complete." if not self.stop_requested else "Messy-data test stopped.")
                 try:
-                    current_z_mag = np.sqrt(np.array(yr_buf) ** 2 + np.array(yi_buf) ** 2)
-                    current_freq = np.array(x_buf)
+                    current_z_mag = sweep.magnitude
+                    current_freq = sweep.freq
                     diagnosis_result = self.diagnose_coating(current_z_mag, current_freq)
                     self.log_message(f"Diagnosis: {diagnosis_result}")
                     self.report_bode_data_quality(current_freq, current_z_mag)
-                    self.root.after(0, self.record_run_history, self._current_mode_label(), current_freq, current_z_mag)
+                    self.root.after(0, self.record_run_history, self._current_mode_label(), current_freq, current_z_mag, sweep.z_real, sweep.z_imag, sweep.time_s)
                     self.root.after(0, self.show_bode_threshold_indicator, current_freq, current_z_mag)
                     self.root.after(0, self.show_diagnosis_on_plots, diagnosis_result)
                 except Exception as e:
                     self.log_message(f"Diagnosis failed: {e}")
 
             self.root.after(0, self._destroy_shared_progress_ui)
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self._set_measurement_status, "Messy-data test finished" if not self.stop_requested else "Measurement stopped")
             if not self.stop_requested:
                 self.root.after(0, self.progress_var.set, 100.0)
                 self.root.after(0, self.set_export_buttons_enabled, True)
             self.root.after(0, self._safe_set_shared_progress_text, "100%" if not self.stop_requested else "Stopped")
-            self.measurement_in_progress = False
-            self.stop_requested = False
-
         except Exception as e:
             self.log_message(f"Error streaming messy test data: {e}")
-            self.root.after(0, self.run_test_btn.config, {"state": "normal"})
-            self.root.after(0, self.stop_test_btn.config, {"state": "disabled"})
             self.root.after(0, self.progress_var.set, 0.0)
             self.root.after(0, self._safe_set_shared_progress_text, "0%")
-            self.measurement_in_progress = False
-            self.stop_requested = False
 
-    def update_plots_incremental(self, freq_subset, z_real_subset, z_imag_subset):
-        """Update Nyquist and Bode plots with partial data during streaming."""
+    @timed("update_plots_incremental", attr="run_metrics")
+    def update_plots_incremental(self, sweep):
+        """Update Nyquist and Bode (magnitude and phase) plots with partial data during streaming."""
         try:
-            self.latest_plot_data = {
-                'frequency': np.asarray(freq_subset),
-                'z_real': np.asarray(z_real_subset),
-                'z_imag': np.asarray(z_imag_subset),
-            }
-            z_mag = np.sqrt(z_real_subset**2 + z_imag_subset**2)
-            z_imag_neg = -z_imag_subset
+            self.latest_sweep = sweep
+            freq_subset, z_real_subset, z_mag = sweep.freq, sweep.z_real, sweep.magnitude
+            z_imag_neg = -sweep.z_imag
+            neg_phase = -sweep.phase_deg
 
             # --- Nyquist plotting is currently disabled ---
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 if self.nyquist_line is None:
                     (self.nyquist_line,) = self.nyquist_ax.plot(z_real_subset, z_imag_neg, 'o-', markersize=4, color=self.theme["accent"])
                     self.nyquist_ax.plot_data = (z_real_subset, z_imag_neg)
@@ -3109,11 +4327,14 @@ class EisAnalysisTool:
             safe_freq = np.where(freq_subset <= 0, 1e-6, freq_subset)
             if self.bode_line is None:
                 (self.bode_line,) = self.bode_ax_mag.plot(safe_freq, z_mag, 'o-', markersize=4, color=self.theme["accent"], zorder=10)
+                (self.bode_phase_line,) = self.bode_ax_phase.plot(safe_freq, neg_phase, 'o-', markersize=3, color=self.theme["accent"], zorder=10)
                 self.bode_ax_mag.plot_data = (safe_freq, z_mag)
             else:
                 # update data in-place
                 self.bode_line.set_xdata(safe_freq)
                 self.bode_line.set_ydata(z_mag)
+                self.bode_phase_line.set_data(safe_freq, neg_phase)
+                self._fit_phase_axis(neg_phase)
                 self.bode_ax_mag.plot_data = (safe_freq, z_mag)
                 try:
                     self.bode_ax_mag.relim()
@@ -3144,7 +4365,7 @@ class EisAnalysisTool:
             short = diagnosis_text
 
             # Nyquist: place in upper-left corner
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 try:
                     if self.nyquist_diag_text is None:
                         self.nyquist_diag_text = self.nyquist_ax.text(
@@ -3177,7 +4398,7 @@ class EisAnalysisTool:
                 pass
 
             # Redraw canvases
-            if self.nyquist_enabled:
+            if self._nyquist_active():
                 try:
                     self.nyquist_canvas.draw_idle()
                 except Exception:
@@ -3193,9 +4414,8 @@ class EisAnalysisTool:
     # --- Plot Export Function ---
     def _build_export_dataframe(self, plot_type):
         """Build export dataframe and metadata for Nyquist/Bode plot."""
-        freq = np.asarray(self.latest_plot_data.get('frequency', np.array([])))
-        z_real = np.asarray(self.latest_plot_data.get('z_real', np.array([])))
-        z_imag = np.asarray(self.latest_plot_data.get('z_imag', np.array([])))
+        sweep = self.latest_sweep
+        freq, z_real, z_imag = sweep.freq, sweep.z_real, sweep.z_imag
 
         if freq.size == 0 and z_real.size == 0:
             return None, None, None
@@ -3211,21 +4431,24 @@ class EisAnalysisTool:
             return export_df, "nyquist_plot.csv", "Export Nyquist CSV As..."
 
         if plot_type == 'bode':
-            z_mag = np.sqrt(z_real**2 + z_imag**2)
             export_df = pd.DataFrame({
                 "Frequency (Hz)": freq,
-                "|Z| (Ohm)": z_mag,
+                "|Z| (Ohm)": sweep.magnitude,
+                "-Phase (°)": -sweep.phase_deg,
             })
             return export_df, "bode_plot.csv", "Export Bode CSV As..."
 
         return None, None, None
 
     def _save_export_dataframe(self, export_df, default_name, dialog_title):
-        """Prompt for save location and write CSV; returns filepath or None."""
-        filetypes = [
-            ('CSV File', '*.csv'),
-            ('All Files', '*.*')
-        ]
+        """Prompt for save location and write CSV (or a full-sweep columnar file) in the background; returns filepath or None.
+
+        The returned path is where the write is going; its success or failure is reported
+        back on the Tk thread once the background write finishes.
+        """
+        filetypes = [('CSV File', '*.csv')]
+        filetypes += [(label, pattern) for label, pattern in columnar_export.available_formats().values()]
+        filetypes.append(('All Files', '*.*'))
 
         filepath = filedialog.asksaveasfilename(
             title=dialog_title,
@@ -3238,14 +4461,224 @@ class EisAnalysisTool:
             self.log_message("Export cancelled.")
             return None
 
-        try:
-            export_df.to_csv(filepath, index=False)
-            self.log_message(f"CSV exported to: {filepath}")
+        if columnar_export.format_for_path(filepath) is not None:
+            self._export_current_sweep_columnar(filepath)
             return filepath
-        except Exception as e:
+
+        def _on_failed(e):
             self.log_message(f"Error exporting CSV: {e}")
             messagebox.showerror("Export Error", f"Failed to export CSV:\n{e}")
-            return None
+
+        self._write_export_in_background(
+            export_df,
+            filepath,
+            lambda: self.log_message(f"CSV exported to: {filepath}"),
+            _on_failed,
+        )
+        self.queue_export_for_upload(export_df, default_name)
+        return filepath
+
+    def _run_in_background(self, work, on_success, on_error):
+        """Run work() on the task runtime and deliver its result or exception back on the Tk thread."""
+        def _deliver(handle):
+            if handle.exception() is not None:
+                on_error(handle.exception())
+            else:
+                on_success(handle.result())
+
+        self.tasks.submit(work, name="background", on_done=_deliver)
+
+    def _export_current_sweep_columnar(self, filepath):
+        """Write the full current sweep (all columns plus run metadata) to Parquet/Feather/HDF5."""
+        sweep = self.latest_sweep
+        meta = {
+            "run_id": self.run_history[-1].get("run_id", "") if self.run_history else "",
+            "asset_id": normalize_asset_id(self.asset_id_var.get()),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "mode": self._current_mode_label(),
+            "profile": self.current_profile_name.get().strip() or "Recommended",
+            "diagnosis": self.last_diagnosis_result,
+        }
+        freq = sweep.freq.copy()
+        z_real = sweep.z_real.copy()
+        z_imag = sweep.z_imag.copy()
+        time_s = None if sweep.time_s is None else sweep.time_s.copy()
+
+        def _on_failed(e):
+            self.log_message(f"Error exporting sweep: {e}")
+            messagebox.showerror("Export Error", f"Failed to export sweep:\n{e}")
+
+        self._run_in_background(
+            lambda: columnar_export.export_sweep(filepath, meta, freq, z_real, z_imag, time_s),
+            lambda _path: self.log_message(f"Sweep exported to: {filepath}"),
+            _on_failed,
+        )
+
+    # --- Run overlay ---
+
+    def toggle_overlay_selected_runs(self):
+        """Toggle the selected history runs on the plots; with no selection, show the last 10 runs."""
+        selected = list(self.history_tree.selection())
+        if selected:
+            shown = self.run_overlay.toggle(selected, self.run_history)
+        elif self.run_overlay.active:
+            shown = self.run_overlay.clear()
+        else:
+            shown = self.run_overlay.set_runs(self.run_history[-10:])
+        self._redraw_run_overlay()
+        self.log_message(f"Overlay: {len(shown)} run(s) shown (darker = older)." if shown else "Overlay cleared.")
+
+    def clear_run_overlay(self):
+        self.run_overlay.clear()
+        self._redraw_run_overlay()
+
+    def _redraw_run_overlay(self):
+        """Re-attach the overlay collections and redraw only the canvases (no axis rebuild)."""
+        self.run_overlay.attach(self.bode_ax_mag, "bode")
+        self._fit_bode_to_overlay()
+        self.bode_canvas.draw_idle()
+        if self._nyquist_active():
+            self.run_overlay.attach(self.nyquist_ax, "nyquist")
+            if self.run_overlay.active:
+                self.nyquist_ax.update_datalim(np.vstack(self.run_overlay.collections["nyquist"].get_segments()))
+                self.nyquist_ax.autoscale_view()
+            self.nyquist_canvas.draw_idle()
+
+    def _fit_bode_to_overlay(self):
+        """Bode limits: the default window, widened (half a decade of margin) to every overlaid run.
+
+        The overlay collection is added with autolim=False, so this plays the part of
+        the Nyquist path's update_datalim for the fixed Bode window.
+        """
+        (f_lo, f_hi), (z_lo, z_hi) = BODE_FREQ_LIMITS, BODE_Z_LIMITS
+        if self.run_overlay.active:
+            points = np.vstack(self.run_overlay.collections["bode"].get_segments())
+            points = points[np.all(np.isfinite(points) & (points > 0), axis=1)]
+            if points.size:
+                margin = 10 ** 0.5
+                f_lo = min(f_lo, points[:, 0].min() / margin)
+                f_hi = max(f_hi, points[:, 0].max() * margin)
+                z_lo = min(z_lo, points[:, 1].min() / margin)
+                z_hi = max(z_hi, points[:, 1].max() * margin)
+        self.bode_ax_mag.set_xlim(f_lo, f_hi)
+        self.bode_ax_mag.set_ylim(z_lo, z_hi)
+        self.bode_cbar_ax.set_ylim(z_lo, z_hi)
+
+    def _fit_phase_axis(self, neg_phase):
+        """-Phase axis: 0-90° for capacitive data, widened in 45° steps to inductive or negative points."""
+        finite = np.asarray(neg_phase, dtype=float)
+        finite = finite[np.isfinite(finite)]
+        lo = min(0.0, 45.0 * np.floor(finite.min() / 45.0)) if finite.size else 0.0
+        hi = max(90.0, 45.0 * np.ceil(finite.max() / 45.0)) if finite.size else 90.0
+        if self.bode_ax_phase.get_ylim() != (lo, hi):
+            self.bode_ax_phase.set_ylim(lo, hi)
+            self.bode_ax_phase.set_yticks(np.arange(lo, hi + 1.0, 45.0))
+
+    def export_history_archive(self):
+        """Stream the whole run history (every stored sweep) into one columnar archive."""
+        formats = columnar_export.available_formats()
+        if not formats:
+            messagebox.showwarning(
+                "Export Unavailable",
+                "Columnar export needs pyarrow (Parquet/Feather) or tables (HDF5).\n"
+                "Install with: pip install pyarrow",
+            )
+            return
+        if not any(entry.get("sweep") for entry in self.run_history):
+            messagebox.showwarning("No Data", "Run history has no stored sweeps to export.")
+            return
+
+        first_pattern = next(iter(formats.values()))[1]
+        filepath = filedialog.asksaveasfilename(
+            title="Export Run History As...",
+            initialfile=self._generate_export_filename("eis_history" + first_pattern[1:]),
+            defaultextension=first_pattern[1:],
+            filetypes=list(formats.values()),
+        )
+        if not filepath:
+            self.log_message("History export cancelled.")
+            return
+        if columnar_export.format_for_path(filepath) is None:
+            messagebox.showwarning("Export Error", "Choose a .parquet, .feather or .h5 file name.")
+            return
+
+        snapshot = list(self.run_history)
+
+        def _on_done(result):
+            runs, rows = result
+            self.log_message(f"History exported to: {filepath} ({runs} runs, {rows} points)")
+
+        def _on_failed(e):
+            self.log_message(f"Error exporting history: {e}")
+            messagebox.showerror("Export Error", f"Failed to export history:\n{e}")
+
+        self.log_message("Exporting run history...")
+        self._run_in_background(lambda: columnar_export.export_history(filepath, snapshot), _on_done, _on_failed)
+
+    def open_diagnostics_panel(self):
+        """Show stage timings and counters for the current run, the selected/last run and the session."""
+        if self.diagnostics_window is not None:
+            try:
+                self.diagnostics_window.lift()
+                return
+            except Exception:
+                self.diagnostics_window = None
+
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.configure(bg=self.theme["panel"])
+        window.geometry("620x460")
+        text = scrolledtext.ScrolledText(
+            window,
+            state="disabled",
+            font=("Consolas", 9),
+            bg=self.theme["entry_bg"],
+            fg=self.theme["text"],
+            relief="solid",
+            borderwidth=1,
+        )
+        text.pack(fill="both", expand=True, padx=8, pady=8)
+        self.diagnostics_window = window
+
+        def _close():
+            self.diagnostics_window = None
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", _close)
+
+        def _refresh():
+            if self.diagnostics_window is not window:
+                return
+            selected = self.history_tree.selection()
+            entry = None
+            if selected:
+                entry = next((e for e in self.run_history if e.get("run_id") == selected[0]), None)
+            elif self.run_history:
+                entry = self.run_history[-1]
+
+            sections = [("Current run", self.run_metrics.snapshot())]
+            if entry is not None:
+                label = "Selected run" if selected else "Last recorded run"
+                sections.append((f"{label} ({entry.get('timestamp', '')})", entry.get("metrics")))
+            sections.append(("Session", self.session_metrics.snapshot()))
+
+            lines = []
+            for title, snapshot in sections:
+                lines.append(f"== {title} ==")
+                lines.extend(format_snapshot(snapshot))
+                lines.append("")
+            try:
+                position = text.yview()[0]
+                text.configure(state="normal")
+                text.delete("1.0", tk.END)
+                text.insert(tk.END, "\n".join(lines))
+                text.configure(state="disabled")
+                text.yview_moveto(position)
+                window.after(1000, _refresh)
+            except Exception:
+                self.diagnostics_window = None
+
+        _refresh()
 
     def _generate_export_filename(self, base_name):
         """Generate timestamped filename to avoid collisions."""
@@ -3265,13 +4698,20 @@ class EisAnalysisTool:
         self._save_export_dataframe(export_df, default_name, dialog_title)
 
     def _build_report_context(self):
-        freq = np.asarray(self.latest_plot_data.get('frequency', np.array([])), dtype=float)
-        z_real = np.asarray(self.latest_plot_data.get('z_real', np.array([])), dtype=float)
-        z_imag = np.asarray(self.latest_plot_data.get('z_imag', np.array([])), dtype=float)
-        if freq.size == 0 or z_real.size == 0 or z_imag.size == 0:
+        meta = {
+            "mode": self._current_mode_label(),
+            "profile": self.current_profile_name.get().strip() or "Recommended",
+            "diagnosis": self.last_diagnosis_result,
+            "quality": self.last_quality_summary,
+        }
+        return self._report_context_from_sweep(self.latest_sweep, meta, self.run_history)
+
+    def _report_context_from_sweep(self, sweep, meta, history):
+        """Build a picklable report context from a Sweep and the history visible to that run."""
+        if len(sweep) == 0:
             return None
 
-        z_mag = np.sqrt(z_real ** 2 + z_imag ** 2)
+        freq, z_real, z_imag, z_mag = sweep.freq, sweep.z_real, sweep.z_imag, sweep.magnitude
         valid = np.isfinite(freq) & np.isfinite(z_real) & np.isfinite(z_imag) & np.isfinite(z_mag) & (freq > 0) & (z_mag > 0)
         freq = freq[valid]
         z_real = z_real[valid]
@@ -3281,6 +4721,15 @@ class EisAnalysisTool:
             return None
 
         low_idx = int(np.argmin(freq))
+        summary_keys = ("timestamp", "mode", "profile", "diagnosis", "low_freq_z")
+        recent_runs = [
+            {key: entry.get(key) for key in summary_keys}
+            for entry in reversed(history[-8:])
+        ]
+        trend_low_z = [
+            float(e["low_freq_z"]) for e in history
+            if np.isfinite(e.get("low_freq_z", np.nan)) and e.get("low_freq_z", 0) > 0
+        ]
         return {
             "freq": freq,
             "z_real": z_real,
@@ -3289,15 +4738,48 @@ class EisAnalysisTool:
             "low_freq_hz": float(freq[low_idx]),
             "low_freq_z": float(z_mag[low_idx]),
             "points": int(freq.size),
-            "mode": self._current_mode_label(),
-            "profile": self.current_profile_name.get().strip() or "Recommended",
-            "diagnosis": self.last_diagnosis_result,
-            "quality": self.last_quality_summary,
+            "mode": meta.get("mode", ""),
+            "profile": meta.get("profile", ""),
+            "diagnosis": meta.get("diagnosis", ""),
+            "quality": meta.get("quality", ""),
             "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "recent_runs": recent_runs,
+            "trend_low_z": trend_low_z,
+            "history_count": len(history),
         }
 
+    def _report_context_for_history_entry(self, position):
+        """Report context for a stored run, with trend/recent runs limited to runs up to it."""
+        entry = self.run_history[position]
+        sweep = entry.get("sweep") or {}
+        context = self._report_context_from_sweep(
+            Sweep.from_components(sweep.get("frequency", []), sweep.get("z_real", []), sweep.get("z_imag", [])),
+            entry,
+            self.run_history[:position + 1],
+        )
+        if context is not None:
+            context["generated_at"] = f"{time.strftime('%Y-%m-%d %H:%M:%S')} (run of {entry.get('timestamp', '')})"
+        return context
+
+    def _set_report_buttons(self, text):
+        for attr in ("export_bode_cloud_btn", "export_nyquist_cloud_btn"):
+            btn = getattr(self, attr, None)
+            if btn is not None:
+                try:
+                    btn.config(text=text)
+                except Exception:
+                    pass
+
     def export_report(self, _plot_type='bode'):
-        """Export a PDF report with summary, Bode/Nyquist plots, and trend history."""
+        """Export a PDF report with summary, Bode/Nyquist plots, and trend history.
+
+        Rendering runs in a separate worker process; pressing the button again
+        while a report is being written cancels it.
+        """
+        if self.report_job is not None:
+            self.cancel_report_export()
+            return
+
         context = self._build_report_context()
         if context is None:
             self.log_message("No plot data available for report export.")
@@ -3316,88 +4798,261 @@ class EisAnalysisTool:
             return
 
         try:
-            with PdfPages(filepath) as pdf:
-                # Page 1: summary
-                summary_fig = Figure(figsize=(8.27, 11.69), dpi=120, facecolor='white')
-                summary_ax = summary_fig.add_subplot(111)
-                summary_ax.axis('off')
-                summary_ax.text(0.05, 0.97, "EIS Measurement Report", fontsize=20, fontweight='bold', va='top')
-
-                info_lines = [
-                    f"Generated: {context['generated_at']}",
-                    f"Mode: {context['mode']}",
-                    f"Profile: {context['profile']}",
-                    f"Diagnosis: {context['diagnosis']}",
-                    f"Data Quality: {context['quality']}",
-                    f"Points: {context['points']}",
-                    f"Low Frequency: {context['low_freq_hz']:.3e} Hz",
-                    f"Low-Frequency |Z|: {context['low_freq_z']:.3e} Ohm",
-                ]
-                summary_ax.text(0.05, 0.89, "\n".join(info_lines), fontsize=12, va='top')
-
-                if self.run_history:
-                    summary_ax.text(0.05, 0.47, "Recent Runs", fontsize=14, fontweight='bold', va='top')
-                    recent = self.run_history[-8:]
-                    y = 0.44
-                    for entry in reversed(recent):
-                        low_z = entry.get("low_freq_z", np.nan)
-                        low_z_text = f"{low_z:.2e}" if np.isfinite(low_z) else "N/A"
-                        line = (
-                            f"{entry.get('timestamp', '')} | {entry.get('mode', '')} | "
-                            f"{entry.get('profile', '')} | {entry.get('diagnosis', '')} | {low_z_text}"
-                        )
-                        summary_ax.text(0.05, y, line, fontsize=9, va='top')
-                        y -= 0.033
-                        if y < 0.10:
-                            break
-
-                pdf.savefig(summary_fig, bbox_inches='tight')
-
-                # Page 2: Bode chart
-                bode_fig = Figure(figsize=(11, 6), dpi=120, facecolor='white')
-                bode_ax = bode_fig.add_subplot(111)
-                bode_ax.loglog(context['freq'], context['z_mag'], 'o-', markersize=4, color='#1f77b4')
-                bode_ax.set_title('Bode Plot (|Z| vs Frequency)')
-                bode_ax.set_xlabel('Frequency (Hz)')
-                bode_ax.set_ylabel('|Z| (Ohm)')
-                bode_ax.grid(True, which='both', alpha=0.35)
-                pdf.savefig(bode_fig, bbox_inches='tight')
-
-                # Page 3: Nyquist chart
-                nyquist_fig = Figure(figsize=(11, 6), dpi=120, facecolor='white')
-                nyquist_ax = nyquist_fig.add_subplot(111)
-                nyquist_ax.plot(context['z_real'], -context['z_imag'], 'o-', markersize=4, color='#1f77b4')
-                nyquist_ax.set_title("Nyquist Plot")
-                nyquist_ax.set_xlabel("Z' (Ohm)")
-                nyquist_ax.set_ylabel("-Z'' (Ohm)")
-                nyquist_ax.grid(True, alpha=0.35)
-                nyquist_ax.axis('equal')
-                pdf.savefig(nyquist_fig, bbox_inches='tight')
-
-                # Page 4: trend chart when history exists
-                if len(self.run_history) >= 2:
-                    trend_fig = Figure(figsize=(11, 4.8), dpi=120, facecolor='white')
-                    trend_ax = trend_fig.add_subplot(111)
-                    valid_entries = [
-                        e for e in self.run_history
-                        if np.isfinite(e.get("low_freq_z", np.nan)) and e.get("low_freq_z", 0) > 0
-                    ]
-                    if valid_entries:
-                        y = np.array([e["low_freq_z"] for e in valid_entries], dtype=float)
-                        x = np.arange(1, len(y) + 1)
-                        trend_ax.plot(x, y, 'o-', color='#1f77b4')
-                        trend_ax.set_yscale('log')
-                        trend_ax.set_title('Run History Trend (Low-Frequency |Z|)')
-                        trend_ax.set_xlabel('Run Number')
-                        trend_ax.set_ylabel('Low-Freq |Z| (Ohm)')
-                        trend_ax.grid(True, which='both', alpha=0.35)
-                    pdf.savefig(trend_fig, bbox_inches='tight')
-
-            self.log_message(f"Report exported to: {filepath}")
-            messagebox.showinfo("Report Export", f"Report saved to:\n{filepath}")
+            if self.report_worker is None:
+                self.report_worker = ReportWorker()
+            job_id, future = self.report_worker.submit_report(filepath, context)
         except Exception as e:
             self.log_message(f"Error exporting report: {e}")
             messagebox.showerror("Report Export Error", f"Failed to export report:\n{e}")
+            return
+
+        self.report_job = {"id": job_id, "future": future, "filepath": filepath, "started": time.perf_counter()}
+        self._set_report_buttons("Cancel Report")
+        self.log_message("Generating PDF report...")
+        self.root.after(100, self._poll_report_job)
+
+    def cancel_report_export(self):
+        """Ask the report worker to stop; the poll loop finalizes the UI."""
+        if self.report_job is None or self.report_worker is None:
+            return
+        self.report_job["cancelled"] = True
+        self.report_worker.cancel()
+        self._set_report_buttons("Cancelling...")
+
+    def _poll_report_job(self):
+        """Relay worker progress to the report buttons and finish up when the job completes."""
+        job = self.report_job
+        if job is None or self.report_worker is None:
+            return
+
+        for job_id, done, total, _label in self.report_worker.poll_progress():
+            if job_id == job["id"] and not job.get("cancelled"):
+                self._set_report_buttons(f"Cancel Report ({done}/{total})")
+
+        future = job["future"]
+        if not future.done():
+            self.root.after(100, self._poll_report_job)
+            return
+
+        self.report_job = None
+        self._set_report_buttons("Save Report (PDF)")
+        filepath = job["filepath"]
+        try:
+            future.result()
+        except ReportCancelled:
+            self.log_message("Report export cancelled.")
+            return
+        except Exception as e:
+            if job.get("cancelled"):
+                self.log_message("Report export cancelled.")
+                return
+            self.report_worker.reset_after_failure()
+            self.log_message(f"Error exporting report: {e}")
+            messagebox.showerror("Report Export Error", f"Failed to export report:\n{e}")
+            return
+
+        self.session_metrics.add_time("export_report", time.perf_counter() - job["started"])
+        self.log_message(f"Report exported to: {filepath}")
+        messagebox.showinfo("Report Export", f"Report saved to:\n{filepath}")
+
+    def open_batch_report_dialog(self):
+        """Pick runs from history (selection, last N, or date range) and build reports in the pool."""
+        if self.batch_report_job is not None:
+            self.cancel_batch_report()
+            return
+        if not self.run_history:
+            messagebox.showwarning("No Data", "Run history is empty; nothing to report.")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Batch Report")
+        dialog.configure(bg=self.theme["panel"])
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, style="Card.TFrame", padding=(14, 12))
+        frame.pack(fill="both", expand=True)
+
+        selected_ids = list(self.history_tree.selection())
+        scope_var = tk.StringVar(value="selected" if selected_ids else "last")
+        last_n_var = tk.StringVar(value=str(min(10, len(self.run_history))))
+        start_var = tk.StringVar(value=str(self.run_history[0].get("timestamp", ""))[:10])
+        end_var = tk.StringVar(value=str(self.run_history[-1].get("timestamp", ""))[:10])
+        output_var = tk.StringVar(value="per_run")
+
+        ttk.Label(frame, text="Runs", style="SectionTitle.TLabel").grid(row=0, column=0, columnspan=4, sticky="w")
+        ttk.Radiobutton(
+            frame, text=f"Selected in table ({len(selected_ids)})", variable=scope_var, value="selected",
+            style="Card.TRadiobutton", state="normal" if selected_ids else "disabled",
+        ).grid(row=1, column=0, columnspan=4, sticky="w", pady=2)
+        ttk.Radiobutton(frame, text="Last N runs", variable=scope_var, value="last", style="Card.TRadiobutton").grid(row=2, column=0, sticky="w", pady=2)
+        ttk.Entry(frame, textvariable=last_n_var, width=6).grid(row=2, column=1, sticky="w", padx=(6, 0))
+        ttk.Radiobutton(frame, text="Date range", variable=scope_var, value="range", style="Card.TRadiobutton").grid(row=3, column=0, sticky="w", pady=2)
+        ttk.Entry(frame, textvariable=start_var, width=11).grid(row=3, column=1, sticky="w", padx=(6, 4))
+        ttk.Label(frame, text="to", style="Card.TLabel").grid(row=3, column=2, sticky="w")
+        ttk.Entry(frame, textvariable=end_var, width=11).grid(row=3, column=3, sticky="w", padx=(4, 0))
+
+        ttk.Label(frame, text="Output", style="SectionTitle.TLabel").grid(row=4, column=0, columnspan=4, sticky="w", pady=(10, 0))
+        ttk.Radiobutton(frame, text="One PDF per run", variable=output_var, value="per_run", style="Card.TRadiobutton").grid(row=5, column=0, columnspan=4, sticky="w", pady=2)
+        ttk.Radiobutton(frame, text="One combined PDF", variable=output_var, value="combined", style="Card.TRadiobutton").grid(row=6, column=0, columnspan=4, sticky="w", pady=2)
+
+        def _submit():
+            try:
+                positions = self._select_history_positions(
+                    scope_var.get(), selected_ids, last_n_var.get(), start_var.get(), end_var.get()
+                )
+            except ValueError as e:
+                messagebox.showwarning("Batch Report", str(e), parent=dialog)
+                return
+            dialog.destroy()
+            self.start_batch_report(positions, output_var.get())
+
+        buttons = ttk.Frame(frame, style="Card.TFrame")
+        buttons.grid(row=7, column=0, columnspan=4, sticky="ew", pady=(12, 0))
+        ttk.Button(buttons, text="Generate", style="Primary.TButton", command=_submit).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Close", style="Secondary.TButton", command=dialog.destroy).pack(side=tk.LEFT, padx=(8, 0))
+
+    def _select_history_positions(self, scope, selected_ids, last_n_text, start_text, end_text):
+        """Return run_history indices for the chosen scope; only runs with a stored sweep qualify."""
+        with_sweep = [i for i, entry in enumerate(self.run_history) if entry.get("sweep")]
+        if scope == "selected":
+            wanted = set(selected_ids)
+            positions = [i for i in with_sweep if self.run_history[i].get("run_id") in wanted]
+        elif scope == "range":
+            start = start_text.strip()
+            end = end_text.strip()
+            for value in (start, end):
+                try:
+                    time.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    raise ValueError(f"Dates must use YYYY-MM-DD (got '{value}').")
+            positions = [
+                i for i in with_sweep
+                if start <= str(self.run_history[i].get("timestamp", ""))[:10] <= end
+            ]
+        else:
+            try:
+                last_n = int(float(last_n_text))
+            except ValueError:
+                raise ValueError("Last N must be a whole number.")
+            if last_n <= 0:
+                raise ValueError("Last N must be greater than zero.")
+            positions = with_sweep[-last_n:]
+
+        if not positions:
+            raise ValueError("No stored runs with sweep data match this selection.")
+        return positions
+
+    def start_batch_report(self, positions, output):
+        """Build contexts on the Tk thread and fan rendering out to the report process pool."""
+        started_at = time.time()
+        contexts = []
+        for pos in positions:
+            context = self._report_context_for_history_entry(pos)
+            if context is not None:
+                contexts.append((self.run_history[pos], context))
+        if not contexts:
+            messagebox.showwarning("No Data", "Selected runs have no valid sweep data.")
+            return
+
+        if output == "combined" and len(contexts) >= 2:
+            # Every selected run on the canonical grid, whatever profile swept it.
+            contexts[-1][1]["run_spectra"] = {
+                "log_freq": self.resampler.target_log_freq,
+                "log_z": self.resampler.log_magnitude_matrix(entry for entry, _ctx in contexts),
+            }
+
+        if output == "combined":
+            filepath = filedialog.asksaveasfilename(
+                title="Save Combined EIS Report As...",
+                initialfile=self._generate_export_filename("eis_batch_report.pdf"),
+                defaultextension=".pdf",
+                filetypes=[('PDF File', '*.pdf'), ('All Files', '*.*')],
+            )
+            if not filepath:
+                self.log_message("Batch report cancelled.")
+                return
+            destination = filepath
+        else:
+            destination = filedialog.askdirectory(title="Choose Folder for Run Reports")
+            if not destination:
+                self.log_message("Batch report cancelled.")
+                return
+
+        try:
+            if self.batch_report_worker is None:
+                self.batch_report_worker = ReportWorker(max_workers=max(1, (os.cpu_count() or 2) - 1))
+            if output == "combined":
+                job_id, futures = self.batch_report_worker.submit_combined(destination, [ctx for _entry, ctx in contexts])
+            else:
+                jobs = []
+                for entry, ctx in contexts:
+                    safe_id = re.sub(r'[^A-Za-z0-9_-]+', '_', str(entry.get("run_id", "")))
+                    jobs.append((os.path.join(destination, f"eis_report_{safe_id}.pdf"), ctx))
+                job_id, futures = self.batch_report_worker.submit_batch(jobs)
+        except Exception as e:
+            self.log_message(f"Error starting batch report: {e}")
+            messagebox.showerror("Batch Report Error", f"Failed to start batch report:\n{e}")
+            return
+
+        self.batch_report_job = {
+            "id": job_id,
+            "futures": futures,
+            "total": len(contexts),
+            "done": 0,
+            "destination": destination,
+            "started_at": started_at,
+        }
+        self.batch_report_btn.config(text=f"Cancel Batch (0/{len(contexts)})")
+        self.log_message(f"Generating batch report for {len(contexts)} run(s)...")
+        self.root.after(200, self._poll_batch_report_job)
+
+    def cancel_batch_report(self):
+        if self.batch_report_job is None or self.batch_report_worker is None:
+            return
+        self.batch_report_job["cancelled"] = True
+        self.batch_report_worker.cancel()
+        self.batch_report_btn.config(text="Cancelling...")
+
+    def _poll_batch_report_job(self):
+        job = self.batch_report_job
+        if job is None or self.batch_report_worker is None:
+            return
+
+        for job_id, _done, _total, label in self.batch_report_worker.poll_progress():
+            if job_id == job["id"] and label == "run":
+                job["done"] += 1
+        if not job.get("cancelled"):
+            self.batch_report_btn.config(text=f"Cancel Batch ({job['done']}/{job['total']})")
+
+        if not all(future.done() for future in job["futures"]):
+            self.root.after(200, self._poll_batch_report_job)
+            return
+
+        self.batch_report_job = None
+        self.batch_report_btn.config(text="Batch Report (PDF)")
+        written, errors, cancelled = [], [], False
+        for future in job["futures"]:
+            try:
+                written.extend(future.result())
+            except ReportCancelled:
+                cancelled = True
+            except Exception as e:
+                errors.append(e)
+
+        elapsed = time.time() - job["started_at"]
+        if cancelled or job.get("cancelled"):
+            self.log_message(f"Batch report cancelled after {len(written)} of {job['total']} run(s).")
+            return
+        if errors:
+            self.batch_report_worker.reset_after_failure()
+            self.log_message(f"Batch report finished with {len(errors)} error(s): {errors[0]}")
+            messagebox.showerror(
+                "Batch Report Error",
+                f"{len(written)} report file(s) written, {len(errors)} chunk(s) failed:\n{errors[0]}",
+            )
+            return
+
+        self.log_message(f"Batch report: {job['total']} run(s) written to {job['destination']} in {elapsed:.1f}s.")
+        messagebox.showinfo("Batch Report", f"Reports for {job['total']} run(s) saved to:\n{job['destination']}")
 
 # --- Main execution ---
 if __name__ == "__main__":
@@ -3408,6 +5063,7 @@ if __name__ == "__main__":
         if messagebox.askokcancel("Quit", "Do you want to quit? (Connection will remain active if device is paired)"):
             # Keep Bluetooth connection alive on close—don't force disconnect
             # This allows the app to reconnect immediately on restart
+            app.shutdown()
             root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
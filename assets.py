@@ -0,0 +1,209 @@
+"""Per-asset run index, baselines and baseline-relative log|Z| deltas.
+
+Runs carry an ``asset_id`` (panel / structure tag). ``AssetIndex`` keeps the run ids of
+every asset in archive order, one baseline sweep per asset, and a cached delta matrix
+per asset: one row per run of ``log10|Z_run| - log10|Z_baseline|`` on the baseline's
+frequency grid. A new run adds one row (amortized O(frequencies)) and runs trimmed
+from the history are evicted by id; asking for an asset's degradation history is a
+dict lookup, not a scan of the whole run history.
+Runs are mapped onto the baseline grid through the shared ``GridResampler`` cache.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from resample import GridResampler, sweep_log_magnitude
+
+UNASSIGNED = "unassigned"
+
+
+def normalize_asset_id(value):
+    text = " ".join(str(value or "").split())
+    return text or UNASSIGNED
+
+
+class _DeltaRows:
+    """Growable (runs x frequencies) float matrix with amortized appends and O(1) drops from the front."""
+
+    def __init__(self, n_freq, capacity=16):
+        self._data = np.empty((capacity, n_freq))
+        self._start = 0
+        self.run_ids = []
+
+    def append(self, run_id, row):
+        n = len(self.run_ids)
+        end = self._start + n
+        if end == self._data.shape[0]:
+            # Reuse the rows freed by drop_oldest() before growing.
+            capacity = self._data.shape[0] if n <= self._data.shape[0] // 2 else 2 * self._data.shape[0]
+            moved = np.empty((capacity, self._data.shape[1]))
+            moved[:n] = self._data[self._start:end]
+            self._data, self._start, end = moved, 0, n
+        self._data[end] = row
+        self.run_ids.append(run_id)
+
+    def drop_oldest(self, count):
+        count = min(count, len(self.run_ids))
+        del self.run_ids[:count]
+        self._start = self._start + count if self.run_ids else 0
+
+    @property
+    def matrix(self):
+        return self._data[self._start:self._start + len(self.run_ids)]
+
+
+class AssetBaseline:
+    def __init__(self, run_id, freq, log_z, timestamp=""):
+        self.run_id = run_id
+        self.freq = np.asarray(freq, dtype=float)
+        self.log_z = np.asarray(log_z, dtype=float)
+        self.log_freq = np.log10(self.freq)
+        self.timestamp = timestamp
+
+    def delta(self, entry, resampler):
+        """Per-frequency log|Z| delta of entry vs this baseline (NaN outside the run's range)."""
+        curve = sweep_log_magnitude(entry)
+        if curve is None:
+            return None
+        log_freq, log_z = curve
+        return resampler.interp(self.log_freq, log_freq, log_z) - self.log_z
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "timestamp": self.timestamp,
+            "frequency": self.freq.tolist(),
+            "log_z": self.log_z.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["run_id"], data["frequency"], data["log_z"], data.get("timestamp", ""))
+
+
+class AssetIndex:
+    def __init__(self, resampler=None):
+        self.resampler = resampler or GridResampler()
+        self.runs_by_asset = {}
+        self.baselines = {}
+        self._deltas = {}
+
+    # --- building ---
+
+    def rebuild(self, history):
+        """Re-index from scratch (startup)."""
+        self.runs_by_asset = {}
+        self._deltas = {}
+        for entry in history:
+            self.add_run(entry)
+
+    def add_run(self, entry, auto_baseline=True):
+        """Index one new run; returns its delta row vs the asset baseline (None without one).
+
+        With auto_baseline, the first complete run recorded for an asset becomes its
+        baseline; interrupted (recovered) sweeps never do, since they stop short of the
+        low-frequency end of the grid.
+        """
+        asset_id = normalize_asset_id(entry.get("asset_id"))
+        self.runs_by_asset.setdefault(asset_id, []).append(entry.get("run_id"))
+        if asset_id not in self.baselines:
+            auto_baseline = auto_baseline and not entry.get("interrupted")
+            if not auto_baseline or not self.set_baseline(asset_id, entry, history=[entry]):
+                return None
+            return self._deltas[asset_id].matrix[-1]
+        return self._append_delta(asset_id, entry)
+
+    def evict(self, entries):
+        """Forget runs trimmed from the front of the history; baselines are kept."""
+        dropped = {}
+        for entry in entries:
+            dropped.setdefault(normalize_asset_id(entry.get("asset_id")), set()).add(entry.get("run_id"))
+        for asset_id, run_ids in dropped.items():
+            # Trimmed runs are the oldest, so they lead both the id list and the delta rows.
+            ids = self.runs_by_asset.get(asset_id, [])
+            del ids[:_leading_count(ids, run_ids)]
+            if not ids:
+                self.runs_by_asset.pop(asset_id, None)
+            rows = self._deltas.get(asset_id)
+            if rows is not None:
+                rows.drop_oldest(_leading_count(rows.run_ids, run_ids))
+
+    def _append_delta(self, asset_id, entry):
+        baseline = self.baselines[asset_id]
+        row = baseline.delta(entry, self.resampler)
+        if row is None:
+            return None
+        rows = self._deltas.get(asset_id)
+        if rows is None:
+            rows = self._deltas[asset_id] = _DeltaRows(baseline.freq.size)
+        rows.append(entry.get("run_id"), row)
+        return row
+
+    def set_baseline(self, asset_id, entry, history=()):
+        """Make entry the asset's baseline and recompute that asset's delta rows only."""
+        curve = sweep_log_magnitude(entry)
+        if curve is None:
+            return False
+        asset_id = normalize_asset_id(asset_id)
+        self.baselines[asset_id] = AssetBaseline(entry.get("run_id"), 10.0 ** curve[0], curve[1], entry.get("timestamp", ""))
+        self._deltas.pop(asset_id, None)
+        run_ids = set(self.runs_by_asset.get(asset_id, ()))
+        for run in history:
+            if run.get("run_id") in run_ids:
+                self._append_delta(asset_id, run)
+        return True
+
+    # --- queries ---
+
+    def assets(self):
+        return sorted(self.runs_by_asset)
+
+    def run_ids(self, asset_id):
+        return list(self.runs_by_asset.get(normalize_asset_id(asset_id), ()))
+
+    def degradation(self, asset_id):
+        """(run_ids, baseline freq, delta matrix runs x freq) for the asset, or None without a baseline."""
+        asset_id = normalize_asset_id(asset_id)
+        baseline = self.baselines.get(asset_id)
+        if baseline is None:
+            return None
+        rows = self._deltas.get(asset_id)
+        if rows is None:
+            return [], baseline.freq, np.empty((0, baseline.freq.size))
+        return list(rows.run_ids), baseline.freq, rows.matrix
+
+    # --- persistence (baselines only; the run index is rebuilt from history) ---
+
+    def load_baselines(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        self.baselines = {asset: AssetBaseline.from_dict(data) for asset, data in raw.items()}
+
+    def baselines_snapshot(self):
+        return {asset: baseline.to_dict() for asset, baseline in self.baselines.items()}
+
+
+def _leading_count(run_ids, dropped):
+    count = 0
+    for run_id in run_ids:
+        if run_id not in dropped:
+            break
+        count += 1
+    return count
+
+
+def summarize_delta(freq, row):
+    """Mean and low-frequency delta (decades) of one delta row, ignoring NaN."""
+    finite = np.isfinite(row)
+    if not np.any(finite):
+        return None
+    low_idx = int(np.argmin(np.where(finite, freq, np.inf)))
+    return {
+        "mean_decades": float(np.mean(row[finite])),
+        "low_freq_decades": float(row[low_idx]),
+        "low_freq_hz": float(freq[low_idx]),
+    }
@@ -0,0 +1,415 @@
+"""Headless benchmark suite for the analysis, rendering and ingest paths.
+
+Runs without a display (Agg backend, no Tk root) against the in-process mock
+instrument (mock_palmsens), so the real streaming path is exercised without hardware. Results go to benchmarks/results/latest.json;
+``--update-baseline`` stores them as benchmarks/baseline.json, and later runs are
+compared against that baseline and exit non-zero when a benchmark is slower than
+``--threshold`` (default 25%). Record the baseline with the versions pinned in
+requirements.txt; a run whose python/numpy/pandas/matplotlib differ from the
+baseline's prints a warning, since those alone can move the timings.
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --update-baseline
+    python benchmarks/bench.py --only update_plots --threshold 0.4
+"""
+
+import argparse
+import collections
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+REQUIREMENTS_PATH = os.path.join(REPO_DIR, "requirements.txt")
+# Library versions that move the timings; a baseline only compares cleanly against the same ones.
+VERSIONED_PACKAGES = ("python", "numpy", "pandas", "matplotlib")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+# app.py picks the mock instrument up at import time instead of the SDK.
+os.environ.setdefault("EIS_MOCK_PALMSENS", "realtime=0,seed=7")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+import app  # noqa: E402
+import mock_palmsens  # noqa: E402
+import replay  # noqa: E402
+import report_pdf  # noqa: E402
+from resample import GridResampler  # noqa: E402
+from sweep import Sweep  # noqa: E402
+
+
+# --- headless app instance ---
+
+class _FakeRoot:
+    """Stands in for the Tk root: scheduled callbacks are dropped."""
+
+    def after(self, *_args, **_kwargs):
+        return None
+
+
+class _FakeButton:
+    def config(self, **_kwargs):
+        return None
+
+
+class _Var:
+    """Minimal tk variable stand-in."""
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+class _FakeTree:
+    """Treeview stand-in that keeps rows in a dict, enough for refresh_run_history_views."""
+
+    def __init__(self):
+        self._rows = {}
+
+    def get_children(self):
+        return list(self._rows)
+
+    def delete(self, item):
+        self._rows.pop(item, None)
+
+    def insert(self, _parent, _index, iid=None, values=()):
+        iid = iid if iid is not None else f"I{len(self._rows)}"
+        self._rows[iid] = values
+        return iid
+
+    def selection(self):
+        return ()
+
+
+def make_headless_tool():
+    """Build an EisAnalysisTool without Tk: Agg canvases, fake root/tree, no log subscribers.
+
+    The non-Tk state comes from the app's own _init_state() (data files in a temp
+    dir); only the widgets and Tk variables are stood in here.
+    """
+    tool = app.EisAnalysisTool.__new__(app.EisAnalysisTool)
+    tool.root = _FakeRoot()
+    tool.theme = collections.defaultdict(lambda: "#808080")
+    tool._init_state(tempfile.mkdtemp(prefix="eis_bench_"))
+    tool.connection_mode = "simulated"
+    tool.replay_speed = replay.FAST
+    tool.simulation_scenario = None
+
+    tool.progress_var = _Var(0.0)
+    tool.current_profile_name = _Var("Recommended")
+    tool.asset_id_var = _Var("")
+    tool.forecast_var = _Var("")
+    tool.param_vars = {
+        "Start Frequency (Hz)": _Var("10000"),
+        "End Frequency (Hz)": _Var("0.01"),
+        "Voltage Amplitude (mV)": _Var("10"),
+        "Points per Decade": _Var("10"),
+    }
+    tool.run_test_btn = _FakeButton()
+    tool.stop_test_btn = _FakeButton()
+    tool.nyquist_line = None
+    tool.bode_line = None
+    tool.bode_phase_line = None
+
+    tool.nyquist_fig = Figure(figsize=(6, 4), dpi=100)
+    tool.nyquist_ax = tool.nyquist_fig.add_subplot(111)
+    tool.nyquist_canvas = FigureCanvasAgg(tool.nyquist_fig)
+
+    tool.bode_fig = Figure(figsize=(6, 4), dpi=100)
+    grid = tool.bode_fig.add_gridspec(2, 2, width_ratios=[20, 1], height_ratios=[2, 1])
+    tool.bode_ax_mag = tool.bode_fig.add_subplot(grid[0, 0])
+    tool.bode_cbar_ax = tool.bode_fig.add_subplot(grid[0, 1])
+    tool.bode_ax_phase = tool.bode_fig.add_subplot(grid[1, 0], sharex=tool.bode_ax_mag)
+    tool.bode_canvas = FigureCanvasAgg(tool.bode_fig)
+
+    tool.history_fig = Figure(figsize=(6, 2.4), dpi=100)
+    tool.history_ax = tool.history_fig.add_subplot(111)
+    tool.history_canvas = FigureCanvasAgg(tool.history_fig)
+    tool.history_tree = _FakeTree()
+
+    tool.init_nyquist_plot()
+    tool.init_bode_plot()
+    tool.init_history_plot()
+    return tool
+
+
+# --- synthetic data ---
+
+def synthetic_sweep(n_points, seed=0):
+    """Randles-like coating sweep (10 kHz .. 10 mHz) with a little measurement noise."""
+    rng = np.random.default_rng(seed)
+    freq = np.logspace(4, -2, n_points)
+    omega = 2.0 * np.pi * freq
+    r_s, r_ct, c_dl = 150.0, 2.0e7, 5.0e-9
+    z = r_s + r_ct / (1.0 + 1j * omega * r_ct * c_dl)
+    z *= 1.0 + rng.normal(0.0, 0.005, n_points)
+    return freq, z.real, z.imag
+
+
+def write_synthetic_csv(path, n_points):
+    freq, z_real, z_imag = synthetic_sweep(n_points)
+    z_mag = np.hypot(z_real, z_imag)
+    pd.DataFrame({
+        "Index": np.arange(1, n_points + 1),
+        "Frequency (Hz)": freq,
+        "Z' (Ω)": z_real,
+        "-Z'' (Ω)": -z_imag,
+        "Z (Ω)": z_mag,
+        "-Phase (°)": -np.degrees(np.arctan2(z_imag, z_real)),
+        "Time (s)": np.linspace(0.0, 600.0, n_points),
+    }).to_csv(path, index=False)
+
+
+def synthetic_history(n_runs, points_per_run=30):
+    freq, z_real, z_imag = synthetic_sweep(points_per_run)
+    low_z = float(np.hypot(z_real[-1], z_imag[-1]))
+    return [
+        {
+            "timestamp": f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+            "mode": "Simulated Mode",
+            "profile": "Recommended",
+            "diagnosis": "Healthy Coating (Pass)",
+            "quality": "Data quality: clean.",
+            "low_freq_hz": float(freq[-1]),
+            "low_freq_z": low_z * (1.0 - i * 1e-5),
+            "points": points_per_run,
+            "run_id": f"bench_{i:06d}",
+        }
+        for i in range(n_runs)
+    ]
+
+
+# --- benchmarks ---
+
+def _time(fn, repeat, number=1):
+    fn()  # warm-up (imports, caches, first draw)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000.0 / number)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def build_benchmarks(tool, workdir, quick=False):
+    """Return [(name, fn, repeat, number)]."""
+    scale = 0.3 if quick else 1.0
+
+    def reps(n):
+        return max(3, int(n * scale))
+
+    benches = []
+
+    bundled_csv = os.path.join(REPO_DIR, "11_12_25_test5.csv")
+    big_csv = os.path.join(workdir, "sweep_5000.csv")
+    write_synthetic_csv(big_csv, 5000)
+    benches.append(("csv_ingest_bundled", lambda: tool.process_data_file(bundled_csv), reps(30), 1))
+    benches.append(("csv_ingest_5000", lambda: tool.process_data_file(big_csv), reps(15), 1))
+
+    for n in (50, 500, 5000):
+        freq, z_real, z_imag = synthetic_sweep(n)
+        z_mag = np.hypot(z_real, z_imag)
+        benches.append((f"diagnose_coating_{n}", lambda f=freq, z=z_mag: tool.diagnose_coating(z, f), reps(50), 20))
+        benches.append((
+            f"assess_bode_data_quality_{n}",
+            lambda f=freq, z=z_mag: tool.assess_bode_data_quality(f, z),
+            reps(30), 5,
+        ))
+        benches.append((
+            f"update_plots_incremental_{n}",
+            lambda f=freq, zr=z_real, zi=z_imag: tool.update_plots_incremental(Sweep.from_components(f, zr, zi)),
+            reps(20), 1,
+        ))
+
+    history = synthetic_history(10000)
+
+    def _refresh_history():
+        tool.run_history = history
+        tool.refresh_run_history_views()
+        tool.history_fig.canvas.draw()
+
+    benches.append(("history_refresh_10000", _refresh_history, reps(10), 1))
+
+    overlay_runs = []
+    for i in range(48):
+        f, zr, zi = synthetic_sweep(601, seed=i)
+        overlay_runs.append({"run_id": f"overlay_{i}", "sweep": {"frequency": f.tolist(), "z_real": zr.tolist(), "z_imag": zi.tolist()}})
+
+    def _toggle_overlay():
+        # Alternate between all 48 runs and every other run, then draw the Bode canvas.
+        shown = tool.run_overlay.run_ids
+        tool.run_overlay.set_runs(overlay_runs[::2] if len(shown) == len(overlay_runs) else overlay_runs)
+        tool.run_overlay.attach(tool.bode_ax_mag, "bode")
+        tool.bode_canvas.draw()
+
+    benches.append(("overlay_toggle_48_runs", _toggle_overlay, reps(15), 1))
+
+    # Three profile grids (Rapid / Recommended / Detailed densities) mixed across 2000 runs.
+    grid_runs = []
+    for i in range(2000):
+        f, zr, zi = synthetic_sweep((31, 61, 121)[i % 3], seed=i)
+        grid_runs.append({"run_id": f"grid_{i}", "sweep": {"frequency": f, "z_real": zr, "z_imag": zi}})
+    benches.append((
+        "resample_matrix_2000_runs",
+        lambda: GridResampler().log_magnitude_matrix(grid_runs),
+        reps(10), 1,
+    ))
+
+    for n_per_decade in (10, 100):
+        def _stream(ppd=n_per_decade):
+            tool.param_vars["Points per Decade"].set(str(ppd))
+            manager = mock_palmsens.InstrumentManager(mock_palmsens.discover()[0])
+            manager.connect()
+            tool.ps_manager = manager
+            tool.run_real_eis_measurement()
+
+        benches.append((f"mock_stream_measurement_{6 * n_per_decade + 1}", _stream, reps(10), 1))
+
+    benches.append(("replay_stream_fast_bundled", lambda: tool.stream_load_data(bundled_csv), reps(20), 1))
+    benches.append(("replay_stream_fast_5000", lambda: tool.stream_load_data(big_csv), reps(5), 1))
+
+    freq, z_real, z_imag = synthetic_sweep(60)
+    meta = {"mode": "Simulated Mode", "profile": "Recommended", "diagnosis": "Healthy Coating (Pass)", "quality": "clean"}
+    context = tool._report_context_from_sweep(Sweep.from_components(freq, z_real, z_imag), meta, history[-200:])
+    report_path = os.path.join(workdir, "bench_report.pdf")
+    benches.append(("pdf_report_export", lambda: report_pdf.render_report(report_path, context), reps(8), 1))
+    return benches
+
+
+def environment_info():
+    import matplotlib
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "instrument": app.PALMSENS_MODULE_NAME,
+    }
+
+
+def pinned_versions(path=REQUIREMENTS_PATH):
+    """{package: version} for the ``name==version`` pins in requirements.txt."""
+    pins = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                name, sep, version = line.split("#", 1)[0].strip().partition("==")
+                if sep:
+                    pins[name.strip().lower()] = version.strip()
+    except OSError:
+        pass
+    return pins
+
+
+def version_mismatches(environment, expected, packages=VERSIONED_PACKAGES):
+    """[(package, installed, expected)] where both are known and differ."""
+    return [
+        (name, environment.get(name), expected.get(name))
+        for name in packages
+        if environment.get(name) and expected.get(name) and environment.get(name) != expected.get(name)
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline_ms, current_ms, ratio)] for benchmarks slower than the threshold."""
+    regressions = []
+    for name, current in results.items():
+        base = (baseline.get("results") or {}).get(name)
+        if not base or base.get("median_ms", 0) <= 0:
+            continue
+        ratio = current["median_ms"] / base["median_ms"]
+        if ratio > 1.0 + threshold:
+            regressions.append((name, base["median_ms"], current["median_ms"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EIS Analysis Tool benchmark suite")
+    parser.add_argument("--only", help="run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions (noisier)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    tool = make_headless_tool()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="eis_bench_") as workdir:
+        for name, fn, repeat, number in build_benchmarks(tool, workdir, quick=args.quick):
+            if args.only and args.only not in name:
+                continue
+            results[name] = _time(fn, repeat, number)
+            print(f"{name:<36}{results[name]['median_ms']:>12.3f} ms  (min {results[name]['min_ms']:.3f})")
+
+    record = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": environment_info(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+    if args.update_baseline:
+        off_pin = version_mismatches(record["environment"], pinned_versions())
+        for name, installed, pinned in off_pin:
+            print(f"Warning: {name} {installed} is installed but requirements.txt pins {pinned}.")
+        if off_pin:
+            print("Warning: record the baseline with the pinned requirements so later runs compare like for like.")
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment", {}).get("machine") != record["environment"]["machine"]:
+        print("Warning: baseline was recorded on a different machine type; comparisons may be noisy.")
+    for name, installed, recorded in version_mismatches(record["environment"], baseline.get("environment", {})):
+        print(f"Warning: baseline was recorded with {name} {recorded}, this run uses {installed}; timings may differ for that reason alone.")
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"No regressions above {args.threshold:.0%} vs baseline.")
+        return 0
+    print(f"Regressions above {args.threshold:.0%}:")
+    for name, base_ms, current_ms, ratio in regressions:
+        print(f"  {name:<34}{base_ms:>10.3f} -> {current_ms:>10.3f} ms  (x{ratio:.2f})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Throughput and false-positive rates of diagnose_coating / assess_bode_data_quality.
+
+Feeds labelled sweeps from synthetic_eis through the app's detectors (headless, as in
+bench.py) and reports, per scenario: detector throughput, diagnosis accuracy against the
+clean-model ground truth, and how often the data-quality check flags the sweep (false
+positives on clean scenarios, detection rate on artifact scenarios).
+
+Each sweep is quality-checked against its own asset baseline (its noise-free circuit,
+as if measured when the coating was new), which is what a tagged asset gets in the
+app. Against the single bundled test-cell reference every synthetic coating deviates by
+decades, so every sweep would be flagged and neither rate would mean anything.
+
+    python benchmarks/detector_eval.py
+    python benchmarks/detector_eval.py --per-scenario 500 --output detector_eval.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+
+from bench import make_headless_tool  # noqa: E402
+import synthetic_eis  # noqa: E402
+
+BAND_BY_DIAGNOSIS = {text: band for band, text in synthetic_eis.DIAGNOSIS_LABELS.items()}
+
+
+def evaluate(tool, per_scenario, seed):
+    started = time.perf_counter()
+    library = synthetic_eis.generate_library(per_scenario, seed=seed)
+    generate_s = time.perf_counter() - started
+    total = per_scenario * len(library)
+
+    report = {
+        "sweeps": total,
+        "generate_sweeps_per_s": round(total / generate_s, 1),
+        "scenarios": {},
+    }
+    for name, batch in library.items():
+        freq = batch["freq"]
+        z_mag = np.abs(batch["z"])
+
+        started = time.perf_counter()
+        diagnoses = [tool.diagnose_coating(row, freq) for row in z_mag]
+        diagnose_s = time.perf_counter() - started
+
+        baselines = tool.resampler.resample(freq, np.log10(np.abs(batch["z_clean"])))
+        log_freq = tool.resampler.target_log_freq
+        qualities = []
+        quality_s = 0.0
+        for row, baseline in zip(z_mag, baselines):
+            tool._select_quality_reference = lambda baseline=baseline: ("asset baseline", log_freq, baseline)
+            started = time.perf_counter()
+            qualities.append(tool.assess_bode_data_quality(freq, row))
+            quality_s += time.perf_counter() - started
+        del tool._select_quality_reference
+
+        predicted = np.array([BAND_BY_DIAGNOSIS.get(d, "unknown") for d in diagnoses])
+        flagged = np.array([not q["ok"] for q in qualities])
+        clean = not batch["artifacts"]
+        # Group warnings by their text with the measured value stripped, e.g. "... is high".
+        warnings = Counter(re.sub(r"\s*\(.*\)\.?$", "", w) for q in qualities for w in q.get("warnings", []))
+        report["scenarios"][name] = {
+            "artifacts": list(batch["artifacts"]),
+            "diagnosis_accuracy": round(float(np.mean(predicted == batch["diagnosis"])), 4),
+            # For clean scenarios every flag is a false positive; otherwise it is a detection.
+            "quality_false_positive_rate" if clean else "quality_detection_rate": round(float(np.mean(flagged)), 4),
+            "diagnose_per_s": round(len(diagnoses) / diagnose_s, 1),
+            "assess_quality_per_s": round(len(qualities) / quality_s, 1),
+            "top_warnings": {text: count for text, count in warnings.most_common(3)},
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate EIS detectors on synthetic sweeps")
+    parser.add_argument("--per-scenario", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=20260226)
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = evaluate(make_headless_tool(), args.per_scenario, args.seed)
+    print(f"Generated {report['sweeps']} sweeps ({report['generate_sweeps_per_s']:.0f} sweeps/s)")
+    print(f"{'scenario':<24}{'diag acc':>9}{'QC flag':>9}  {'kind':<10}{'diag/s':>10}{'QC/s':>9}")
+    for name, row in report["scenarios"].items():
+        kind = "false-pos" if not row["artifacts"] else "detected"
+        rate = row.get("quality_false_positive_rate", row.get("quality_detection_rate"))
+        print(
+            f"{name:<24}{row['diagnosis_accuracy']:>9.1%}{rate:>9.1%}  {kind:<10}"
+            f"{row['diagnose_per_s']:>10.0f}{row['assess_quality_per_s']:>9.0f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import os
+import queue
+import random
+import tarfile
+import threading
+import time
+import urllib.parse
+
+
+class UploadManifest:
+    """Durable record of queue files that were already uploaded (keyed by content hash)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.uploaded = {}
+        self.rejected = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if isinstance(raw, dict):
+                self.uploaded = dict(raw.get("uploaded", {}))
+                self.rejected = dict(raw.get("rejected", {}))
+        except Exception:
+            # A corrupt manifest must not stop uploads; keep the bad copy for inspection.
+            try:
+                os.replace(self.path, self.path + ".corrupt")
+            except Exception:
+                pass
+
+    def is_known(self, digest):
+        with self._lock:
+            return digest in self.uploaded or digest in self.rejected
+
+    def is_rejected(self, digest):
+        with self._lock:
+            return digest in self.rejected
+
+    def mark_uploaded(self, files, batch_id):
+        """Record a successful batch; files is a list of (name, digest, size)."""
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            for name, digest, size in files:
+                self.uploaded[digest] = {"file": name, "size": size, "batch": batch_id, "uploaded_at": stamp}
+            self._write_locked()
+
+    def mark_rejected(self, files, reason):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            for name, digest, size in files:
+                self.rejected[digest] = {"file": name, "size": size, "reason": str(reason), "rejected_at": stamp}
+            self._write_locked()
+
+    def _write_locked(self):
+        """Write via temp file + fsync + rename so a crash never leaves a half-written manifest."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"uploaded": self.uploaded, "rejected": self.rejected}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class HttpConnectionPool:
+    """Small pool of keep-alive HTTP(S) connections to a single upload endpoint."""
+
+    def __init__(self, endpoint, size=2, timeout=20.0):
+        parsed = urllib.parse.urlsplit(endpoint)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Unsupported upload endpoint: {endpoint}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path = f"{self.path}?{parsed.query}"
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=max(1, int(size)))
+
+    def _new_connection(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, body, headers):
+        """Send one request and return (status, response_body); failed connections are discarded."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection()
+        try:
+            conn.request(method, self.path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            status = response.status
+            reusable = not response.will_close
+        except Exception:
+            conn.close()
+            raise
+        if reusable:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        else:
+            conn.close()
+        return status, payload
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+            except Exception:
+                continue
+
+
+class UploadRejected(Exception):
+    """Endpoint refused a batch permanently (4xx other than 408/429)."""
+
+
+class CloudUploadWorker:
+    """Watch the upload queue directory and ship new files in compressed batches.
+
+    Queue files are copies of exports: once uploaded they are deleted, and refused
+    ones are moved to ``rejected/`` for inspection, so each poll only looks at files
+    still waiting. Digests are cached by (size, mtime) so a file that keeps failing
+    is not re-hashed on every poll.
+    """
+
+    RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        queue_dir,
+        endpoint,
+        manifest_path=None,
+        token=None,
+        file_suffixes=(".csv",),
+        batch_max_files=20,
+        batch_max_bytes=4 * 1024 * 1024,
+        poll_interval=10.0,
+        min_file_age=2.0,
+        max_attempts=6,
+        backoff_base=1.0,
+        backoff_max=120.0,
+        pool_size=2,
+        timeout=20.0,
+        log=None,
+    ):
+        self.queue_dir = queue_dir
+        self.endpoint = endpoint
+        self.manifest = UploadManifest(manifest_path or os.path.join(queue_dir, ".upload_manifest.json"))
+        self.rejected_dir = os.path.join(queue_dir, "rejected")
+        self._digests = {}  # name -> ((size, mtime_ns), digest)
+        self.token = token
+        self.file_suffixes = tuple(s.lower() for s in file_suffixes)
+        self.batch_max_files = max(1, int(batch_max_files))
+        self.batch_max_bytes = max(1, int(batch_max_bytes))
+        self.poll_interval = float(poll_interval)
+        self.min_file_age = float(min_file_age)
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.pool = HttpConnectionPool(endpoint, size=pool_size, timeout=timeout)
+        self._log = log or (lambda _msg: None)
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    # --- lifecycle ---
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(self.queue_dir, exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="cloud-upload", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.pool.close()
+
+    def wake(self):
+        """Ask the worker to scan the queue now instead of waiting for the next poll."""
+        self._wake_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                self._log(f"Cloud upload error: {e}")
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+
+    # --- queue handling ---
+
+    def pending_files(self):
+        """Return [(path, name, digest, size)] for settled queue files not yet in the manifest."""
+        try:
+            names = sorted(os.listdir(self.queue_dir))
+        except FileNotFoundError:
+            return []
+
+        now = time.time()
+        pending = []
+        digests = {}
+        pending_digests = set()
+        for name in names:
+            if name.startswith(".") or not name.lower().endswith(self.file_suffixes):
+                continue
+            path = os.path.join(self.queue_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not os.path.isfile(path) or now - stat.st_mtime < self.min_file_age:
+                continue
+            key = (int(stat.st_size), stat.st_mtime_ns)
+            cached = self._digests.get(name)
+            if cached is not None and cached[0] == key:
+                digest = cached[1]
+            else:
+                try:
+                    digest = _file_sha256(path)
+                except OSError:
+                    continue
+            if self.manifest.is_known(digest):
+                # Same content was already sent (or refused): this copy is not needed.
+                self._retire(path, name, rejected=self.manifest.is_rejected(digest))
+                continue
+            digests[name] = (key, digest)
+            # Identical files in one scan only need to go up once; the copies are
+            # cleared on the next scan.
+            if digest in pending_digests:
+                continue
+            pending_digests.add(digest)
+            pending.append((path, name, digest, int(stat.st_size)))
+        self._digests = digests
+        return pending
+
+    def _retire(self, path, name, rejected=False):
+        """Delete an uploaded queue file; rejected ones are kept in rejected/."""
+        try:
+            if rejected:
+                os.makedirs(self.rejected_dir, exist_ok=True)
+                os.replace(path, os.path.join(self.rejected_dir, name))
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._log(f"Could not clear {name} from the upload queue: {e}")
+
+    def _split_batches(self, pending):
+        batch, batch_bytes = [], 0
+        for item in pending:
+            size = item[3]
+            if batch and (len(batch) >= self.batch_max_files or batch_bytes + size > self.batch_max_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(item)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    def drain_once(self):
+        """Upload everything currently pending; returns the number of files uploaded."""
+        uploaded = 0
+        for batch in self._split_batches(self.pending_files()):
+            if self._stop_event.is_set():
+                break
+            files = [(name, digest, size) for _path, name, digest, size in batch]
+            try:
+                batch_id = self._upload_batch_with_retry(batch)
+            except UploadRejected as e:
+                self.manifest.mark_rejected(files, e)
+                for path, name, _digest, _size in batch:
+                    self._retire(path, name, rejected=True)
+                self._log(f"Cloud upload rejected {len(files)} file(s): {e}")
+                continue
+            if batch_id is None:
+                break
+            self.manifest.mark_uploaded(files, batch_id)
+            for path, name, _digest, _size in batch:
+                self._retire(path, name)
+            uploaded += len(files)
+            self._log(f"Uploaded {len(files)} file(s) to cloud (batch {batch_id[:12]}).")
+        return uploaded
+
+    def _upload_batch_with_retry(self, batch):
+        """Return the batch id on success, None when retries are exhausted or stop was requested."""
+        body = build_batch_archive(batch)
+        # Deterministic id so a retried batch is recognisable server-side as the same upload.
+        batch_id = hashlib.sha256("".join(sorted(item[2] for item in batch)).encode("ascii")).hexdigest()
+        headers = {
+            "Content-Type": "application/gzip",
+            "Content-Length": str(len(body)),
+            "Idempotency-Key": batch_id,
+            "X-Batch-Files": str(len(batch)),
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                status, payload = self.pool.request("POST", body, headers)
+                if 200 <= status < 300:
+                    return batch_id
+                if status not in self.RETRYABLE_STATUSES:
+                    detail = payload[:200].decode("utf-8", "replace").strip()
+                    raise UploadRejected(f"HTTP {status}" + (f": {detail}" if detail else ""))
+                reason = f"HTTP {status}"
+            except UploadRejected:
+                raise
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+
+            if attempt >= self.max_attempts:
+                self._log(f"Cloud upload failed after {attempt} attempts ({reason}); will retry on next scan.")
+                return None
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+            delay *= random.uniform(0.5, 1.0)
+            self._log(f"Cloud upload attempt {attempt}/{self.max_attempts} failed ({reason}); retrying in {delay:.1f}s.")
+            if self._stop_event.wait(delay):
+                return None
+        return None
+
+
+def build_batch_archive(batch):
+    """Pack batch files into a gzip-compressed tar held in memory."""
+    raw = io.BytesIO()
+    with tarfile.open(fileobj=raw, mode="w") as tar:
+        for path, name, _digest, _size in batch:
+            tar.add(path, arcname=name, recursive=False)
+    return gzip.compress(raw.getvalue(), compresslevel=6, mtime=0)
+
+
+def write_queue_file_atomic(queue_dir, filename, write_fn):
+    """Write a queue file through a hidden temp name so the watcher never sees partial data."""
+    os.makedirs(queue_dir, exist_ok=True)
+    final_path = os.path.join(queue_dir, filename)
+    tmp_path = os.path.join(queue_dir, f".{filename}.part")
+    write_fn(tmp_path)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def _file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
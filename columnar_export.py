@@ -0,0 +1,221 @@
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+from lazy_imports import LazyModule
+
+# Only probe for the optional libraries here; pyarrow / PyTables are imported on first use.
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+HDF5_AVAILABLE = importlib.util.find_spec("tables") is not None
+
+pa = LazyModule("pyarrow")
+pa_ipc = LazyModule("pyarrow.ipc")
+pq = LazyModule("pyarrow.parquet")
+
+
+FORMAT_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".h5": "hdf5",
+    ".hdf5": "hdf5",
+}
+
+# Per-run metadata repeated on every row so any single file slice is self-describing.
+METADATA_COLUMNS = ("run_id", "asset_id", "timestamp", "mode", "profile", "diagnosis")
+HDF5_STRING_SIZES = {"run_id": 40, "asset_id": 48, "timestamp": 20, "mode": 24, "profile": 48, "diagnosis": 64}
+
+
+def available_formats():
+    """Return {format_name: (label, pattern)} for formats whose libraries are installed."""
+    formats = {}
+    if ARROW_AVAILABLE:
+        formats["parquet"] = ("Parquet File", "*.parquet")
+        formats["feather"] = ("Feather File", "*.feather")
+    if HDF5_AVAILABLE:
+        formats["hdf5"] = ("HDF5 File", "*.h5")
+    return formats
+
+
+def format_for_path(path):
+    """Map a file extension onto a columnar format name, or None for anything else."""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(str(path))[1].lower())
+
+
+def sweep_columns(frequency, z_real, z_imag, time_s=None):
+    """Full per-point sweep columns: frequency, Z', Z'', |Z|, phase and elapsed time."""
+    freq = np.asarray(frequency, dtype=np.float64)
+    z_real = np.asarray(z_real, dtype=np.float64)
+    z_imag = np.asarray(z_imag, dtype=np.float64)
+    n = min(freq.size, z_real.size, z_imag.size)
+    freq, z_real, z_imag = freq[:n], z_real[:n], z_imag[:n]
+    if time_s is None:
+        t = np.full(n, np.nan)
+    else:
+        t = np.asarray(time_s, dtype=np.float64)[:n]
+        if t.size < n:
+            t = np.concatenate([t, np.full(n - t.size, np.nan)])
+    return {
+        "point_index": np.arange(n, dtype=np.int32),
+        "frequency_hz": freq,
+        "z_real_ohm": z_real,
+        "z_imag_ohm": z_imag,
+        "z_mag_ohm": np.hypot(z_real, z_imag),
+        "phase_deg": np.degrees(np.arctan2(z_imag, z_real)),
+        "time_s": t,
+    }
+
+
+def _run_metadata(meta):
+    return {key: str(meta.get(key, "") or "") for key in METADATA_COLUMNS}
+
+
+def _arrow_schema():
+    fields = [pa.field(key, pa.string()) for key in METADATA_COLUMNS]
+    fields += [
+        pa.field("point_index", pa.int32()),
+        pa.field("frequency_hz", pa.float64()),
+        pa.field("z_real_ohm", pa.float64()),
+        pa.field("z_imag_ohm", pa.float64()),
+        pa.field("z_mag_ohm", pa.float64()),
+        pa.field("phase_deg", pa.float64()),
+        pa.field("time_s", pa.float64()),
+    ]
+    return pa.schema(fields, metadata={b"eis.schema": b"sweep-v1"})
+
+
+class SweepArchiveWriter:
+    """Streaming writer that appends one run at a time to a Parquet, Feather or HDF5 file."""
+
+    def __init__(self, path, fmt=None, file_metadata=None, compression="zstd"):
+        self.path = path
+        self.fmt = fmt or format_for_path(path)
+        if self.fmt is None:
+            raise ValueError(f"Unsupported export format for {path}")
+        if self.fmt in ("parquet", "feather") and not ARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed. Install with: pip install pyarrow")
+        if self.fmt == "hdf5" and not HDF5_AVAILABLE:
+            raise RuntimeError("PyTables is not installed. Install with: pip install tables")
+
+        self.rows_written = 0
+        self.runs_written = 0
+        self._tmp_path = f"{path}.part"
+        self._writer = None
+        self._sink = None
+        self._store = None
+
+        if self.fmt in ("parquet", "feather"):
+            schema = _arrow_schema()
+            if file_metadata:
+                merged = dict(schema.metadata or {})
+                merged[b"eis.file"] = json.dumps(file_metadata, default=str).encode("utf-8")
+                schema = schema.with_metadata(merged)
+            self._schema = schema
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._tmp_path, schema, compression=compression)
+            else:
+                self._sink = pa.OSFile(self._tmp_path, "wb")
+                options = pa_ipc.IpcWriteOptions(compression=compression)
+                self._writer = pa_ipc.new_file(self._sink, schema, options=options)
+        else:
+            import pandas as pd
+            self._store = pd.HDFStore(self._tmp_path, mode="w", complevel=5, complib="zlib")
+            self._file_metadata = file_metadata or {}
+
+    def write_run(self, meta, frequency, z_real, z_imag, time_s=None):
+        """Append a single sweep; each run becomes its own row group / record batch."""
+        columns = sweep_columns(frequency, z_real, z_imag, time_s)
+        n = columns["frequency_hz"].size
+        if n == 0:
+            return 0
+        run_meta = _run_metadata(meta)
+
+        if self.fmt in ("parquet", "feather"):
+            # Repeated metadata compresses to almost nothing (Parquet dictionary-encodes it).
+            arrays = [pa.array([run_meta[key]] * n, type=pa.string()) for key in METADATA_COLUMNS]
+            for field in self._schema:
+                if field.name not in METADATA_COLUMNS:
+                    arrays.append(pa.array(columns[field.name], type=field.type))
+            self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+        else:
+            import pandas as pd
+            frame = pd.DataFrame(columns)
+            for key in METADATA_COLUMNS:
+                frame.insert(METADATA_COLUMNS.index(key), key, run_meta[key][:HDF5_STRING_SIZES[key]])
+            self._store.append(
+                "sweeps",
+                frame,
+                format="table",
+                data_columns=["run_id", "frequency_hz"],
+                min_itemsize=HDF5_STRING_SIZES,
+                index=False,
+            )
+
+        self.rows_written += n
+        self.runs_written += 1
+        return n
+
+    def close(self):
+        """Finish the file and move it into place."""
+        if self.fmt in ("parquet", "feather"):
+            self._writer.close()
+            if self._sink is not None:
+                self._sink.close()
+        else:
+            if self._file_metadata and self.runs_written:
+                self._store.get_storer("sweeps").attrs.eis_file = self._file_metadata
+            self._store.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        try:
+            if self.fmt in ("parquet", "feather"):
+                self._writer.close()
+                if self._sink is not None:
+                    self._sink.close()
+            else:
+                self._store.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def export_sweep(path, meta, frequency, z_real, z_imag, time_s=None):
+    """Write a single run to a columnar file."""
+    with SweepArchiveWriter(path, file_metadata={"runs": 1}) as writer:
+        writer.write_run(meta, frequency, z_real, z_imag, time_s)
+    return path
+
+
+def export_history(path, entries, should_stop=None):
+    """Stream every run-history entry with a stored sweep into one columnar archive."""
+    runs = [entry for entry in entries if entry.get("sweep")]
+    with SweepArchiveWriter(path, file_metadata={"runs": len(runs)}) as writer:
+        for entry in runs:
+            if should_stop is not None and should_stop():
+                raise RuntimeError("History export cancelled")
+            sweep = entry["sweep"]
+            writer.write_run(
+                entry,
+                sweep.get("frequency", []),
+                sweep.get("z_real", []),
+                sweep.get("z_imag", []),
+                sweep.get("time_s"),
+            )
+        return writer.runs_written, writer.rows_written
@@ -0,0 +1,216 @@
+"""Asyncio loop for instrument I/O, running in one background thread.
+
+PalmSens SDK calls are blocking, so the async wrappers here hand them to a small,
+bounded executor owned by the loop and put a per-operation timeout around each one.
+Any number of instruments, stop requests or uploads can then share one loop and a
+fixed set of threads instead of starting a new thread per call.
+
+Worker threads that already run a sequential flow (connect, measure) call ``run()``
+to wait for a coroutine while honouring their cancel token; Tk code calls ``submit()``
+and gets the result back on the Tk thread through ``deliver()``.
+
+A timed-out SDK call cannot be interrupted: the coroutine gives up and raises
+``DeviceTimeout`` while the blocked call finishes (or fails) in the executor.
+Stop calls therefore run on their own single-thread executor, and a stop chain gives
+up after the first timeout, so a hung stop can never use up the threads that connect
+and measure need.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+# Seconds; None means no limit (measurements are bounded by the user's stop instead).
+DEFAULT_TIMEOUTS = {
+    "discover": 30.0,
+    "connect": 20.0,
+    "disconnect": 5.0,
+    "serial": 5.0,
+    "stop": 3.0,
+    "measure": None,
+}
+
+# Stop/abort entry points seen across pypalmsens versions, tried in order.
+STOP_METHOD_NAMES = (
+    "stop_measurement",
+    "abort_measurement",
+    "cancel_measurement",
+    "break_measurement",
+    "stop",
+    "abort",
+)
+
+
+class DeviceTimeout(TimeoutError):
+    def __init__(self, operation, seconds):
+        super().__init__(f"{operation} timed out after {seconds:g} s")
+        self.operation = operation
+        self.seconds = seconds
+
+
+class DeviceIOLoop:
+    """An asyncio event loop in a daemon thread, started on first use."""
+
+    def __init__(self, max_blocking_calls=4, timeouts=None, name="device-io"):
+        self.name = name
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self._max_blocking_calls = max(1, int(max_blocking_calls))
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._stop_executor = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            ready = threading.Event()
+            loop = asyncio.new_event_loop()
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_blocking_calls,
+                thread_name_prefix=f"{self.name}-call",
+            )
+            loop.set_default_executor(self._executor)
+            self._stop_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"{self.name}-stop",
+            )
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
+
+    @property
+    def running(self):
+        return self._loop is not None and self._loop.is_running()
+
+    def submit(self, coro):
+        """Schedule coro on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro, cancel_event=None, poll=0.1):
+        """Block the calling (non-loop) thread until coro finishes.
+
+        When cancel_event is set first, the coroutine is cancelled and
+        ``concurrent.futures.CancelledError`` is raised.
+        """
+        future = self.submit(coro)
+        if cancel_event is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=poll)
+            except concurrent.futures.TimeoutError:
+                if cancel_event.is_set():
+                    future.cancel()
+                    raise concurrent.futures.CancelledError()
+
+    @staticmethod
+    def deliver(future, dispatch, on_success=None, on_error=None):
+        """Bridge a future back to the UI: dispatch(on_success, result) or dispatch(on_error, exc)."""
+
+        def _done(fut):
+            if fut.cancelled():
+                return
+            error = fut.exception()
+            if error is not None:
+                if on_error is not None:
+                    dispatch(on_error, error)
+            elif on_success is not None:
+                dispatch(on_success, fut.result())
+
+        future.add_done_callback(_done)
+        return future
+
+    async def blocking(self, operation, fn, *args, timeout="default"):
+        """Run a blocking call in the loop's executor under the operation's timeout.
+
+        "stop" calls use the dedicated stop executor instead of the shared pool.
+        """
+        if timeout == "default":
+            timeout = self.timeouts.get(operation)
+        loop = asyncio.get_running_loop()
+        executor = self._stop_executor if operation == "stop" else None
+        call = loop.run_in_executor(executor, lambda: fn(*args))
+        if timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise DeviceTimeout(operation, timeout) from None
+
+    def stop(self, timeout=1.0):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            executors = (self._executor, self._stop_executor)
+            self._loop = self._thread = self._executor = self._stop_executor = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        if not thread.is_alive():
+            loop.close()
+
+
+async def discover(io, ps, **kwargs):
+    """ps.discover(**kwargs) as a list, under the "discover" timeout."""
+    return await io.blocking("discover", lambda: list(ps.discover(**kwargs)))
+
+
+class AsyncInstrumentManager:
+    """Async wrappers around one blocking pypalmsens InstrumentManager."""
+
+    def __init__(self, io, manager):
+        self.io = io
+        self.manager = manager
+
+    async def connect(self):
+        return await self.io.blocking("connect", self.manager.connect)
+
+    async def disconnect(self):
+        return await self.io.blocking("disconnect", self.manager.disconnect)
+
+    async def serial(self):
+        return await self.io.blocking("serial", self.manager.get_instrument_serial)
+
+    async def measure(self, method, callback=None):
+        return await self.io.blocking("measure", lambda: self.manager.measure(method, callback=callback))
+
+    async def stop(self):
+        """Try each known stop entry point; returns (description or None, [failure messages]).
+
+        A timeout ends the chain: the instrument is not answering, and the hung call
+        still holds the stop executor.
+        """
+        failures = []
+        for name in STOP_METHOD_NAMES:
+            method = getattr(self.manager, name, None)
+            if not callable(method):
+                continue
+            for args in ((), (True,)):
+                try:
+                    await self.io.blocking("stop", method, *args)
+                    return f"manager.{name}({', '.join(map(str, args))})", failures
+                except TypeError:
+                    if args:
+                        failures.append(f"{name}: unsupported signature")
+                    continue
+                except DeviceTimeout as e:
+                    failures.append(f"{name}: {e}")
+                    return None, failures
+                except Exception as e:
+                    failures.append(f"{name}: {e}")
+                    break
+        return None, failures
@@ -0,0 +1,201 @@
+"""Sweep duration model and time-weighted progress.
+
+Measuring one frequency costs a fixed overhead (settling, transfer over the link)
+plus a number of signal periods:
+
+    seconds(f) = overhead + cycles / f
+
+so a sweep's duration is the sum over its grid and the low frequencies dominate.
+Each profile's (overhead, cycles) is a least-squares fit to the point timestamps
+stored with its runs: the time from a run's first timed point to its k-th is
+modelled as ``overhead * k + cycles * sum(1/f)`` over points 1..k. Every run adds
+its rows to 2x2 normal equations (and a run trimmed from the history subtracts
+them again), so neither ever refits the whole history.
+Profiles without timed runs fall back to all runs, then to defaults fitted to the
+bundled test recording.
+
+``SweepProgress`` turns a model and the planned grid into a time-weighted
+fraction done and an ETA that is scaled by how fast the running sweep is going.
+"""
+
+import time
+
+import numpy as np
+
+# Fitted to 11_12_25_test5.csv (26 points, 10 kHz to 0.1 Hz, 204 s).
+DEFAULT_OVERHEAD_S = 5.0
+DEFAULT_CYCLES = 1.5
+MIN_TIMED_POINTS = 5
+ALL_PROFILES = None
+
+
+class DurationModel:
+    __slots__ = ("overhead", "cycles", "runs")
+
+    def __init__(self, overhead=DEFAULT_OVERHEAD_S, cycles=DEFAULT_CYCLES, runs=0):
+        self.overhead = float(overhead)
+        self.cycles = float(cycles)
+        self.runs = int(runs)
+
+    def point_seconds(self, freq):
+        return self.overhead + self.cycles / np.asarray(freq, dtype=float)
+
+    def sweep_seconds(self, freq):
+        return float(np.sum(self.point_seconds(freq)))
+
+    def describe(self):
+        source = f"fitted to {self.runs} run(s)" if self.runs else "default"
+        return f"{self.overhead:.2f} s + {self.cycles:.2f} cycles per frequency, {source}"
+
+
+def timed_points(entry):
+    """(freq, seconds since the first timed point) of a history entry in time order, or None."""
+    sweep = entry.get("sweep") or {}
+    if sweep.get("time_s") is None:
+        return None
+    try:
+        freq = np.asarray(sweep.get("frequency", []), dtype=float)
+        times = np.asarray(sweep["time_s"], dtype=float)
+    except (TypeError, ValueError):
+        return None
+    n = min(freq.size, times.size)
+    freq, times = freq[:n], times[:n]
+    ok = np.isfinite(freq) & (freq > 0) & np.isfinite(times)
+    if np.count_nonzero(ok) < MIN_TIMED_POINTS:
+        return None
+    freq, times = freq[ok], times[ok]
+    order = np.argsort(times, kind="stable")
+    return freq[order], times[order] - times[order[0]]
+
+
+class _NormalEquations:
+    def __init__(self):
+        self.xx = np.zeros((2, 2))
+        self.xy = np.zeros(2)
+        self.runs = 0
+
+    def add(self, freq, elapsed, sign=1):
+        # Point 0 only fixes the time origin; point k adds the cost of points 1..k.
+        inverse = 1.0 / freq
+        x = np.column_stack((np.arange(freq.size, dtype=float), np.cumsum(inverse) - inverse[0]))[1:]
+        y = elapsed[1:]
+        self.xx += sign * (x.T @ x)
+        self.xy += sign * (x.T @ y)
+        self.runs += sign
+
+    def model(self):
+        if self.runs == 0:
+            return None
+        try:
+            overhead, cycles = np.linalg.solve(self.xx, self.xy)
+        except np.linalg.LinAlgError:
+            return None
+        # Keep both terms non-negative (refit the other one alone).
+        if overhead < 0:
+            overhead, cycles = 0.0, self.xy[1] / self.xx[1, 1]
+        elif cycles < 0:
+            overhead, cycles = self.xy[0] / self.xx[0, 0], 0.0
+        if not (np.isfinite(overhead) and np.isfinite(cycles)):
+            return None
+        return DurationModel(overhead, cycles, self.runs)
+
+
+class DurationEstimator:
+    """Per-profile DurationModels fed run by run from the run history."""
+
+    def __init__(self):
+        self._stats = {}
+        self._models = {}
+
+    def rebuild(self, history):
+        self._stats = {}
+        self._models = {}
+        for entry in history:
+            self.add_run(entry)
+
+    def add_run(self, entry):
+        """Add one run's timestamps; returns False when it has none usable."""
+        points = timed_points(entry)
+        if points is None:
+            return False
+        profile = str(entry.get("profile") or "Recommended")
+        for key in (profile, ALL_PROFILES):
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _NormalEquations()
+            stats.add(*points)
+            self._models.pop(key, None)
+        return True
+
+    def remove_run(self, entry):
+        """Take back a run added earlier (trimmed from the history)."""
+        points = timed_points(entry)
+        if points is None:
+            return False
+        profile = str(entry.get("profile") or "Recommended")
+        for key in (profile, ALL_PROFILES):
+            stats = self._stats.get(key)
+            if stats is None:
+                continue
+            stats.add(*points, sign=-1)
+            if stats.runs <= 0:
+                del self._stats[key]
+            self._models.pop(key, None)
+        return True
+
+    def model(self, profile=None):
+        """Model for profile, else for all runs, else the defaults."""
+        for key in (profile, ALL_PROFILES):
+            if key not in self._stats:
+                continue
+            if key not in self._models:
+                self._models[key] = self._stats[key].model()
+            if self._models[key] is not None:
+                return self._models[key]
+        return DurationModel()
+
+
+class SweepProgress:
+    """Time-weighted progress and ETA over a planned grid (in measurement order).
+
+    ``done`` points of the grid are already measured when the run starts (resumed
+    sweeps); the ETA only compares this run's elapsed time with the rest.
+    """
+
+    def __init__(self, model, planned_freq, done=0, started=None):
+        seconds = model.point_seconds(planned_freq)
+        self.cumulative = np.concatenate(([0.0], np.cumsum(seconds)))
+        self.total = float(self.cumulative[-1])
+        self.done = self._clamp(done)
+        self.started = time.monotonic() if started is None else float(started)
+
+    def _clamp(self, count):
+        return min(max(int(count), 0), self.cumulative.size - 1)
+
+    @property
+    def remaining(self):
+        """Model seconds left at the start of this run."""
+        return self.total - float(self.cumulative[self.done])
+
+    def fraction(self, count):
+        if self.total <= 0:
+            return 0.0
+        return float(self.cumulative[self._clamp(count)]) / self.total
+
+    def eta_seconds(self, count, now=None):
+        count = self._clamp(count)
+        elapsed = (time.monotonic() if now is None else now) - self.started
+        expected = float(self.cumulative[count] - self.cumulative[self.done])
+        # Scale the model by this run's pace, trusting the model more early on.
+        prior = 0.1 * max(self.remaining, 1.0)
+        scale = (elapsed + prior) / (expected + prior)
+        return max(0.0, (self.total - float(self.cumulative[count])) * scale)
+
+
+def format_duration(seconds):
+    seconds = int(round(max(0.0, float(seconds))))
+    if seconds >= 3600:
+        return f"{seconds // 3600} h {seconds % 3600 // 60:02d} min"
+    if seconds >= 60:
+        return f"{seconds // 60} min {seconds % 60:02d} s"
+    return f"{seconds} s"
@@ -0,0 +1,223 @@
+import json
+import os
+import queue
+import threading
+import time
+
+TRACE = 5
+DEBUG = 10
+INFO = 20
+NOTICE = 25  # technician-facing messages (what the Output Log shows)
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {
+    TRACE: "TRACE",
+    DEBUG: "DEBUG",
+    INFO: "INFO",
+    NOTICE: "NOTICE",
+    WARNING: "WARNING",
+    ERROR: "ERROR",
+}
+
+
+class Event:
+    """One structured event; the human-readable message is only formatted on first use."""
+
+    __slots__ = ("ts", "level", "category", "template", "fields", "_message")
+
+    def __init__(self, level, category, template, fields):
+        self.ts = time.time()
+        self.level = level
+        self.category = category
+        self.template = template
+        self.fields = fields
+        self._message = None
+
+    @property
+    def level_name(self):
+        return LEVEL_NAMES.get(self.level, str(self.level))
+
+    @property
+    def message(self):
+        if self._message is None:
+            if self.fields:
+                try:
+                    self._message = str(self.template).format(**self.fields)
+                except Exception:
+                    self._message = f"{self.template} {self.fields}"
+            else:
+                self._message = str(self.template)
+        return self._message
+
+    def to_dict(self):
+        record = {
+            "ts": round(self.ts, 6),
+            "level": self.level_name,
+            "category": self.category,
+            "msg": self.message,
+        }
+        if self.fields:
+            record["fields"] = self.fields
+        return record
+
+
+class _Subscription:
+    __slots__ = ("handler", "min_level", "categories", "accept_trace")
+
+    def __init__(self, handler, min_level, categories, accept_trace):
+        self.handler = handler
+        self.min_level = min_level
+        self.categories = frozenset(categories) if categories else None
+        self.accept_trace = accept_trace
+
+
+class EventBus:
+    """Leveled, categorized event stream with cheap is_enabled() guards for hot paths.
+
+    A subscription receives events at or above its min_level (optionally only for
+    some categories). Subscriptions created with accept_trace=True additionally get
+    every event from categories switched on with set_trace(), whatever the level.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs = ()
+        self._trace = frozenset()
+        self._enabled_cache = {}
+
+    def subscribe(self, handler, min_level=INFO, categories=None, accept_trace=False):
+        sub = _Subscription(handler, min_level, categories, accept_trace)
+        with self._lock:
+            self._subs = self._subs + (sub,)
+            self._enabled_cache = {}
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs = tuple(s for s in self._subs if s is not sub)
+            self._enabled_cache = {}
+
+    def set_trace(self, categories):
+        """Enable full tracing for the given categories ("*" traces everything)."""
+        with self._lock:
+            self._trace = frozenset(c.strip() for c in categories if c and c.strip())
+            self._enabled_cache = {}
+
+    @property
+    def traced_categories(self):
+        return self._trace
+
+    def _accepts(self, sub, level, category):
+        if sub.categories is not None and category not in sub.categories:
+            return False
+        if level >= sub.min_level:
+            return True
+        return sub.accept_trace and ("*" in self._trace or category in self._trace)
+
+    def is_enabled(self, level, category):
+        """True when at least one subscriber would receive this event."""
+        key = (level, category)
+        enabled = self._enabled_cache.get(key)
+        if enabled is None:
+            enabled = any(self._accepts(sub, level, category) for sub in self._subs)
+            self._enabled_cache[key] = enabled
+        return enabled
+
+    def emit(self, level, category, template, **fields):
+        if not self.is_enabled(level, category):
+            return
+        event = Event(level, category, template, fields)
+        for sub in self._subs:
+            if self._accepts(sub, level, category):
+                try:
+                    sub.handler(event)
+                except Exception:
+                    pass
+
+    def trace(self, category, template, **fields):
+        self.emit(TRACE, category, template, **fields)
+
+    def debug(self, category, template, **fields):
+        self.emit(DEBUG, category, template, **fields)
+
+    def info(self, category, template, **fields):
+        self.emit(INFO, category, template, **fields)
+
+    def notice(self, category, template, **fields):
+        self.emit(NOTICE, category, template, **fields)
+
+    def warning(self, category, template, **fields):
+        self.emit(WARNING, category, template, **fields)
+
+    def error(self, category, template, **fields):
+        self.emit(ERROR, category, template, **fields)
+
+
+class JsonlSink:
+    """Append events as JSON lines from a background thread, rotating by size."""
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backup_count=5, flush_interval=1.0):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.backup_count = max(0, int(backup_count))
+        self.flush_interval = float(flush_interval)
+        self._queue = queue.SimpleQueue()
+        self._stop = object()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="event-jsonl", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event):
+        # Only a reference crosses threads here; formatting/serialising happens in the writer.
+        self._queue.put(event)
+
+    def close(self, timeout=2.0):
+        self._queue.put(self._stop)
+        self._thread.join(timeout)
+
+    def _rotate(self, handle):
+        handle.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{index}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _run(self):
+        handle = open(self.path, "a", encoding="utf-8")
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+                if item is self._stop:
+                    break
+                if item is not None:
+                    try:
+                        handle.write(json.dumps(item.to_dict(), default=str) + "\n")
+                    except Exception:
+                        pass
+                    if self.max_bytes > 0 and handle.tell() >= self.max_bytes:
+                        handle = self._rotate(handle)
+                now = time.monotonic()
+                if item is None or now - last_flush >= self.flush_interval:
+                    handle.flush()
+                    last_flush = now
+        finally:
+            handle.close()
+
+
+def trace_categories_from_env(environ=None):
+    """EIS_TRACE=callback,device enables tracing per category; EIS_DEBUG_LOG=1 traces everything."""
+    environ = os.environ if environ is None else environ
+    categories = [c.strip() for c in environ.get("EIS_TRACE", "").split(",") if c.strip()]
+    if environ.get("EIS_DEBUG_LOG", "").strip().lower() not in ("", "0", "false", "no"):
+        categories.append("*")
+    return categories
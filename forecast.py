@@ -0,0 +1,258 @@
+"""Per-asset failure-time forecasts from the low-frequency |Z| trend.
+
+Each asset gets a ``TrendForecaster``: a robust recursive least-squares fit of
+
+    log10|Z_ref| = a + b * t        (t in days since the asset's first run)
+
+i.e. exponential decay of |Z|. ``Z_ref`` is |Z| at one fixed reference frequency
+(0.1 Hz, the lowest every bundled profile reaches), read off each run's sweep
+through the shared ``GridResampler``, so runs of profiles that end at different
+frequencies stay on one series. Every new run is a rank-one update of the 2x2 inverse
+information matrix (Huber-weighted once there is a residual scale, with an optional
+forgetting factor), so keeping thousands of assets current costs O(1) per run and
+never refits from scratch. The forecast is the time the fitted line reaches the
+fail threshold used by ``diagnose_coating``, with a prediction interval obtained by
+inverting the line's prediction band at that threshold.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from resample import GridResampler, sweep_log_magnitude
+
+FAIL_Z_OHM = 1e5  # diagnose_coating: below this low-frequency |Z| the coating fails
+REFERENCE_FREQ_HZ = 0.1
+SECONDS_PER_DAY = 86400.0
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(text):
+    """Epoch seconds from a run-history timestamp, or None."""
+    try:
+        return time.mktime(time.strptime(str(text), TIMESTAMP_FORMAT))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def format_timestamp(seconds):
+    return time.strftime("%Y-%m-%d", time.localtime(seconds))
+
+
+# Exact two-sided t quantiles for df 1..9, where the expansion below falls short
+# (by 24% at df=1 for 95%); from df 10 on it is within 0.1%.
+T_TABLE = {
+    0.8: (3.078, 1.886, 1.638, 1.533, 1.476, 1.440, 1.415, 1.397, 1.383),
+    0.9: (6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833),
+    0.95: (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262),
+    0.99: (63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250),
+}
+
+
+def t_quantile(df, confidence=0.95):
+    """Two-sided Student-t quantile: table for small df (rounded down), Cornish-Fisher expansion above."""
+    confidence = round(confidence, 2)
+    if confidence not in T_TABLE:
+        confidence = 0.95
+    z = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}[confidence]
+    df = max(1.0, float(df))
+    table = T_TABLE[confidence]
+    if df < len(table) + 1:
+        return table[int(df) - 1]
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+    )
+
+
+class TrendForecaster:
+    """Recursive (Huber-weighted) least squares on log10|Z| vs time for one asset."""
+
+    def __init__(self, forgetting=1.0, huber=2.0, prior=1e6):
+        self.forgetting = float(forgetting)
+        self.huber = float(huber)
+        self.theta = np.zeros(2)  # [intercept a, slope b per day]
+        self.P = np.eye(2) * float(prior)
+        self.t0 = None
+        self.last_t = None
+        self.n = 0
+        self.n_eff = 0.0
+        self.rss = 0.0
+
+    def _x(self, t_seconds):
+        return np.array([1.0, (t_seconds - self.t0) / SECONDS_PER_DAY])
+
+    @property
+    def scale(self):
+        """Residual standard deviation (decades of |Z|), or None with fewer than 3 runs."""
+        if self.n < 3:
+            return None
+        dof = max(self.n_eff - 2.0, 1.0)
+        return math.sqrt(max(self.rss, 0.0) / dof)
+
+    def update(self, t_seconds, z_ohm):
+        """Add one run (epoch seconds, low-frequency |Z| in Ohm); returns False if unusable."""
+        if t_seconds is None or not (np.isfinite(z_ohm) and z_ohm > 0):
+            return False
+        if self.t0 is None:
+            self.t0 = float(t_seconds)
+        x = self._x(float(t_seconds))
+        y = math.log10(z_ohm)
+        lam = self.forgetting
+
+        error = y - float(x @ self.theta)
+        weight = 1.0
+        scale = self.scale
+        if scale is not None and scale > 0 and abs(error) > self.huber * scale:
+            weight = self.huber * scale / abs(error)
+
+        Px = self.P @ x
+        gain = Px / (lam / weight + float(x @ Px))
+        self.theta = self.theta + gain * error
+        self.P = (self.P - np.outer(gain, Px)) / lam
+        posterior_error = y - float(x @ self.theta)
+
+        self.rss = lam * self.rss + weight * error * posterior_error
+        self.n_eff = lam * self.n_eff + 1.0
+        self.n += 1
+        self.last_t = max(self.last_t or t_seconds, float(t_seconds))
+        return True
+
+    def predict(self, t_seconds, confidence=0.95):
+        """(log10|Z| fit, half-width of the prediction interval or None) at t_seconds."""
+        x = self._x(float(t_seconds))
+        fit = float(x @ self.theta)
+        scale = self.scale
+        if scale is None:
+            return fit, None
+        q = t_quantile(self.n_eff - 2.0, confidence)
+        return fit, q * scale * math.sqrt(1.0 + float(x @ self.P @ x))
+
+    def crossing(self, threshold=FAIL_Z_OHM, confidence=0.95):
+        """Forecast when |Z| reaches threshold.
+
+        Returns a dict with ``status`` ("insufficient", "stable", "failed" or
+        "forecast") and, for "forecast", epoch seconds ``expected``, ``earliest``
+        and ``latest`` (``latest`` is None when the band never clears the threshold).
+        """
+        if self.n < 3:
+            return {"status": "insufficient", "runs": self.n}
+        a, b = self.theta
+        level = math.log10(threshold)
+        scale = self.scale
+        result = {
+            "runs": self.n,
+            "confidence": confidence,
+            "slope_decades_per_year": float(b * 365.25),
+            "scale_decades": scale,
+            "threshold": threshold,
+        }
+        if float(self._x(self.last_t) @ self.theta) <= level:
+            result["status"] = "failed"
+            return result
+        if b >= 0:
+            result["status"] = "stable"
+            return result
+
+        expected_days = (level - a) / b
+        # Band crossings: (a + b t - L)^2 = k (1 + x' P x), x = [1, t]; quadratic in t.
+        k = (t_quantile(self.n_eff - 2.0, confidence) * scale) ** 2
+        c = a - level
+        p00, p01, p11 = self.P[0, 0], self.P[0, 1], self.P[1, 1]
+        qa = b * b - k * p11
+        qb = 2.0 * (c * b - k * p01)
+        qc = c * c - k * (1.0 + p00)
+        earliest_days, latest_days = None, None
+        disc = qb * qb - 4.0 * qa * qc
+        if disc >= 0 and qa != 0:
+            roots = sorted(((-qb - math.sqrt(disc)) / (2 * qa), (-qb + math.sqrt(disc)) / (2 * qa)))
+            if qa > 0:
+                earliest_days, latest_days = roots
+            else:
+                # Slope not significant: the band only bounds the crossing from below.
+                earliest_days = roots[1] if roots[1] <= expected_days else None
+        now_days = (self.last_t - self.t0) / SECONDS_PER_DAY
+        if earliest_days is None or earliest_days < now_days:
+            earliest_days = now_days
+
+        day = SECONDS_PER_DAY
+        result.update(
+            status="forecast",
+            expected=self.t0 + expected_days * day,
+            earliest=self.t0 + earliest_days * day,
+            latest=None if latest_days is None else self.t0 + latest_days * day,
+        )
+        return result
+
+
+class ForecastBank:
+    """One TrendForecaster per asset, fed run by run.
+
+    Rebuilt from the stored history at startup only; runs trimmed from the history
+    later stay folded into the fits.
+    """
+
+    def __init__(self, forgetting=1.0, huber=2.0, resampler=None, reference_hz=REFERENCE_FREQ_HZ):
+        self.forgetting = forgetting
+        self.huber = huber
+        self.resampler = resampler or GridResampler()
+        self.reference_hz = float(reference_hz)
+        self._reference_log_f = np.array([math.log10(self.reference_hz)])
+        self.models = {}
+
+    def reference_z(self, entry):
+        """|Z| of a run at the reference frequency (NaN when its sweep does not reach it).
+
+        Entries without a stored sweep fall back to their low-frequency |Z| when that
+        was measured at the reference frequency.
+        """
+        curve = sweep_log_magnitude(entry)
+        if curve is not None:
+            return float(10.0 ** self.resampler.interp(self._reference_log_f, *curve)[0])
+        low_hz = float(entry.get("low_freq_hz", np.nan))
+        if np.isfinite(low_hz) and low_hz > 0 and abs(math.log10(low_hz / self.reference_hz)) < 0.01:
+            return float(entry.get("low_freq_z", np.nan))
+        return float("nan")
+
+    def rebuild(self, history, asset_key):
+        self.models = {}
+        for entry in history:
+            self.add_run(entry, asset_key(entry))
+
+    def add_run(self, entry, asset_id):
+        model = self.models.get(asset_id)
+        if model is None:
+            model = self.models[asset_id] = TrendForecaster(self.forgetting, self.huber)
+        # Interrupted sweeps never reached the low-frequency end of the grid.
+        if not entry.get("interrupted"):
+            model.update(parse_timestamp(entry.get("timestamp")), self.reference_z(entry))
+        return model
+
+    def forecast(self, asset_id, threshold=FAIL_Z_OHM, confidence=0.95):
+        model = self.models.get(asset_id)
+        if model is None:
+            return {"status": "insufficient", "runs": 0}
+        return model.crossing(threshold, confidence)
+
+
+def describe_forecast(asset_id, forecast):
+    """One-line, human-readable summary for the log and the History tab."""
+    status = forecast.get("status")
+    threshold = forecast.get("threshold", FAIL_Z_OHM)
+    if status == "insufficient":
+        return f"Asset {asset_id}: forecast needs 3+ runs ({forecast.get('runs', 0)} so far)."
+    if status == "failed":
+        return f"Asset {asset_id}: trend is already below {threshold:.0e} Ohm."
+    slope = forecast["slope_decades_per_year"]
+    if status == "stable":
+        return f"Asset {asset_id}: no downward trend ({slope:+.2f} decades/yr); no failure forecast."
+    latest = forecast["latest"]
+    band = f"{format_timestamp(forecast['earliest'])} to {format_timestamp(latest) if latest else 'open-ended'}"
+    confidence = forecast.get("confidence", 0.95)
+    return (
+        f"Asset {asset_id}: |Z| forecast to reach {threshold:.0e} Ohm around "
+        f"{format_timestamp(forecast['expected'])} ({confidence:.0%} PI {band}; {slope:+.2f} decades/yr, {forecast['runs']} runs)."
+    )
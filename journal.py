@@ -0,0 +1,339 @@
+"""Crash-safe, append-only journal of the device sweep in progress.
+
+Every point that lands in the measurement buffers is also handed to a
+``SweepJournal``. The callback only pays for a queue put; a background thread
+wakes every ``sync_points`` points or ``sync_interval`` seconds, whichever comes
+first, appends the queued points as JSON lines and fsyncs once, so a crash loses
+at most that last batch. A run that finishes (or is stopped by the
+user) deletes its journal once it is in the run history. A journal still on disk
+at startup belongs to a run that never finished (app crash, power loss, dropped
+link) and ``recover_journals()`` reads it back, ignoring a torn last line.
+
+One JSON object per line:
+
+    {"journal": 1, "run_id": ..., "started": ..., "method": {...}, ...}   header
+    {"i": row, "f": Hz, "re": Ohm, "im": Ohm, "t": s[, "est": 1]}         point
+    {"note": {"lead_in": 4}}                                              header update
+
+Rows are buffer positions; a later line for the same row (a re-measured point)
+replaces the earlier one. ``est`` marks lead-in frequencies that only carry a
+placeholder impedance.
+
+``ResumePlan`` maps an interrupted run back onto its frequency grid: which grid
+points are already measured and the reduced scan that covers the rest.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".jsonl"
+
+
+def _fsync_directory(directory):
+    # Makes a newly created file's directory entry durable; not possible on Windows.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _point_line(row, freq, z_real, z_imag, t, estimated):
+    record = {"i": int(row), "f": float(freq), "re": float(z_real), "im": float(z_imag), "t": round(float(t), 3)}
+    if estimated:
+        record["est"] = 1
+    return json.dumps(record) + "\n"
+
+
+class SweepJournal:
+    """Background writer for one run's journal file."""
+
+    def __init__(self, directory, header, rows=(), sync_interval=1.0, sync_points=25):
+        os.makedirs(directory, exist_ok=True)
+        self.header = dict(header, journal=JOURNAL_VERSION)
+        self.path = os.path.join(directory, f"{self.header['run_id']}{JOURNAL_SUFFIX}")
+        self.sync_interval = float(sync_interval)
+        self.sync_points = max(1, int(sync_points))
+        self.started = time.monotonic()
+        self.points = len(rows)
+        self._queue = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._stop = object()
+        self._closed = False
+        # The header (and any rows carried over from a resumed run) is durable before
+        # the first new point is measured.
+        self._handle = open(self.path, "w", encoding="utf-8")
+        self._handle.write(json.dumps(self.header) + "\n")
+        for row, freq, z_real, z_imag, t, estimated in rows:
+            self._handle.write(_point_line(row, freq, z_real, z_imag, t, estimated))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        _fsync_directory(directory)
+        self._thread = threading.Thread(target=self._run, name="sweep-journal", daemon=True)
+        self._thread.start()
+
+    def record(self, row, freq, z_real, z_imag, estimated=False):
+        """Queue one buffer row (called from the SDK callback; never blocks on disk)."""
+        self._queue.put((int(row), float(freq), float(z_real), float(z_imag), time.monotonic() - self.started, estimated))
+        self.points += 1
+        # The writer sleeps between batches instead of waking per point.
+        if self.points % self.sync_points == 0:
+            self._wake.set()
+
+    def note(self, **fields):
+        """Queue a header update (e.g. the instrument's lead-in count once it is known)."""
+        self._queue.put(fields)
+
+    def close(self, discard=False, timeout=5.0):
+        """Write and fsync everything queued, then delete the file when discard is True."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(self._stop)
+            self._wake.set()
+        self._thread.join(timeout)
+        if discard and not self._thread.is_alive():
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def discard(self):
+        self.close(discard=True)
+
+    def _run(self):
+        handle = self._handle
+        stopping = False
+        try:
+            while not stopping:
+                self._wake.wait(self.sync_interval)
+                self._wake.clear()
+                written = 0
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._stop:
+                        stopping = True
+                        break
+                    if isinstance(item, dict):
+                        handle.write(json.dumps({"note": item}) + "\n")
+                    else:
+                        handle.write(_point_line(*item))
+                    written += 1
+                if written:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+        finally:
+            handle.close()
+
+
+class RecoveredSweep:
+    """Points read back from an interrupted run's journal, in buffer order."""
+
+    def __init__(self, path, header, rows):
+        self.path = path
+        self.header = header
+        order = sorted(rows)
+        self.freq = np.array([rows[i][0] for i in order], dtype=float)
+        self.z_real = np.array([rows[i][1] for i in order], dtype=float)
+        self.z_imag = np.array([rows[i][2] for i in order], dtype=float)
+        self.times = np.array([rows[i][3] for i in order], dtype=float)
+        self.estimated = [pos for pos, i in enumerate(order) if rows[i][4]]
+
+    def __len__(self):
+        return self.freq.size
+
+    @property
+    def run_id(self):
+        return self.header.get("run_id")
+
+    @property
+    def method(self):
+        return self.header.get("method") or {}
+
+    def rows(self):
+        """(row, freq, z_real, z_imag, t, estimated) tuples, renumbered 0..n-1, to seed a new journal."""
+        estimated = set(self.estimated)
+        times = np.nan_to_num(self.times, nan=0.0)
+        return [
+            (pos, self.freq[pos], self.z_real[pos], self.z_imag[pos], times[pos], pos in estimated)
+            for pos in range(self.freq.size)
+        ]
+
+    @property
+    def lead_in(self):
+        """Frequency-only points the instrument sends before impedance arrives (0 if never seen)."""
+        return int(self.header.get("lead_in", 0) or 0)
+
+    def measured_mask(self):
+        """True for rows with a measured (not placeholder) impedance."""
+        measured = np.ones(self.freq.size, dtype=bool)
+        measured[self.estimated] = False
+        return measured & np.isfinite(self.freq) & np.isfinite(self.z_real) & np.isfinite(self.z_imag)
+
+    def last_completed_frequency(self):
+        """Lowest frequency with a measured (not placeholder) impedance, or None."""
+        measured = self.measured_mask()
+        if not measured.any():
+            return None
+        return float(np.min(self.freq[measured]))
+
+    def resume_plan(self):
+        """ResumePlan over the run's original grid, or None when there is nothing left to measure."""
+        method = self.method
+        try:
+            grid = np.logspace(
+                np.log10(float(method["max_frequency"])),
+                np.log10(float(method["min_frequency"])),
+                max(2, int(method["n_frequencies"])),
+            )
+            amplitude_v = float(method["ac_potential"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        plan = ResumePlan(grid, amplitude_v, self.lead_in)
+        # Placeholder rows are already queued for re-measurement, so they count as present too.
+        for freq in self.freq:
+            k = plan.grid_index(freq)
+            if k is not None:
+                plan.done[k] = True
+        if not self.measured_mask().any() or plan.done.all():
+            return None
+        plan.plan_scan()
+        return plan
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class ResumePlan:
+    """The rest of an interrupted sweep, on the run's original (descending) grid.
+
+    ``done`` marks grid points already in the buffers. The reduced scan runs from
+    ``max_frequency`` (grid index ``offset``) down to the grid's end; it starts
+    ``lead_in`` points above the first missing frequency so the instrument's
+    frequency-only lead-in lands on points that are already measured, and always
+    has at least two points. Missing points above the scan (``gaps()``) are left to
+    the targeted re-measurement.
+    """
+
+    def __init__(self, grid, amplitude_v, lead_in=0):
+        self.grid = np.asarray(grid, dtype=float)
+        self.amplitude_v = float(amplitude_v)
+        self.lead_in = max(0, int(lead_in))
+        self.done = np.zeros(self.grid.size, dtype=bool)
+        self._log_grid = np.log10(self.grid)
+        self._step = (self._log_grid[0] - self._log_grid[-1]) / (self.grid.size - 1)
+        self.first_missing = None
+        self.offset = self.grid.size
+
+    def grid_index(self, freq):
+        """Index of the grid point within half a step of freq, or None."""
+        if not (freq > 0):
+            return None
+        position = (self._log_grid[0] - np.log10(freq)) / self._step
+        k = int(round(position))
+        if 0 <= k < self.grid.size and abs(position - k) <= 0.5:
+            return k
+        return None
+
+    def plan_scan(self):
+        measured = np.flatnonzero(self.done)
+        after_last = measured[-1] + 1 if measured.size else 0
+        self.first_missing = int(after_last) if after_last < self.grid.size else None
+        if self.first_missing is None:
+            self.offset = self.grid.size  # only gaps are left
+            return
+        self.offset = max(0, min(self.first_missing - self.lead_in, self.grid.size - 2))
+
+    @property
+    def scan_points(self):
+        return self.grid.size - self.offset
+
+    @property
+    def max_frequency(self):
+        return float(self.grid[self.offset])
+
+    @property
+    def min_frequency(self):
+        return float(self.grid[-1])
+
+    @property
+    def remaining(self):
+        """Grid points still missing."""
+        return int(self.grid.size - np.count_nonzero(self.done))
+
+    def claim(self, freq):
+        """Mark freq's grid point as measured; False when it is off-grid or already in the buffers."""
+        k = self.grid_index(freq)
+        if k is None or self.done[k]:
+            return False
+        self.done[k] = True
+        return True
+
+    def gaps(self):
+        """Grid frequencies still missing after the scan (to be re-measured)."""
+        return [float(f) for f in self.grid[~self.done]]
+
+
+def read_journal(path):
+    """RecoveredSweep from one journal file; None when it has no readable header."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    try:
+        header = json.loads(lines[0])
+    except (IndexError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get("journal") != JOURNAL_VERSION:
+        return None
+    rows = {}
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if "note" in record:
+                header.update(record["note"])
+                continue
+            rows[int(record["i"])] = (
+                float(record["f"]), float(record["re"]), float(record["im"]),
+                float(record.get("t", np.nan)), bool(record.get("est")),
+            )
+        except (ValueError, KeyError, TypeError):
+            # A crash mid-write leaves at most one torn line at the end.
+            break
+    return RecoveredSweep(path, header, rows)
+
+
+def recover_journals(directory):
+    """All interrupted runs in directory, oldest first; unreadable journals are renamed *.corrupt."""
+    recovered = []
+    for path in glob.glob(os.path.join(directory, f"*{JOURNAL_SUFFIX}")):
+        try:
+            sweep = read_journal(path)
+        except OSError:
+            sweep = None
+        if sweep is None:
+            try:
+                os.replace(path, path + ".corrupt")
+            except OSError:
+                pass
+            continue
+        recovered.append(sweep)
+    recovered.sort(key=lambda s: str(s.header.get("started", "")))
+    return recovered
@@ -0,0 +1,67 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access.
+
+    Keeps heavy imports (pandas, pyarrow, PDF backend) off the startup path while call
+    sites keep using the familiar ``pd.read_csv(...)`` spelling.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+_optional_cache = {}
+_optional_lock = threading.Lock()
+
+
+def optional_module(name):
+    """Import name on first call and cache it; returns None when it is not installed."""
+    with _optional_lock:
+        if name not in _optional_cache:
+            try:
+                _optional_cache[name] = importlib.import_module(name)
+            except Exception:
+                _optional_cache[name] = None
+        return _optional_cache[name]
+
+
+def preload(names, on_done=None):
+    """Import modules in a daemon thread so the first real use does not pay for it."""
+
+    def _run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                continue
+        if on_done is not None:
+            on_done()
+
+    thread = threading.Thread(target=_run, name="preload-imports", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,132 @@
+import functools
+import threading
+import time
+
+
+class _StageTimer:
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class _Timing:
+    """Context manager returned by Metrics.timer(); records perf_counter elapsed time on exit."""
+
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics, stage):
+        self._metrics = metrics
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, _exc_type, _exc, _tb):
+        self._metrics.add_time(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """Lightweight stage timers, counters and peak gauges, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+            self._peaks = {}
+            self.started_at = time.time()
+
+    def timer(self, stage):
+        return _Timing(self, stage)
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            stat = self._timers.get(stage)
+            if stat is None:
+                stat = self._timers[stage] = _StageTimer()
+            stat.add(seconds)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def peak(self, name, value):
+        """Keep the largest value seen for a gauge (e.g. a queue depth)."""
+        with self._lock:
+            if value > self._peaks.get(name, float("-inf")):
+                self._peaks[name] = value
+
+    def snapshot(self):
+        """Plain-dict copy (milliseconds for timers) suitable for JSON and the run history."""
+        with self._lock:
+            timers = {
+                stage: {
+                    "count": stat.count,
+                    "total_ms": round(stat.total * 1000.0, 3),
+                    "mean_ms": round(stat.total * 1000.0 / stat.count, 3) if stat.count else 0.0,
+                    "max_ms": round(stat.max * 1000.0, 3),
+                    "last_ms": round(stat.last * 1000.0, 3),
+                }
+                for stage, stat in self._timers.items()
+            }
+            return {
+                "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+                "timers": timers,
+                "counters": dict(self._counters),
+                "peaks": dict(self._peaks),
+            }
+
+
+def timed(stage, attr="metrics"):
+    """Method decorator recording the call duration on getattr(self, attr) under stage."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            metrics = getattr(self, attr, None)
+            if metrics is None:
+                return fn(self, *args, **kwargs)
+            with metrics.timer(stage):
+                return fn(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def format_snapshot(snapshot):
+    """Human-readable lines for the diagnostics panel."""
+    if not snapshot:
+        return ["(no metrics recorded)"]
+    lines = []
+    timers = snapshot.get("timers") or {}
+    if timers:
+        lines.append(f"{'Stage':<28}{'calls':>7}{'mean ms':>10}{'max ms':>10}{'total ms':>11}")
+        for stage in sorted(timers):
+            t = timers[stage]
+            lines.append(f"{stage:<28}{t['count']:>7}{t['mean_ms']:>10.2f}{t['max_ms']:>10.2f}{t['total_ms']:>11.1f}")
+    for title, key in (("Counters", "counters"), ("Peaks", "peaks")):
+        values = snapshot.get(key) or {}
+        if values:
+            lines.append("")
+            lines.append(f"{title}:")
+            for name in sorted(values):
+                lines.append(f"  {name:<26}{values[name]}")
+    return lines or ["(no metrics recorded)"]
@@ -0,0 +1,239 @@
+"""In-process stand-in for the parts of pypalmsens the app uses.
+
+Provides ``discover()``, ``InstrumentManager`` and ``ElectrochemicalImpedanceSpectroscopy``
+with the same call shapes, and streams callback batches through ``new_datapoints()`` /
+``last_datapoint()`` including the quirks ``eis_callback`` works around: frequency-only
+lead-in points, duplicate indices, magnitude-only points, jittered timing and batches
+where only the last point is readable.
+
+Start the app against it with ``EIS_MOCK_PALMSENS=1`` (optionally
+``EIS_MOCK_PALMSENS="rate=40,lead_in=6,dup=0.1,jitter=0.3,dropout=0.05"``; add
+``scenario=degraded_contact_loss`` to stream a synthetic_eis scenario), or call
+``configure(...)`` from a script before connecting.
+"""
+
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+import synthetic_eis
+
+
+class MockConfig:
+    """Knobs for the simulated instrument; every field can also come from EIS_MOCK_PALMSENS."""
+
+    ENV_KEYS = {
+        "rate": ("points_per_second", float),
+        "batch": ("batch_size", int),
+        "lead_in": ("lead_in_points", int),
+        "dup": ("duplicate_rate", float),
+        "mag_only": ("magnitude_only_rate", float),
+        "jitter": ("jitter", float),
+        "dropout": ("dropout_rate", float),
+        "realtime": ("realtime", lambda v: v.strip().lower() not in ("0", "false", "no")),
+        "seed": ("seed", int),
+        "devices": ("device_count", int),
+        "coating": ("coating_resistance", float),
+        "noise": ("noise", float),
+        "connect_fail": ("connect_failures", int),
+        "scenario": ("scenario", str),
+    }
+
+    def __init__(
+        self,
+        points_per_second=20.0,
+        batch_size=3,
+        lead_in_points=4,
+        duplicate_rate=0.05,
+        magnitude_only_rate=0.05,
+        jitter=0.25,
+        dropout_rate=0.03,
+        realtime=True,
+        seed=None,
+        device_count=1,
+        coating_resistance=2.0e7,
+        noise=0.01,
+        connect_failures=0,
+        scenario=None,
+    ):
+        self.points_per_second = float(points_per_second)
+        self.batch_size = max(1, int(batch_size))
+        self.lead_in_points = max(0, int(lead_in_points))
+        self.duplicate_rate = float(duplicate_rate)
+        self.magnitude_only_rate = float(magnitude_only_rate)
+        self.jitter = float(jitter)
+        self.dropout_rate = float(dropout_rate)
+        self.realtime = bool(realtime)
+        self.seed = seed
+        self.device_count = max(0, int(device_count))
+        self.coating_resistance = float(coating_resistance)
+        self.noise = float(noise)
+        self.connect_failures = max(0, int(connect_failures))
+        # When set, sweeps come from synthetic_eis instead of the single Randles circuit.
+        self.scenario = scenario or None
+
+    @classmethod
+    def from_env(cls, value=None):
+        value = os.environ.get("EIS_MOCK_PALMSENS", "") if value is None else value
+        kwargs = {}
+        for part in value.split(","):
+            if "=" not in part:
+                continue
+            key, raw = (p.strip() for p in part.split("=", 1))
+            if key in cls.ENV_KEYS:
+                name, convert = cls.ENV_KEYS[key]
+                try:
+                    kwargs[name] = convert(raw)
+                except ValueError:
+                    pass
+        return cls(**kwargs)
+
+
+config = MockConfig.from_env()
+
+
+def configure(**kwargs):
+    """Replace the module configuration; returns the new MockConfig."""
+    global config
+    config = MockConfig(**kwargs)
+    return config
+
+
+class ElectrochemicalImpedanceSpectroscopy:
+    """Accepts the same keyword arguments as the SDK method and keeps them as attributes."""
+
+    def __init__(self, max_frequency=1e4, min_frequency=1e-2, n_frequencies=25, ac_potential=0.01, **kwargs):
+        self.max_frequency = float(max_frequency)
+        self.min_frequency = float(min_frequency)
+        self.n_frequencies = int(n_frequencies)
+        self.ac_potential = float(ac_potential)
+        self.__dict__.update(kwargs)
+
+
+class MockInstrument:
+    def __init__(self, name, interface, address):
+        self.name = name
+        self.interface = interface
+        self.address = address
+
+    def __repr__(self):
+        return f"MockInstrument({self.name!r}, {self.interface!r}, {self.address!r})"
+
+
+def discover(**_kwargs):
+    """Return config.device_count fake instruments (signature-compatible with ps.discover)."""
+    return [
+        MockInstrument(f"Mock Sensit BT {i + 1}", "usbcdc", f"00:16:A4:00:00:{i + 1:02X}")
+        for i in range(config.device_count)
+    ]
+
+
+class MockMeasurement:
+    def __init__(self, title, points):
+        self.title = title
+        self.points = points
+
+
+class MockCallbackData:
+    """One callback payload. A dropped batch raises from new_datapoints() and only exposes its last point."""
+
+    def __init__(self, points, dropped=False):
+        self._points = points
+        self._dropped = dropped
+
+    def new_datapoints(self):
+        if self._dropped:
+            raise RuntimeError("mock dropout: batch unavailable")
+        return list(self._points)
+
+    def last_datapoint(self):
+        return dict(self._points[-1]) if self._points else None
+
+
+def simulated_impedance(freq, coating_resistance=2.0e7, rng=None, noise=0.0):
+    """Coating-like Randles response (Rs + Rc || Cc) for the given frequencies."""
+    omega = 2.0 * np.pi * np.asarray(freq, dtype=float)
+    r_s, c_coat = 150.0, 5.0e-9
+    z = r_s + coating_resistance / (1.0 + 1j * omega * coating_resistance * c_coat)
+    if rng is not None and noise > 0:
+        z = z * (1.0 + rng.normal(0.0, noise, z.shape))
+    return z
+
+
+class InstrumentManager:
+    """Fake manager: connect/disconnect/measure with the SDK's call shapes."""
+
+    _connect_attempts = 0
+
+    def __init__(self, instrument):
+        self.instrument = instrument
+        self.connected = False
+        self._abort = threading.Event()
+
+    def connect(self):
+        InstrumentManager._connect_attempts += 1
+        if InstrumentManager._connect_attempts <= config.connect_failures:
+            raise ConnectionError("mock: device did not respond")
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+        self._abort.set()
+
+    def get_instrument_serial(self):
+        return f"MOCK-{str(getattr(self.instrument, 'address', '0')).replace(':', '')[-6:]}"
+
+    def abort_measurement(self):
+        self._abort.set()
+
+    def measure(self, method, callback=None):
+        if not self.connected:
+            raise RuntimeError("mock: instrument not connected")
+        self._abort.clear()
+        cfg = config
+        rng = np.random.default_rng(cfg.seed)
+        chance = random.Random(cfg.seed)
+
+        n = max(2, int(method.n_frequencies))
+        freq = np.logspace(np.log10(method.max_frequency), np.log10(method.min_frequency), n)
+        if cfg.scenario:
+            z = synthetic_eis.generate_batch(cfg.scenario, 1, freq=freq, seed=rng)["z"][0]
+        else:
+            z = simulated_impedance(freq, cfg.coating_resistance, rng, cfg.noise)
+        z_mag = np.abs(z)
+        phase = -np.degrees(np.angle(z))
+
+        points = []
+        for idx in range(n):
+            point = {"index": idx, "Frequency": float(freq[idx])}
+            if idx < cfg.lead_in_points:
+                point.update(ZRe=np.nan, ZIm=np.nan, Z=np.nan, Phase=np.nan)
+            elif chance.random() < cfg.magnitude_only_rate:
+                point.update(ZRe=np.nan, ZIm=np.nan, Z=float(z_mag[idx]), Phase=float(phase[idx]))
+            else:
+                point.update(ZRe=float(z.real[idx]), ZIm=float(z.imag[idx]), Z=float(z_mag[idx]), Phase=float(phase[idx]))
+            points.append(point)
+
+        interval = 1.0 / cfg.points_per_second if cfg.points_per_second > 0 else 0.0
+        delivered = []
+        previous = None
+        for start in range(0, n, cfg.batch_size):
+            if self._abort.is_set():
+                break
+            batch = [dict(p) for p in points[start:start + cfg.batch_size]]
+            if previous is not None and chance.random() < cfg.duplicate_rate:
+                batch.insert(0, dict(previous))
+            previous = batch[-1]
+            delivered.extend(batch)
+
+            if cfg.realtime and interval > 0:
+                delay = interval * len(batch) * (1.0 + chance.uniform(-cfg.jitter, cfg.jitter))
+                if self._abort.wait(max(0.0, delay)):
+                    break
+            if callback is not None:
+                callback(MockCallbackData(batch, dropped=chance.random() < cfg.dropout_rate))
+
+        return MockMeasurement(f"Mock EIS {time.strftime('%H:%M:%S')}", delivered)
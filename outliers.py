@@ -0,0 +1,151 @@
+"""Per-point outlier detection for streamed sweeps.
+
+Each point is tested against its neighbouring frequencies with a rolling
+median/MAD (Hampel) rule in log10|Z|. The sweep is steep in log-log space, so the
+neighbours are first detrended with a Theil-Sen line (median of pairwise slopes,
+then median intercept); the centre point is flagged when it is further from that
+line than ``threshold`` robust standard deviations (1.4826 * MAD of the
+neighbours' residuals) and ``min_deviation`` decades.
+
+``StreamingOutlierDetector`` decides each point as soon as ``window // 2`` later
+points have arrived, so flags are available while the sweep is still running;
+``finish()`` decides the trailing points with one-sided windows.
+"""
+
+import math
+
+import numpy as np
+
+MAD_TO_SIGMA = 1.4826
+# More suspect points than this in one sweep points at the setup, not at single readings.
+MAX_REMEASURE_POINTS = 12
+
+
+def _hampel_test(log_f, log_z, k, neighbours, threshold, min_deviation):
+    """True when point k is an outlier relative to the given neighbour indices."""
+    nf = log_f[neighbours]
+    nz = log_z[neighbours]
+    df = nf[:, None] - nf[None, :]
+    dz = nz[:, None] - nz[None, :]
+    upper = np.triu_indices(len(neighbours), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = dz[upper] / df[upper]
+    slopes = slopes[np.isfinite(slopes)]
+    slope = float(np.median(slopes)) if slopes.size else 0.0
+    intercept = float(np.median(nz - slope * nf))
+    residuals = nz - (intercept + slope * nf)
+    scale = MAD_TO_SIGMA * float(np.median(np.abs(residuals - np.median(residuals))))
+    deviation = abs(log_z[k] - (intercept + slope * log_f[k]))
+    return deviation > max(threshold * scale, min_deviation)
+
+
+class StreamingOutlierDetector:
+    """Feeds points in arrival order; flags are buffer indices of suspect points."""
+
+    def __init__(self, window=7, threshold=3.5, min_deviation=0.15):
+        self.window = max(5, int(window) | 1)  # odd, at least two neighbours per side
+        self.half = self.window // 2
+        self.threshold = float(threshold)
+        self.min_deviation = float(min_deviation)
+        self.log_f = []
+        self.log_z = []
+        self.valid = []
+        self.flagged = []
+        self._decided = 0
+
+    def __len__(self):
+        return len(self.log_f)
+
+    def push(self, freq, z_mag):
+        """Add one point; returns the buffer indices newly flagged by it."""
+        ok = freq > 0 and z_mag > 0 and math.isfinite(freq) and math.isfinite(z_mag)
+        self.log_f.append(math.log10(freq) if ok else float("nan"))
+        self.log_z.append(math.log10(z_mag) if ok else float("nan"))
+        self.valid.append(ok)
+        n = len(self.log_f)
+        if n < self.window:
+            return []
+        # Centred windows for everything that now has half a window on both sides; the
+        # first points (no left neighbours yet) share the sweep's first full window.
+        newly = []
+        while self._decided <= n - 1 - self.half:
+            k = self._decided
+            lo = min(max(0, k - self.half), n - self.window)
+            if self._decide(k, lo, lo + self.window):
+                newly.append(k)
+            self._decided += 1
+        return newly
+
+    def finish(self):
+        """Decide the trailing points (one-sided windows); returns all flagged indices."""
+        n = len(self.log_f)
+        if n >= self.window:
+            while self._decided < n:
+                self._decide(self._decided, n - self.window, n)
+                self._decided += 1
+        return list(self.flagged)
+
+    def _decide(self, k, lo, hi):
+        if not self.valid[k]:
+            return False
+        neighbours = [j - lo for j in range(lo, hi) if j != k and self.valid[j]]
+        if len(neighbours) < 4:
+            return False
+        log_f = np.asarray(self.log_f[lo:hi])
+        log_z = np.asarray(self.log_z[lo:hi])
+        if _hampel_test(log_f, log_z, k - lo, np.asarray(neighbours), self.threshold, self.min_deviation):
+            self.flagged.append(k)
+            return True
+        return False
+
+
+def outlier_mask(freq, z_mag, window=7, threshold=3.5, min_deviation=0.15):
+    """Flags for a complete sweep (sorted by frequency first), same rule as the streaming detector."""
+    freq = np.asarray(freq, dtype=float)
+    z_mag = np.asarray(z_mag, dtype=float)
+    order = np.argsort(freq)[::-1]
+    detector = StreamingOutlierDetector(window, threshold, min_deviation)
+    for i in order:
+        detector.push(float(freq[i]), float(z_mag[i]))
+    mask = np.zeros(freq.size, dtype=bool)
+    mask[order[detector.finish()]] = True
+    return mask
+
+
+def remeasure_groups(freq, flagged, lead_in=0):
+    """Plan short re-measurement scans for flagged points of a log-spaced sweep.
+
+    Flagged frequencies that are adjacent on the sweep grid share one scan. Each scan
+    starts ``lead_in + 1`` grid steps above its first point, so impedance-less lead-in
+    points (and the one extra neighbour that keeps every scan at two or more points)
+    land on cheap high frequencies, and ends on its last flagged point. Scans never
+    leave the sweep's own range, so near the top of the grid the lead-in covers some
+    of the flagged points themselves: those are left out (a group with nothing left
+    is not scanned), and the scan still ends at least one step below its start.
+    Returns [(max_frequency, min_frequency, n_frequencies, [target frequencies])].
+    """
+    grid = np.unique(np.asarray(freq, dtype=float))[::-1]  # descending, like the sweep
+    grid = grid[np.isfinite(grid) & (grid > 0)]
+    if grid.size < 2 or not len(flagged):
+        return []
+    positions = sorted({int(np.argmin(np.abs(np.log10(grid) - np.log10(f)))) for f in flagged})
+    groups = []
+    run = [positions[0]]
+    for pos in positions[1:]:
+        if pos == run[-1] + 1:
+            run.append(pos)
+        else:
+            groups.append(run)
+            run = [pos]
+    groups.append(run)
+
+    plans = []
+    lead_in = int(lead_in)
+    for run in groups:
+        top = max(run[0] - lead_in - 1, 0)
+        targets = [p for p in run if p >= top + lead_in]
+        if not targets:
+            continue
+        bottom = min(max(targets[-1], top + 1), grid.size - 1)
+        plans.append((float(grid[top]), float(grid[bottom]), bottom - top + 1, [float(grid[p]) for p in targets]))
+    return plans
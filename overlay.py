@@ -0,0 +1,127 @@
+"""Multi-run overlay for the Bode and Nyquist axes.
+
+Historical sweeps are drawn as one ``LineCollection`` per axis, not one Line2D per
+run, so toggling runs on and off only swaps the collection's segments and colours.
+Each run's segments are decimated once and cached by run id.
+"""
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+
+MAX_OVERLAY_RUNS = 48
+MAX_POINTS_PER_RUN = 120
+
+
+def decimate_indices(n, max_points):
+    """Evenly spaced indices (endpoints kept) selecting at most max_points of n."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def sweep_arrays(entry):
+    """(freq, z_real, z_imag) float arrays from a run-history entry, or None without a sweep."""
+    sweep = entry.get("sweep") or {}
+    try:
+        freq = np.asarray(sweep.get("frequency", []), dtype=float)
+        z_real = np.asarray(sweep.get("z_real", []), dtype=float)
+        z_imag = np.asarray(sweep.get("z_imag", []), dtype=float)
+    except (TypeError, ValueError):
+        return None
+    n = min(freq.size, z_real.size, z_imag.size)
+    if n < 2:
+        return None
+    freq, z_real, z_imag = freq[:n], z_real[:n], z_imag[:n]
+    valid = np.isfinite(freq) & np.isfinite(z_real) & np.isfinite(z_imag) & (freq > 0)
+    if np.count_nonzero(valid) < 2:
+        return None
+    return freq[valid], z_real[valid], z_imag[valid]
+
+
+class RunOverlay:
+    """Keeps the overlay collections, the per-run segment cache and the visible run set."""
+
+    def __init__(self, cmap="viridis", linewidth=1.2, max_runs=MAX_OVERLAY_RUNS, max_points=MAX_POINTS_PER_RUN):
+        self.cmap = colormaps[cmap]
+        self.max_runs = int(max_runs)
+        self.max_points = int(max_points)
+        self.run_ids = []  # visible runs, oldest first
+        self._cache = {}  # run_id -> (bode_segment, nyquist_segment)
+        self.collections = {
+            "bode": LineCollection([], linewidths=linewidth, alpha=0.75, zorder=3),
+            "nyquist": LineCollection([], linewidths=linewidth, alpha=0.75, zorder=3),
+        }
+
+    @property
+    def active(self):
+        return bool(self.run_ids)
+
+    def _segments(self, entry):
+        run_id = entry.get("run_id")
+        cached = self._cache.get(run_id)
+        if cached is not None:
+            return cached
+        arrays = sweep_arrays(entry)
+        if arrays is None:
+            return None
+        freq, z_real, z_imag = arrays
+        idx = decimate_indices(freq.size, self.max_points)
+        freq, z_real, z_imag = freq[idx], z_real[idx], z_imag[idx]
+        bode = np.column_stack((freq, np.hypot(z_real, z_imag)))
+        nyquist = np.column_stack((z_real, -z_imag))
+        self._cache[run_id] = (bode, nyquist)
+        return bode, nyquist
+
+    def set_runs(self, entries):
+        """Show exactly these history entries (given oldest first); returns the ids shown."""
+        shown = []
+        bode_segments = []
+        nyquist_segments = []
+        for entry in list(entries)[-self.max_runs:]:
+            segments = self._segments(entry)
+            if segments is None:
+                continue
+            shown.append(entry.get("run_id"))
+            bode_segments.append(segments[0])
+            nyquist_segments.append(segments[1])
+
+        # Colour by age: the oldest visible run maps to the start of the colormap, the newest to the end.
+        ages = np.linspace(0.15, 0.95, len(shown)) if len(shown) > 1 else np.array([0.95] * len(shown))
+        colors = self.cmap(ages) if len(shown) else np.zeros((0, 4))
+        self.collections["bode"].set_segments(bode_segments)
+        self.collections["bode"].set_color(colors)
+        self.collections["nyquist"].set_segments(nyquist_segments)
+        self.collections["nyquist"].set_color(colors)
+        self.run_ids = shown
+        return shown
+
+    def toggle(self, run_ids, history):
+        """Flip the given runs in or out of the overlay, keeping history (archive) order."""
+        visible = set(self.run_ids)
+        for run_id in run_ids:
+            if run_id in visible:
+                visible.discard(run_id)
+            else:
+                visible.add(run_id)
+        return self.set_runs([entry for entry in history if entry.get("run_id") in visible])
+
+    def clear(self):
+        return self.set_runs([])
+
+    def forget(self, keep_run_ids):
+        """Drop cached segments for runs no longer in the archive."""
+        keep = set(keep_run_ids)
+        for run_id in list(self._cache):
+            if run_id not in keep:
+                del self._cache[run_id]
+
+    def attach(self, ax, kind):
+        """(Re)add the collection after the axis was cleared; returns True if it was added."""
+        collection = self.collections[kind]
+        if collection in ax.collections:
+            return False
+        if collection.axes is not None and collection.axes is not ax:
+            collection.remove()
+        ax.add_collection(collection, autolim=False)
+        return True
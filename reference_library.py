@@ -0,0 +1,116 @@
+"""On-disk library of reference Bode curves for the data-quality check.
+
+Every reference is stored once, precomputed as log10|Z| on the canonical
+log-frequency grid (see ``resample.py``), as one row of ``references.npy``; the
+matrix is opened with ``np.load(mmap_mode="r")`` so hundreds of references cost
+no parse time at startup and only the rows actually compared are paged in.
+``references.json`` holds the grid, per-row metadata and the lookup keys.
+
+References are keyed by asset, cell type and profile; ``select()`` tries those in
+that order and falls back to the default reference, each step one dict lookup.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from resample import canonical_log_freq
+
+KEY_KINDS = ("asset", "cell_type", "profile")
+DEFAULT_KEY = "default"
+
+
+def _key(kind, value):
+    return f"{kind}:{' '.join(str(value).split()).lower()}"
+
+
+class ReferenceLibrary:
+    def __init__(self, directory, log_freq=None):
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, "references.npy")
+        self.index_path = os.path.join(directory, "references.json")
+        self.log_freq = canonical_log_freq() if log_freq is None else np.asarray(log_freq, dtype=float)
+        self.references = []  # row -> metadata dict
+        self.keys = {}  # "kind:value" -> row
+        self._matrix = np.empty((0, self.log_freq.size))
+
+    def __len__(self):
+        return len(self.references)
+
+    # --- disk ---
+
+    def load(self):
+        """Open an existing library (index parsed, matrix memory-mapped); False if none on disk."""
+        if not (os.path.exists(self.index_path) and os.path.exists(self.matrix_path)):
+            return False
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        matrix = np.load(self.matrix_path, mmap_mode="r")
+        log_freq = np.asarray(index.get("log_freq", []), dtype=float)
+        if matrix.ndim != 2 or matrix.shape[1] != log_freq.size or matrix.shape[0] != len(index.get("references", [])):
+            raise ValueError("reference library index does not match references.npy")
+        self.log_freq = log_freq
+        self.references = list(index["references"])
+        self.keys = {key: int(row) for key, row in index.get("keys", {}).items()}
+        self._matrix = matrix
+        return True
+
+    def save(self):
+        """Write both files atomically (temp file + replace), then re-open the matrix mapped."""
+        os.makedirs(self.directory, exist_ok=True)
+        matrix = np.ascontiguousarray(self._matrix, dtype=float)
+        tmp_matrix = self.matrix_path + ".tmp.npy"
+        np.save(tmp_matrix, matrix)
+        tmp_index = self.index_path + ".tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump({"log_freq": self.log_freq.tolist(), "references": self.references, "keys": self.keys}, f, indent=1)
+        # Drop the old mapping before replacing the file underneath it.
+        self._matrix = matrix
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_index, self.index_path)
+        self._matrix = np.load(self.matrix_path, mmap_mode="r")
+
+    # --- building ---
+
+    def add(self, name, log_z_on_grid, asset=None, cell_type=None, profile=None, default=False, source=""):
+        """Append one reference (already on this library's grid) and register its keys; returns its row."""
+        row_values = np.asarray(log_z_on_grid, dtype=float)
+        if row_values.shape != self.log_freq.shape:
+            raise ValueError("reference must be sampled on the library grid")
+        row = len(self.references)
+        self._matrix = np.vstack([np.asarray(self._matrix), row_values[None, :]])
+        meta = {
+            "name": str(name),
+            "asset": asset,
+            "cell_type": cell_type,
+            "profile": profile,
+            "source": source,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.references.append(meta)
+        for kind in KEY_KINDS:
+            if meta[kind]:
+                self.keys[_key(kind, meta[kind])] = row
+        if default or DEFAULT_KEY not in self.keys:
+            self.keys[DEFAULT_KEY] = row
+        return row
+
+    # --- lookup ---
+
+    def select(self, asset=None, cell_type=None, profile=None):
+        """Row of the most specific reference (asset > cell type > profile > default), or None."""
+        for kind, value in zip(KEY_KINDS, (asset, cell_type, profile)):
+            if value:
+                row = self.keys.get(_key(kind, value))
+                if row is not None:
+                    return row
+        return self.keys.get(DEFAULT_KEY)
+
+    def curve(self, row):
+        """log10|Z| of one reference on the library grid (NaN where it was not measured)."""
+        return np.asarray(self._matrix[row])
+
+    def name(self, row):
+        return self.references[row]["name"]
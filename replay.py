@@ -0,0 +1,130 @@
+"""Clocked replay of a recorded or synthetic sweep.
+
+Points are released against ``time.monotonic()`` instead of chained sleeps, so timing
+does not drift with UI load and a late tick releases every point that is already due.
+Stopping is an ``threading.Event``: ``set()`` wakes the waiting worker immediately.
+
+Pacing modes (``EIS_REPLAY_SPEED``):
+
+- unset / ``"demo"``: the sweep's time profile squeezed into the caller's demo duration
+- ``"realtime"`` or ``1``: the original ``Time (s)`` column at 1x
+- a number > 0: the original timeline accelerated by that factor
+- ``"fast"`` or ``0``: as fast as possible (throughput testing)
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from sweep import Sweep
+
+FAST = 0.0
+
+
+def speed_from_env(value=None):
+    """Return None (demo duration), FAST, or a speed factor for the original timeline."""
+    value = os.environ.get("EIS_REPLAY_SPEED", "") if value is None else value
+    value = str(value).strip().lower()
+    if value in ("", "demo"):
+        return None
+    if value in ("fast", "max"):
+        return FAST
+    if value == "realtime":
+        return 1.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def point_offsets(times, n, duration):
+    """Due time of each point in seconds from replay start.
+
+    Uses the recorded timestamps (shifted so the first point is due after one step)
+    when they are usable, otherwise spreads n points evenly. When duration is given the
+    profile is rescaled to end exactly at duration.
+    """
+    offsets = None
+    if times is not None:
+        t = np.asarray(times, dtype=float)
+        if len(t) == n and n > 0 and np.all(np.isfinite(t)) and np.all(np.diff(t) >= 0):
+            first_step = (t[-1] - t[0]) / max(n - 1, 1)
+            offsets = t - t[0] + first_step
+            if offsets[-1] <= 0:
+                offsets = None
+    if offsets is None:
+        offsets = np.arange(1, n + 1, dtype=float)
+        if duration is None:
+            duration = float(n)
+    if duration is not None and n > 0:
+        offsets = offsets * (float(duration) / offsets[-1])
+    return offsets
+
+
+class SweepReplay:
+    """Releases a preallocated sweep point by point on a monotonic clock.
+
+    The sweep is copied once into a ``Sweep`` (magnitude and phase computed up front);
+    the worker hands ``sweep_view(count)`` slices of it to the UI
+    instead of rebuilding arrays from growing lists.
+    """
+
+    def __init__(self, freq, z_real, z_imag, times=None, duration=None, speed=None, stop_event=None, fast_batch=1):
+        self.sweep = Sweep.from_components(np.array(freq, dtype=float), z_real, z_imag, times).with_derived()
+        self.freq = self.sweep.freq
+        self.z_real = self.sweep.z_real
+        self.z_imag = self.sweep.z_imag
+        self.n = len(self.freq)
+        self.speed = speed
+        # Speed factors run the original timeline; otherwise the profile is fitted to duration.
+        self.offsets = point_offsets(times, self.n, None if speed else duration)
+        if speed:
+            self.offsets = self.offsets / float(speed)
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.fast_batch = max(1, int(fast_batch))
+        self.released = 0
+        self.started_at = None
+
+    @property
+    def fast(self):
+        return self.speed == FAST
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def sweep_view(self, count=None):
+        return self.sweep.head(self.released if count is None else count)
+
+    def ticks(self):
+        """Yield the running count of released points; returns early once stopped."""
+        self.started_at = time.monotonic()
+        released = 0
+        while released < self.n:
+            if self.fast:
+                if self.stop_event.is_set():
+                    return
+                released = min(self.n, released + self.fast_batch)
+            else:
+                wait = self.started_at + self.offsets[released] - time.monotonic()
+                if wait > 0 and self.stop_event.wait(wait):
+                    return
+                if self.stop_event.is_set():
+                    return
+                # Catch up: release every point whose due time has already passed.
+                elapsed = time.monotonic() - self.started_at
+                released = max(released + 1, int(np.searchsorted(self.offsets, elapsed, side="right")))
+                released = min(released, self.n)
+            self.released = released
+            yield released
+
+    def pause(self, seconds):
+        """Wait between passes; returns False if stopped meanwhile."""
+        if self.fast:
+            return not self.stop_event.is_set()
+        return not self.stop_event.wait(max(0.0, float(seconds)))
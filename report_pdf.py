@@ -0,0 +1,364 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+class ReportCancelled(Exception):
+    """Raised inside the worker when the UI cancels a report."""
+
+
+# Worker-process state. Figures are built once per process and their artists are
+# updated in place for every report instead of being re-created from scratch.
+_templates = {}
+_progress_queue = None
+_cancel_event = None
+
+RECENT_RUN_SLOTS = 8
+
+
+def _init_worker(progress_queue, cancel_event):
+    global _progress_queue, _cancel_event
+    _progress_queue = progress_queue
+    _cancel_event = cancel_event
+
+
+def _check_cancelled():
+    if _cancel_event is not None and _cancel_event.is_set():
+        raise ReportCancelled()
+
+
+def _report_progress(job_id, done, total, label):
+    if _progress_queue is None or job_id is None:
+        return
+    try:
+        _progress_queue.put_nowait((job_id, done, total, label))
+    except Exception:
+        pass
+
+
+def _summary_template():
+    tpl = _templates.get("summary")
+    if tpl is not None:
+        return tpl
+    fig = Figure(figsize=(8.27, 11.69), dpi=120, facecolor='white')
+    ax = fig.add_subplot(111)
+    ax.axis('off')
+    ax.text(0.05, 0.97, "EIS Measurement Report", fontsize=20, fontweight='bold', va='top')
+    info = ax.text(0.05, 0.89, "", fontsize=12, va='top')
+    recent_title = ax.text(0.05, 0.47, "Recent Runs", fontsize=14, fontweight='bold', va='top')
+    recent_lines = [ax.text(0.05, 0.44 - i * 0.033, "", fontsize=9, va='top') for i in range(RECENT_RUN_SLOTS)]
+    tpl = {"fig": fig, "info": info, "recent_title": recent_title, "recent_lines": recent_lines}
+    _templates["summary"] = tpl
+    return tpl
+
+
+def _bode_template():
+    tpl = _templates.get("bode")
+    if tpl is not None:
+        return tpl
+    fig = Figure(figsize=(11, 6), dpi=120, facecolor='white')
+    ax = fig.add_subplot(111)
+    (line,) = ax.loglog([1.0], [1.0], 'o-', markersize=4, color='#1f77b4')
+    ax.set_title('Bode Plot (|Z| vs Frequency)')
+    ax.set_xlabel('Frequency (Hz)')
+    ax.set_ylabel('|Z| (Ohm)')
+    ax.grid(True, which='both', alpha=0.35)
+    tpl = {"fig": fig, "ax": ax, "line": line}
+    _templates["bode"] = tpl
+    return tpl
+
+
+def _nyquist_template():
+    tpl = _templates.get("nyquist")
+    if tpl is not None:
+        return tpl
+    fig = Figure(figsize=(11, 6), dpi=120, facecolor='white')
+    ax = fig.add_subplot(111)
+    (line,) = ax.plot([0.0], [0.0], 'o-', markersize=4, color='#1f77b4')
+    ax.set_title("Nyquist Plot")
+    ax.set_xlabel("Z' (Ohm)")
+    ax.set_ylabel("-Z'' (Ohm)")
+    ax.grid(True, alpha=0.35)
+    tpl = {"fig": fig, "ax": ax, "line": line}
+    _templates["nyquist"] = tpl
+    return tpl
+
+
+def _trend_template():
+    tpl = _templates.get("trend")
+    if tpl is not None:
+        return tpl
+    fig = Figure(figsize=(11, 4.8), dpi=120, facecolor='white')
+    ax = fig.add_subplot(111)
+    (line,) = ax.plot([1.0], [1.0], 'o-', color='#1f77b4')
+    ax.set_yscale('log')
+    ax.set_title('Run History Trend (Low-Frequency |Z|)')
+    ax.set_xlabel('Run Number')
+    ax.set_ylabel('Low-Freq |Z| (Ohm)')
+    ax.grid(True, which='both', alpha=0.35)
+    tpl = {"fig": fig, "ax": ax, "line": line}
+    _templates["trend"] = tpl
+    return tpl
+
+
+def _spectra_template():
+    tpl = _templates.get("spectra")
+    if tpl is not None:
+        return tpl
+    fig = Figure(figsize=(11, 6), dpi=120, facecolor='white')
+    ax = fig.add_subplot(111)
+    image = ax.imshow(np.zeros((1, 1)), aspect='auto', origin='lower', cmap='viridis', interpolation='nearest')
+    fig.colorbar(image, ax=ax, label='log10 |Z| (Ohm)')
+    ax.set_title('Selected Runs on the Common Frequency Grid')
+    ax.set_xlabel('log10 Frequency (Hz)')
+    ax.set_ylabel('Run Number')
+    tpl = {"fig": fig, "ax": ax, "image": image}
+    _templates["spectra"] = tpl
+    return tpl
+
+
+def _render_summary(context):
+    tpl = _summary_template()
+    info_lines = [
+        f"Generated: {context['generated_at']}",
+        f"Mode: {context['mode']}",
+        f"Profile: {context['profile']}",
+        f"Diagnosis: {context['diagnosis']}",
+        f"Data Quality: {context['quality']}",
+        f"Points: {context['points']}",
+        f"Low Frequency: {context['low_freq_hz']:.3e} Hz",
+        f"Low-Frequency |Z|: {context['low_freq_z']:.3e} Ohm",
+    ]
+    tpl["info"].set_text("\n".join(info_lines))
+
+    recent = list(context.get("recent_runs") or [])
+    tpl["recent_title"].set_visible(bool(recent))
+    for slot, text_artist in enumerate(tpl["recent_lines"]):
+        if slot < len(recent):
+            entry = recent[slot]
+            low_z = entry.get("low_freq_z", np.nan)
+            low_z_text = f"{low_z:.2e}" if np.isfinite(low_z) else "N/A"
+            text_artist.set_text(
+                f"{entry.get('timestamp', '')} | {entry.get('mode', '')} | "
+                f"{entry.get('profile', '')} | {entry.get('diagnosis', '')} | {low_z_text}"
+            )
+            text_artist.set_visible(True)
+        else:
+            text_artist.set_visible(False)
+    return tpl["fig"]
+
+
+def _render_bode(context):
+    tpl = _bode_template()
+    tpl["line"].set_data(context['freq'], context['z_mag'])
+    tpl["ax"].relim()
+    tpl["ax"].autoscale_view()
+    return tpl["fig"]
+
+
+def _render_nyquist(context):
+    tpl = _nyquist_template()
+    tpl["line"].set_data(context['z_real'], -np.asarray(context['z_imag']))
+    tpl["ax"].relim()
+    tpl["ax"].axis('equal')
+    tpl["ax"].autoscale_view()
+    return tpl["fig"]
+
+
+def _render_trend(context):
+    tpl = _trend_template()
+    y = np.asarray(context.get("trend_low_z", []), dtype=float)
+    tpl["line"].set_visible(y.size > 0)
+    if y.size > 0:
+        x = np.arange(1, y.size + 1)
+        tpl["line"].set_data(x, y)
+        tpl["ax"].relim()
+        tpl["ax"].autoscale_view()
+    return tpl["fig"]
+
+
+def _render_spectra(context):
+    """log10|Z| map of the selected runs (rows) on the canonical grid; blank where a sweep does not reach."""
+    tpl = _spectra_template()
+    spectra = context["run_spectra"]
+    log_freq = np.asarray(spectra["log_freq"], dtype=float)
+    log_z = np.ma.masked_invalid(np.asarray(spectra["log_z"], dtype=float))
+    step = (log_freq[-1] - log_freq[0]) / max(log_freq.size - 1, 1)
+    tpl["image"].set_data(log_z)
+    tpl["image"].set_extent((log_freq[0] - step / 2, log_freq[-1] + step / 2, 0.5, log_z.shape[0] + 0.5))
+    if log_z.count():
+        tpl["image"].set_clim(float(log_z.min()), float(log_z.max()))
+    return tpl["fig"]
+
+
+def report_pages(context, include_trend=True):
+    """Return the (label, renderer) list for one report."""
+    pages = [
+        ("summary", _render_summary),
+        ("bode", _render_bode),
+        ("nyquist", _render_nyquist),
+    ]
+    if include_trend and context.get("history_count", 0) >= 2:
+        pages.append(("trend", _render_trend))
+    return pages
+
+
+def render_report(filepath, context, job_id=None):
+    """Write the PDF report for one context; runs in the worker process."""
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    pages = report_pages(context)
+    tmp_path = f"{filepath}.part"
+    try:
+        with PdfPages(tmp_path) as pdf:
+            for done, (label, renderer) in enumerate(pages, start=1):
+                _check_cancelled()
+                pdf.savefig(renderer(context), bbox_inches='tight')
+                _report_progress(job_id, done, len(pages), label)
+        _check_cancelled()
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return filepath
+
+
+def render_batch_reports(jobs, job_id=None):
+    """Write one PDF per (filepath, context) job; each finished run is reported as progress."""
+    written = []
+    for filepath, context in jobs:
+        _check_cancelled()
+        render_report(filepath, context)
+        written.append(filepath)
+        _report_progress(job_id, 1, 1, "run")
+    return written
+
+
+def render_combined_report(filepath, contexts, job_id=None):
+    """Write all runs into one PDF, followed by a trend page for the last run and the run map."""
+    if not contexts:
+        raise ValueError("No runs selected for the combined report")
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    tmp_path = f"{filepath}.part"
+    try:
+        with PdfPages(tmp_path) as pdf:
+            for context in contexts:
+                for _label, renderer in report_pages(context, include_trend=False):
+                    _check_cancelled()
+                    pdf.savefig(renderer(context), bbox_inches='tight')
+                _report_progress(job_id, 1, 1, "run")
+            if contexts[-1].get("history_count", 0) >= 2:
+                pdf.savefig(_render_trend(contexts[-1]), bbox_inches='tight')
+            if contexts[-1].get("run_spectra") is not None:
+                pdf.savefig(_render_spectra(contexts[-1]), bbox_inches='tight')
+        _check_cancelled()
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return [filepath]
+
+
+class ReportWorker:
+    """One long-lived worker process for PDF reports, with progress and cancellation."""
+
+    def __init__(self, max_workers=1):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._progress = self._ctx.Queue()
+        self._cancel = self._ctx.Event()
+        self._max_workers = max(1, int(max_workers))
+        self._executor = None
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ensure_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=self._ctx,
+                initializer=_init_worker,
+                initargs=(self._progress, self._cancel),
+            )
+        return self._executor
+
+    def submit(self, fn, *args):
+        """Submit fn(*args, job_id) to the worker; returns (job_id, future)."""
+        with self._lock:
+            self._cancel.clear()
+            job_id = next(self._job_ids)
+            try:
+                future = self._ensure_executor().submit(fn, *args, job_id)
+            except BrokenProcessPool:
+                self._executor = None
+                future = self._ensure_executor().submit(fn, *args, job_id)
+            return job_id, future
+
+    def submit_many(self, fn, arg_list):
+        """Submit fn(*args, job_id) for every args tuple under one job id; returns (job_id, futures)."""
+        with self._lock:
+            self._cancel.clear()
+            job_id = next(self._job_ids)
+            try:
+                executor = self._ensure_executor()
+                futures = [executor.submit(fn, *args, job_id) for args in arg_list]
+            except BrokenProcessPool:
+                self._executor = None
+                executor = self._ensure_executor()
+                futures = [executor.submit(fn, *args, job_id) for args in arg_list]
+            return job_id, futures
+
+    def submit_report(self, filepath, context):
+        return self.submit(render_report, filepath, context)
+
+    def submit_batch(self, jobs, chunk_size=None):
+        """Spread per-run report jobs over the pool in chunks; returns (job_id, futures)."""
+        jobs = list(jobs)
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(jobs) // (self._max_workers * 4)))
+        chunks = [(jobs[i:i + chunk_size],) for i in range(0, len(jobs), chunk_size)]
+        return self.submit_many(render_batch_reports, chunks)
+
+    def submit_combined(self, filepath, contexts):
+        job_id, future = self.submit(render_combined_report, filepath, list(contexts))
+        return job_id, [future]
+
+    def cancel(self):
+        self._cancel.set()
+
+    def poll_progress(self):
+        """Drain pending (job_id, done, total, label) progress messages without blocking."""
+        messages = []
+        while True:
+            try:
+                messages.append(self._progress.get_nowait())
+            except queue.Empty:
+                return messages
+            except Exception:
+                return messages
+
+    def reset_after_failure(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self._cancel.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,152 @@
+"""Shared log-frequency resampling for cross-run analytics.
+
+Each profile (Recommended, Rapid, Detailed, custom) sweeps its own frequency grid.
+``GridResampler`` maps values from any source grid onto a target grid (by default
+one canonical log-frequency grid) by linear interpolation in log10 f. The
+interpolation weights depend only on the two grids, so they are computed once per
+(source, target) pair and cached. Resampling is then a gather and a multiply-add
+that works on a single sweep or a whole (runs x points) block.
+
+    resampler = GridResampler()
+    matrix = resampler.log_magnitude_matrix(history)  # (runs x canonical freqs), NaN outside each sweep
+"""
+
+import collections
+
+import numpy as np
+
+# Matches the Bode axis span and the 10 points/decade of the Detailed profile (the densest
+# built-in grid; Recommended sweeps 5/decade), so no built-in sweep is undersampled.
+CANONICAL_F_MIN = 1e-2
+CANONICAL_F_MAX = 1e5
+CANONICAL_POINTS_PER_DECADE = 10
+
+
+def canonical_log_freq(f_min=CANONICAL_F_MIN, f_max=CANONICAL_F_MAX, points_per_decade=CANONICAL_POINTS_PER_DECADE):
+    """Ascending log10 frequencies, points_per_decade per decade, both ends included."""
+    lo, hi = np.log10(f_min), np.log10(f_max)
+    n = int(round((hi - lo) * points_per_decade)) + 1
+    return np.linspace(lo, hi, n)
+
+
+def _grid_key(log_freq):
+    # Rounded so grids rebuilt from JSON/CSV (tiny float noise) still share a cache entry.
+    return np.round(np.asarray(log_freq, dtype=float), 9).tobytes()
+
+
+class InterpWeights:
+    """Linear interpolation from one ascending source grid onto a target grid.
+
+    ``lower`` indexes the left source neighbour of each target point and ``frac`` is the
+    weight of the right neighbour; target points outside the source span are NaN, as is
+    every target point when the source has fewer than two points (no span to interpolate).
+    """
+
+    def __init__(self, source_log_freq, target_log_freq):
+        src = np.asarray(source_log_freq, dtype=float)
+        dst = np.asarray(target_log_freq, dtype=float)
+        self.n_source = src.size
+        self.n_target = dst.size
+        if src.size < 2:
+            self.lower = self.upper = np.zeros(dst.size, dtype=np.intp)
+            self.frac = np.zeros(dst.size)
+            self.inside = np.zeros(dst.size, dtype=bool)
+            return
+        upper = np.clip(np.searchsorted(src, dst, side="right"), 1, max(src.size - 1, 1))
+        self.lower = (upper - 1).astype(np.intp)
+        self.upper = upper.astype(np.intp)
+        span = src[self.upper] - src[self.lower]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(span > 0, (dst - src[self.lower]) / span, 0.0)
+        self.frac = np.clip(frac, 0.0, 1.0)
+        self.inside = (dst >= src[0]) & (dst <= src[-1])
+
+    def apply(self, values):
+        """Interpolate values (..., n_source) onto the target grid -> (..., n_target)."""
+        values = np.asarray(values, dtype=float)
+        if self.n_source < 2:
+            return np.full(values.shape[:-1] + (self.n_target,), np.nan)
+        out = values[..., self.lower] * (1.0 - self.frac) + values[..., self.upper] * self.frac
+        out[..., ~self.inside] = np.nan
+        return out
+
+
+class GridResampler:
+    """Caches InterpWeights per (source grid, target grid); LRU-bounded."""
+
+    def __init__(self, target_log_freq=None, max_cached=128):
+        self.target_log_freq = canonical_log_freq() if target_log_freq is None else np.asarray(target_log_freq, dtype=float)
+        self.freq = 10.0 ** self.target_log_freq
+        self.max_cached = int(max_cached)
+        self._cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def weights(self, source_log_freq, target_log_freq=None):
+        target = self.target_log_freq if target_log_freq is None else target_log_freq
+        key = (_grid_key(source_log_freq), _grid_key(target))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        cached = self._cache[key] = InterpWeights(source_log_freq, target)
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return cached
+
+    def interp(self, target_log_freq, source_log_freq, values):
+        """np.interp(target, source, values) for ascending grids, NaN outside the source span."""
+        return self.weights(source_log_freq, target_log_freq).apply(values)
+
+    def resample(self, freq, values, target_log_freq=None):
+        """values sampled at freq (any order, Hz) -> target grid (canonical by default)."""
+        freq = np.asarray(freq, dtype=float)
+        values = np.asarray(values, dtype=float)
+        order = np.argsort(freq)
+        return self.weights(np.log10(freq[order]), target_log_freq).apply(values[..., order])
+
+    def log_magnitude_matrix(self, entries, target_log_freq=None):
+        """(runs x target freqs) log10|Z| matrix for run-history entries.
+
+        Runs that share a source grid are resampled together with one weights lookup.
+        Rows of runs without a usable sweep are all NaN.
+        """
+        target = self.target_log_freq if target_log_freq is None else np.asarray(target_log_freq, dtype=float)
+        entries = list(entries)
+        matrix = np.full((len(entries), target.size), np.nan)
+        groups = {}
+        for row, entry in enumerate(entries):
+            curve = sweep_log_magnitude(entry)
+            if curve is None:
+                continue
+            log_freq, log_z = curve
+            key = _grid_key(log_freq)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (log_freq, [], [])
+            group[1].append(row)
+            group[2].append(log_z)
+        for log_freq, rows, curves in groups.values():
+            matrix[rows] = self.weights(log_freq, target).apply(np.vstack(curves))
+        return matrix
+
+
+def sweep_log_magnitude(entry):
+    """(ascending log10 f, log10|Z|) from a run-history entry's stored sweep, or None."""
+    sweep = entry.get("sweep") or {}
+    try:
+        freq = np.asarray(sweep.get("frequency", []), dtype=float)
+        z_real = np.asarray(sweep.get("z_real", []), dtype=float)
+        z_imag = np.asarray(sweep.get("z_imag", []), dtype=float)
+    except (TypeError, ValueError):
+        return None
+    n = min(freq.size, z_real.size, z_imag.size)
+    freq, z_mag = freq[:n], np.hypot(z_real[:n], z_imag[:n])
+    valid = np.isfinite(freq) & np.isfinite(z_mag) & (freq > 0) & (z_mag > 0)
+    if np.count_nonzero(valid) < 2:
+        return None
+    freq, z_mag = freq[valid], z_mag[valid]
+    order = np.argsort(freq)
+    return np.log10(freq[order]), np.log10(z_mag[order])
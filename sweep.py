@@ -0,0 +1,143 @@
+"""Compact in-memory sweep: frequency, complex impedance and optional time, plus metadata.
+
+``Sweep`` holds one float64 frequency array, one complex128 impedance array and an
+optional float64 ``Time (s)`` array. ``z_real``/``z_imag`` are views into ``z`` (no
+copies), and ``magnitude`` / ``phase_deg`` are computed once per sweep and cached,
+so the plots, exports and report builder all read the same arrays instead of each
+recomputing ``sqrt(re² + im²)``. ``head(n)`` returns a sweep over the first n points
+that shares memory with its parent, which is what streaming updates hand to the UI.
+A sweep that is still being measured lives in a ``SweepBuffer``, which appends into
+preallocated arrays and hands out the same ``head(n)`` views.
+
+Treat a Sweep as immutable once built; the cached derived arrays assume it is.
+"""
+
+import numpy as np
+
+CSV_FREQUENCY = "Frequency (Hz)"
+CSV_Z_REAL = "Z' (Ω)"
+CSV_Z_IMAG_NEG = "-Z'' (Ω)"
+CSV_TIME = "Time (s)"
+
+
+class Sweep:
+    __slots__ = ("freq", "z", "time_s", "meta", "_magnitude", "_phase_deg")
+
+    def __init__(self, freq, z, time_s=None, meta=None):
+        self.freq = np.asarray(freq, dtype=np.float64)
+        self.z = np.asarray(z, dtype=np.complex128)
+        self.time_s = None if time_s is None else np.asarray(time_s, dtype=np.float64)
+        self.meta = meta if meta is not None else {}
+        self._magnitude = None
+        self._phase_deg = None
+
+    @classmethod
+    def from_components(cls, freq, z_real, z_imag, time_s=None, meta=None):
+        z_real = np.asarray(z_real, dtype=np.float64)
+        z = np.empty(z_real.shape, dtype=np.complex128)
+        z.real = z_real
+        z.imag = z_imag
+        return cls(freq, z, time_s, meta)
+
+    @classmethod
+    def from_dataframe(cls, df, meta=None):
+        """Sweep from the app's CSV columns (Frequency, Z', -Z'', optional Time)."""
+        time_s = df[CSV_TIME].to_numpy(dtype=np.float64) if CSV_TIME in df.columns else None
+        return cls.from_components(
+            df[CSV_FREQUENCY].to_numpy(dtype=np.float64),
+            df[CSV_Z_REAL].to_numpy(dtype=np.float64),
+            -df[CSV_Z_IMAG_NEG].to_numpy(dtype=np.float64),
+            time_s,
+            meta,
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty(0, dtype=np.complex128))
+
+    def __len__(self):
+        return self.freq.size
+
+    @property
+    def z_real(self):
+        return self.z.real
+
+    @property
+    def z_imag(self):
+        return self.z.imag
+
+    @property
+    def magnitude(self):
+        if self._magnitude is None:
+            self._magnitude = np.abs(self.z)
+        return self._magnitude
+
+    @property
+    def phase_deg(self):
+        """Phase of Z in degrees (negative for capacitive coatings)."""
+        if self._phase_deg is None:
+            self._phase_deg = np.degrees(np.angle(self.z))
+        return self._phase_deg
+
+    def with_derived(self):
+        """Compute and cache magnitude and phase now; returns self."""
+        self._magnitude = self.magnitude
+        self._phase_deg = self.phase_deg
+        return self
+
+    def head(self, count):
+        """The first count points, sharing memory (and cached magnitude/phase) with this sweep."""
+        part = Sweep(self.freq[:count], self.z[:count], None if self.time_s is None else self.time_s[:count], self.meta)
+        if self._magnitude is not None:
+            part._magnitude = self._magnitude[:count]
+        if self._phase_deg is not None:
+            part._phase_deg = self._phase_deg[:count]
+        return part
+
+
+class SweepBuffer:
+    """Growable backing store for a sweep being measured, one point at a time.
+
+    Points go into preallocated arrays (doubled when full) with their magnitude and
+    phase computed on arrival. ``head(n)`` is a Sweep over the first n points that
+    shares memory with the store; growing copies into new arrays, so views already
+    handed out stay valid while the writer keeps appending.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self._sweep = self._allocate(max(1, int(capacity)))
+
+    @staticmethod
+    def _allocate(capacity):
+        sweep = Sweep(np.empty(capacity), np.empty(capacity, dtype=np.complex128), np.empty(capacity))
+        sweep._magnitude = np.empty(capacity)
+        sweep._phase_deg = np.empty(capacity)
+        return sweep
+
+    def __len__(self):
+        return self.count
+
+    def append(self, freq, z_real, z_imag, time_s=np.nan):
+        store = self._sweep
+        n = self.count
+        if n == store.freq.size:
+            grown = self._allocate(2 * n)
+            for name in ("freq", "z", "time_s", "_magnitude", "_phase_deg"):
+                getattr(grown, name)[:n] = getattr(store, name)
+            store = self._sweep = grown
+        z = complex(z_real, z_imag)
+        store.freq[n] = freq
+        store.z[n] = z
+        store.time_s[n] = time_s
+        store._magnitude[n] = abs(z)
+        store._phase_deg[n] = np.degrees(np.angle(z))
+        self.count = n + 1
+
+    def extend(self, freq, z_real, z_imag, time_s=None):
+        for i, (f, re, im) in enumerate(zip(freq, z_real, z_imag)):
+            self.append(f, re, im, np.nan if time_s is None else time_s[i])
+
+    def head(self, count=None):
+        """Sweep over the first count points (all appended points by default)."""
+        return self._sweep.head(self.count if count is None else min(int(count), self.count))
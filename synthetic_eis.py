@@ -0,0 +1,174 @@
+"""Vectorized synthetic EIS sweeps from analytic coating models, with labelled artifacts.
+
+Every generator works on a whole batch at once: parameters are drawn as vectors and
+impedances are computed as (n_sweeps, n_frequencies) complex arrays, so thousands of
+labelled sweeps take milliseconds. Sign conventions match the app: Z'' is negative for
+capacitive behaviour and sweeps run from high to low frequency.
+"""
+
+import numpy as np
+
+# Same bands as EisAnalysisTool.diagnose_coating (low-frequency |Z|).
+PASS_THRESHOLD = 1e7
+CAUTION_THRESHOLD = 1e5
+
+DIAGNOSIS_LABELS = {
+    "pass": "Healthy Coating (Pass)",
+    "caution": "Coating needs monitoring (Caution)",
+    "fail": "Defective Coating, needs maintenance (Fail)",
+}
+
+ARTIFACTS = ("drift", "mains_pickup", "contact_loss")
+
+# name -> (coating model, artifacts applied on top)
+SCENARIOS = {
+    "intact": ("intact", ()),
+    "degraded": ("degraded", ()),
+    "delaminated": ("delaminated", ()),
+    "intact_drift": ("intact", ("drift",)),
+    "intact_mains_50hz": ("intact", ("mains_pickup",)),
+    "degraded_contact_loss": ("degraded", ("contact_loss",)),
+    "delaminated_drift": ("delaminated", ("drift",)),
+    "messy_setup": ("intact", ("drift", "mains_pickup", "contact_loss")),
+}
+
+
+def sweep_frequencies(f_max=1e4, f_min=1e-2, points_per_decade=10):
+    """Log-spaced sweep from f_max down to f_min, the same grid build_eis_method asks for."""
+    decades = np.log10(f_max / f_min)
+    n = max(2, int(round(decades * points_per_decade)) + 1)
+    return np.logspace(np.log10(f_max), np.log10(f_min), n)
+
+
+def _log_uniform(rng, low, high, size):
+    return 10.0 ** rng.uniform(np.log10(low), np.log10(high), size)
+
+
+def _cpe_admittance(q, n, jw):
+    return q[:, None] * jw[None, :] ** n[:, None]
+
+
+def coating_impedance(model, freq, n_sweeps, rng):
+    """Return (z, params) for n_sweeps random circuits of one coating model."""
+    jw = 1j * 2.0 * np.pi * np.asarray(freq, dtype=float)
+    rs = rng.uniform(10.0, 200.0, n_sweeps)
+    if model == "intact":
+        # Rs + (R_coat || CPE_coat): an undamaged barrier coating.
+        r_coat = _log_uniform(rng, 1e8, 1e10, n_sweeps)
+        q_coat = _log_uniform(rng, 1e-10, 1e-9, n_sweeps)
+        n_coat = rng.uniform(0.90, 1.0, n_sweeps)
+        y = 1.0 / r_coat[:, None] + _cpe_admittance(q_coat, n_coat, jw)
+        z = rs[:, None] + 1.0 / y
+        params = {"rs": rs, "r_coat": r_coat, "q_coat": q_coat, "n_coat": n_coat}
+    elif model in ("degraded", "delaminated"):
+        # Rs + CPE_coat || (R_pore + (R_ct || CPE_dl)): water uptake / underfilm corrosion.
+        if model == "degraded":
+            r_pore = _log_uniform(rng, 5e4, 3e6, n_sweeps)
+            r_ct = _log_uniform(rng, 5e4, 4e6, n_sweeps)
+            q_dl = _log_uniform(rng, 1e-8, 1e-6, n_sweeps)
+            q_coat = _log_uniform(rng, 1e-10, 2e-9, n_sweeps)
+        else:
+            r_pore = _log_uniform(rng, 1e2, 2e4, n_sweeps)
+            r_ct = _log_uniform(rng, 1e3, 5e4, n_sweeps)
+            q_dl = _log_uniform(rng, 1e-6, 1e-4, n_sweeps)
+            q_coat = _log_uniform(rng, 1e-9, 1e-8, n_sweeps)
+        n_coat = rng.uniform(0.85, 1.0, n_sweeps)
+        n_dl = rng.uniform(0.7, 0.95, n_sweeps)
+        z_dl = 1.0 / (1.0 / r_ct[:, None] + _cpe_admittance(q_dl, n_dl, jw))
+        z_branch = r_pore[:, None] + z_dl
+        z = rs[:, None] + 1.0 / (_cpe_admittance(q_coat, n_coat, jw) + 1.0 / z_branch)
+        params = {"rs": rs, "r_pore": r_pore, "r_ct": r_ct, "q_dl": q_dl, "q_coat": q_coat}
+    else:
+        raise ValueError(f"Unknown coating model: {model}")
+    return z, params
+
+
+def apply_noise(z, rng, level):
+    """Multiplicative complex Gaussian noise; level may be a scalar or per-sweep vector."""
+    level = np.broadcast_to(np.asarray(level, dtype=float), (z.shape[0],))[:, None]
+    return z * (1.0 + level * (rng.standard_normal(z.shape) + 1j * rng.standard_normal(z.shape)) / np.sqrt(2.0))
+
+
+def apply_artifact(name, freq, z, rng, severity=1.0):
+    """Apply one measurement artifact to every sweep in z (rows are sweeps)."""
+    n_sweeps, n_points = z.shape
+    progress = np.linspace(0.0, 1.0, n_points)[None, :]
+    if name == "drift":
+        # Slow multiplicative drift over the sweep (temperature, reference electrode).
+        slope = rng.choice([-1.0, 1.0], n_sweeps) * rng.uniform(0.35, 0.8, n_sweeps) * severity
+        return z * np.clip(1.0 + slope[:, None] * (progress - 0.5) * 2.0, 0.1, None)
+    if name == "mains_pickup":
+        # 50/60 Hz pickup: resonant error around the line frequency and its harmonics plus extra scatter.
+        line = rng.choice([50.0, 60.0], n_sweeps)[:, None]
+        logf = np.log10(np.asarray(freq, dtype=float))[None, :]
+        amp = rng.uniform(1.5, 4.0, n_sweeps)[:, None] * severity
+        bump = np.zeros((n_sweeps, n_points))
+        for harmonic in (1.0, 2.0, 3.0):
+            bump += np.exp(-((logf - np.log10(line * harmonic)) / 0.12) ** 2) / harmonic
+        phase = np.exp(1j * rng.uniform(-np.pi, np.pi, (n_sweeps, 1)))
+        return apply_noise(z * (1.0 + amp * bump * phase), rng, 0.08 * severity)
+    if name == "contact_loss":
+        # Intermittent lead contact: a run of collapsed readings plus isolated spikes.
+        out = z.copy()
+        seg_len = np.maximum(2, (rng.uniform(0.1, 0.3, n_sweeps) * n_points).astype(int))
+        seg_start = (rng.uniform(0.0, 1.0, n_sweeps) * (n_points - seg_len)).astype(int)
+        idx = np.arange(n_points)[None, :]
+        in_segment = (idx >= seg_start[:, None]) & (idx < (seg_start + seg_len)[:, None])
+        dip = rng.uniform(0.03, 0.3, (n_sweeps, 1)) ** severity
+        out = np.where(in_segment, out * dip, out)
+        spikes = rng.uniform(0.0, 1.0, z.shape) < 0.08 * severity
+        out = np.where(spikes, out * rng.uniform(3.0, 10.0, z.shape), out)
+        return out
+    raise ValueError(f"Unknown artifact: {name}")
+
+
+def diagnosis_label(low_freq_z):
+    """Vectorized version of the app's low-frequency |Z| banding."""
+    low_freq_z = np.asarray(low_freq_z, dtype=float)
+    return np.where(low_freq_z >= PASS_THRESHOLD, "pass", np.where(low_freq_z >= CAUTION_THRESHOLD, "caution", "fail"))
+
+
+def generate_batch(scenario, n_sweeps, freq=None, seed=None, noise=(0.005, 0.02), severity=1.0):
+    """Generate n_sweeps labelled sweeps for one scenario.
+
+    Returns a dict with ``freq`` (n_points,), ``z`` complex (n_sweeps, n_points),
+    ``diagnosis`` (ground-truth band of the clean model), ``artifacts`` (tuple of
+    artifact names, empty for clean sweeps), the noise-free ``z_clean`` and the
+    sampled circuit ``params``.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    freq = sweep_frequencies() if freq is None else np.asarray(freq, dtype=float)
+    model, artifacts = SCENARIOS[scenario]
+
+    z_clean, params = coating_impedance(model, freq, n_sweeps, rng)
+    low_idx = int(np.argmin(freq))
+    truth = diagnosis_label(np.abs(z_clean[:, low_idx]))
+
+    z = apply_noise(z_clean, rng, rng.uniform(noise[0], noise[1], n_sweeps))
+    for name in artifacts:
+        z = apply_artifact(name, freq, z, rng, severity)
+    return {
+        "scenario": scenario,
+        "freq": freq,
+        "z": z,
+        "diagnosis": truth,
+        "artifacts": artifacts,
+        "z_clean": z_clean,
+        "params": params,
+    }
+
+
+def generate_library(n_per_scenario, scenarios=None, freq=None, seed=None):
+    """One batch per scenario from a shared random stream: {scenario: batch}."""
+    rng = np.random.default_rng(seed)
+    names = list(SCENARIOS) if scenarios is None else list(scenarios)
+    return {name: generate_batch(name, n_per_scenario, freq=freq, seed=rng) for name in names}
+
+
+def single_sweep(scenario, freq=None, seed=None, severity=1.0):
+    """Convenience for the simulated connection modes: (freq, z_real, z_imag, diagnosis_band)."""
+    batch = generate_batch(scenario, 1, freq=freq, seed=seed, severity=severity)
+    z = batch["z"][0]
+    return batch["freq"], z.real.copy(), z.imag.copy(), str(batch["diagnosis"][0])
@@ -0,0 +1,268 @@
+"""Small task runtime for the app's worker threads.
+
+Each job runs on its own daemon thread with a ``CancelToken`` and is returned as a
+``TaskHandle`` (futures-style: ``done()``, ``result()``, ``cancel()``,
+``add_done_callback()``). Done callbacks are delivered through the runtime's
+``dispatch`` function, which the app points at ``root.after(0, ...)`` so they run on
+the Tk thread. Cleanup hooks run on the worker thread in a ``finally`` block, so they
+run however the job ends.
+
+Jobs may claim a named slot (the app uses ``"device"`` for connect and measure); a
+second submit for a busy slot raises ``TaskBusy`` instead of starting an overlapping job.
+A job may carry ``expected_seconds`` (updated while it runs) so callers can plan
+around a busy slot with ``expected_free_in()``.
+"""
+
+import itertools
+import threading
+import time
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class TaskCancelled(Exception):
+    """Raised by CancelToken.check() once the token is cancelled."""
+
+
+class TaskBusy(RuntimeError):
+    """The requested slot already has an active task."""
+
+    def __init__(self, slot, active):
+        super().__init__(f"slot '{slot}' is busy with task '{active.name}'")
+        self.slot = slot
+        self.active = active
+
+
+class CancelToken:
+    """Cancellation flag backed by an Event so waits wake up immediately."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def event(self):
+        return self._event
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        """Cancel once; returns False if it was already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(reason)
+            except Exception:
+                pass
+        return True
+
+    def on_cancel(self, fn):
+        """Call fn(reason) when cancelled (immediately if it already is)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self.reason)
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout seconds; returns True if cancelled meanwhile."""
+        return self._event.wait(timeout)
+
+    def check(self):
+        if self._event.is_set():
+            raise TaskCancelled(self.reason)
+
+
+class TaskHandle:
+    """Futures-style view of one submitted job."""
+
+    def __init__(self, task_id, name, slot, token, dispatch):
+        self.id = task_id
+        self.name = name
+        self.slot = slot
+        self.token = token
+        self.state = PENDING
+        self.started_at = None
+        self.expected_seconds = None
+        self._dispatch = dispatch
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._result = None
+        self._exception = None
+        self.thread = None
+
+    def __repr__(self):
+        return f"<TaskHandle #{self.id} {self.name} {self.state}>"
+
+    def done(self):
+        return self._finished.is_set()
+
+    def running(self):
+        return self.state == RUNNING
+
+    def cancelled(self):
+        return self.state == CANCELLED or (self.token.cancelled and not self.done())
+
+    def cancel(self, reason="cancelled"):
+        return self.token.cancel(reason)
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def result(self, timeout=None):
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"task '{self.name}' still running")
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"task '{self.name}' still running")
+        return self._exception
+
+    def add_done_callback(self, fn):
+        """Call fn(handle) through the dispatcher once the task has finished."""
+        with self._lock:
+            if not self._finished.is_set():
+                self._callbacks.append(fn)
+                return self
+        self._dispatch(fn, self)
+        return self
+
+    def _finish(self, state, result, exception):
+        with self._lock:
+            self.state = state
+            self._result = result
+            self._exception = exception
+            self._finished.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            self._dispatch(fn, self)
+
+
+def _call_now(fn, *args):
+    fn(*args)
+
+
+class TaskRuntime:
+    """Starts jobs on daemon threads and tracks them until they finish."""
+
+    def __init__(self, dispatch=None, on_error=None):
+        self._dispatch_fn = dispatch or _call_now
+        self._on_error = on_error
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._active = {}
+
+    def _dispatch(self, fn, *args):
+        try:
+            self._dispatch_fn(fn, *args)
+        except Exception as e:
+            # Tk may already be gone during shutdown; report instead of raising on the worker.
+            self._report(f"dispatch of {getattr(fn, '__name__', fn)!r} failed", e)
+
+    def _report(self, what, error):
+        if self._on_error is not None:
+            try:
+                self._on_error(what, error)
+            except Exception:
+                pass
+
+    def submit(self, fn, *args, name=None, slot=None, cleanup=None, on_done=None, expected_seconds=None, **kwargs):
+        """Run fn(*args, **kwargs) on a new thread; returns its TaskHandle.
+
+        cleanup(handle) runs on the worker thread after fn, however it ended;
+        on_done(handle) is dispatched (Tk thread) after cleanup. Raises TaskBusy when
+        slot is given and another task still holds it. expected_seconds is the
+        job's estimated run time, for expected_free_in().
+        """
+        name = name or getattr(fn, "__name__", "task")
+        with self._lock:
+            if slot is not None and slot in self._slots:
+                raise TaskBusy(slot, self._slots[slot])
+            handle = TaskHandle(next(self._ids), name, slot, CancelToken(), self._dispatch)
+            handle.expected_seconds = expected_seconds
+            if slot is not None:
+                self._slots[slot] = handle
+            self._active[handle.id] = handle
+        if on_done is not None:
+            handle.add_done_callback(on_done)
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(handle, fn, args, kwargs, cleanup),
+            name=f"task-{handle.id}-{name}",
+            daemon=True,
+        )
+        handle.thread = thread
+        thread.start()
+        return handle
+
+    def _run(self, handle, fn, args, kwargs, cleanup):
+        state, result, exception = DONE, None, None
+        try:
+            handle.started_at = time.monotonic()
+            handle.state = RUNNING
+            result = fn(*args, **kwargs)
+            if handle.token.cancelled:
+                state = CANCELLED
+        except TaskCancelled:
+            state = CANCELLED
+        except BaseException as e:
+            # Delivered to done callbacks via handle.exception().
+            state, exception = FAILED, e
+        finally:
+            if cleanup is not None:
+                try:
+                    cleanup(handle)
+                except Exception as e:
+                    self._report(f"cleanup of '{handle.name}' failed", e)
+            with self._lock:
+                if handle.slot is not None and self._slots.get(handle.slot) is handle:
+                    del self._slots[handle.slot]
+                self._active.pop(handle.id, None)
+            handle._finish(state, result, exception)
+
+    def active(self, slot=None):
+        """Handle holding slot (or any active handles as a list when slot is None)."""
+        with self._lock:
+            if slot is not None:
+                return self._slots.get(slot)
+            return list(self._active.values())
+
+    def expected_free_in(self, slot):
+        """Seconds until slot is expected to be free: 0.0 when idle, None when the job has no estimate."""
+        handle = self.active(slot)
+        if handle is None:
+            return 0.0
+        if handle.expected_seconds is None:
+            return None
+        started = handle.started_at if handle.started_at is not None else time.monotonic()
+        return max(0.0, started + float(handle.expected_seconds) - time.monotonic())
+
+    def cancel_all(self, reason="shutdown"):
+        for handle in self.active():
+            handle.cancel(reason)
+
+    def shutdown(self, timeout=1.0):
+        """Cancel every task and wait up to timeout seconds in total for them to finish."""
+        self.cancel_all("shutdown")
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        for handle in self.active():
+            if not handle.wait(max(0.0, deadline - time.monotonic())):
+                break
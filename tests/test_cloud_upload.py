@@ -0,0 +1,176 @@
+"""CloudUploadWorker against a local stand-in HTTP server (retry, reject and dedupe paths).
+
+    python -m pytest tests
+"""
+
+import gzip
+import http.server
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import cloud_upload  # noqa: E402
+
+
+class StandInServer:
+    """Upload endpoint on 127.0.0.1 that answers with scripted statuses (then 200)."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []  # (headers, [archive member names])
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with tarfile.open(fileobj=io.BytesIO(gzip.decompress(body))) as tar:
+                    names = sorted(tar.getnames())
+                server.requests.append((dict(self.headers), names))
+                status = server.statuses.pop(0) if server.statuses else 200
+                reply = b"bad batch" if status == 400 else b"ok"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/upload"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class CloudUploadWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.queue_dir = tempfile.mkdtemp(prefix="eis_upload_test_")
+        self.addCleanup(shutil.rmtree, self.queue_dir, True)
+        self.log = []
+
+    def make_worker(self, server, **kwargs):
+        worker = cloud_upload.CloudUploadWorker(
+            self.queue_dir, server.url, min_file_age=0.0, backoff_base=0.01, log=self.log.append, **kwargs
+        )
+        self.addCleanup(worker.pool.close)
+        return worker
+
+    def make_server(self, statuses=()):
+        server = StandInServer(statuses)
+        self.addCleanup(server.close)
+        return server
+
+    def write(self, name, text):
+        cloud_upload.write_queue_file_atomic(self.queue_dir, name, lambda path: open(path, "w").write(text))
+
+    def queued(self):
+        return sorted(n for n in os.listdir(self.queue_dir) if n.endswith(".csv"))
+
+    def test_transient_failures_are_retried_with_the_same_batch_id(self):
+        server = self.make_server([503, 500])
+        self.write("run_a.csv", "f,z\n1,2\n")
+        worker = self.make_worker(server)
+
+        self.assertEqual(worker.drain_once(), 1)
+
+        self.assertEqual(len(server.requests), 3)
+        keys = {headers["Idempotency-Key"] for headers, _names in server.requests}
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(server.requests[-1][1], ["run_a.csv"])
+        self.assertEqual(self.queued(), [])
+        self.assertEqual(len(worker.manifest.uploaded), 1)
+
+    def test_exhausted_retries_keep_the_file_queued(self):
+        server = self.make_server([503, 503])
+        self.write("run_a.csv", "f,z\n1,2\n")
+        worker = self.make_worker(server, max_attempts=2)
+
+        self.assertEqual(worker.drain_once(), 0)
+        self.assertEqual(self.queued(), ["run_a.csv"])
+
+        self.assertEqual(worker.drain_once(), 1)
+        self.assertEqual(self.queued(), [])
+
+    def test_rejected_batch_is_not_retried_and_moves_aside(self):
+        server = self.make_server([400])
+        self.write("run_a.csv", "f,z\n1,2\n")
+        worker = self.make_worker(server)
+
+        self.assertEqual(worker.drain_once(), 0)
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.queued(), [])
+        self.assertEqual(os.listdir(worker.rejected_dir), ["run_a.csv"])
+        self.assertEqual(len(worker.manifest.rejected), 1)
+        self.assertEqual(worker.drain_once(), 0)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_identical_content_is_uploaded_once(self):
+        server = self.make_server()
+        self.write("run_a.csv", "same\n")
+        self.write("run_b.csv", "same\n")
+        self.write("run_c.csv", "other\n")
+        worker = self.make_worker(server)
+
+        self.assertEqual(worker.drain_once(), 2)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(server.requests[0][1], ["run_a.csv", "run_c.csv"])
+
+        # The duplicate copy and any later export of the same content are cleared, not sent.
+        self.write("run_d.csv", "same\n")
+        self.assertEqual(worker.drain_once(), 0)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.queued(), [])
+
+    def test_manifest_survives_a_restart(self):
+        server = self.make_server()
+        self.write("run_a.csv", "f,z\n1,2\n")
+        self.make_worker(server).drain_once()
+
+        self.write("run_a_again.csv", "f,z\n1,2\n")
+        self.assertEqual(self.make_worker(server).drain_once(), 0)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_pending_files_are_hashed_once(self):
+        server = self.make_server()
+        self.write("run_a.csv", "f,z\n1,2\n")
+        worker = self.make_worker(server)
+        calls = []
+        original = cloud_upload._file_sha256
+
+        def counting(path, *args):
+            calls.append(path)
+            return original(path, *args)
+
+        cloud_upload._file_sha256 = counting
+        self.addCleanup(setattr, cloud_upload, "_file_sha256", original)
+        worker.pending_files()
+        worker.pending_files()
+        self.assertEqual(len(calls), 1)
+
+        # A rewritten file is hashed again.
+        time.sleep(0.01)
+        self.write("run_a.csv", "f,z\n3,4\n")
+        worker.pending_files()
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
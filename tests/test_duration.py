@@ -0,0 +1,83 @@
+"""DurationEstimator's incremental fit: add_run/remove_run against a full rebuild.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+
+import duration  # noqa: E402
+
+
+def timed_run(run_id, profile, overhead, cycles, freq, rng):
+    point = overhead + cycles / freq
+    point[0] = 0.0
+    times = np.cumsum(point) + rng.normal(0.0, 0.05, freq.size)
+    return {"run_id": run_id, "profile": profile, "sweep": {"frequency": freq.tolist(), "time_s": times.tolist()}}
+
+
+class DurationEstimatorTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        recommended = np.logspace(5, -1, 31)
+        detailed = np.logspace(5, -2, 71)
+        self.history = [
+            timed_run("r1", "Recommended", 4.0, 2.0, recommended, rng),
+            timed_run("d1", "Detailed", 3.0, 1.0, detailed, rng),
+            timed_run("r2", "Recommended", 4.2, 1.8, recommended, rng),
+            {"run_id": "untimed", "profile": "Recommended", "sweep": {"frequency": recommended.tolist()}},
+            timed_run("r3", "Recommended", 3.8, 2.1, recommended, rng),
+        ]
+
+    def assert_same_models(self, estimator, expected):
+        for profile in ("Recommended", "Detailed", "Rapid", None):
+            got, want = estimator.model(profile), expected.model(profile)
+            self.assertAlmostEqual(got.overhead, want.overhead, places=9)
+            self.assertAlmostEqual(got.cycles, want.cycles, places=9)
+            self.assertEqual(got.runs, want.runs)
+
+    def test_fit_recovers_the_generating_model(self):
+        estimator = duration.DurationEstimator()
+        estimator.rebuild(self.history)
+        model = estimator.model("Detailed")
+        self.assertEqual(model.runs, 1)
+        self.assertAlmostEqual(model.overhead, 3.0, delta=0.05)
+        self.assertAlmostEqual(model.cycles, 1.0, delta=0.05)
+        self.assertEqual(estimator.model("Recommended").runs, 3)
+        self.assertEqual(estimator.model("Rapid").runs, 4)  # falls back to all runs
+
+    def test_add_run_matches_rebuild(self):
+        incremental = duration.DurationEstimator()
+        for count, entry in enumerate(self.history, 1):
+            self.assertEqual(incremental.add_run(entry), entry["run_id"] != "untimed")
+            rebuilt = duration.DurationEstimator()
+            rebuilt.rebuild(self.history[:count])
+            self.assert_same_models(incremental, rebuilt)
+
+    def test_remove_run_matches_rebuild_without_it(self):
+        estimator = duration.DurationEstimator()
+        estimator.rebuild(self.history)
+        for count in range(1, len(self.history) + 1):
+            estimator.remove_run(self.history[count - 1])
+            rebuilt = duration.DurationEstimator()
+            rebuilt.rebuild(self.history[count:])
+            self.assert_same_models(estimator, rebuilt)
+
+    def test_removing_every_run_falls_back_to_the_defaults(self):
+        estimator = duration.DurationEstimator()
+        estimator.rebuild(self.history[1:2])
+        estimator.remove_run(self.history[1])
+        model = estimator.model("Detailed")
+        self.assertEqual((model.overhead, model.cycles, model.runs), (duration.DEFAULT_OVERHEAD_S, duration.DEFAULT_CYCLES, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
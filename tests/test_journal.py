@@ -0,0 +1,108 @@
+"""Sweep journal read-back (torn last line, header notes) and ResumePlan bounds.
+
+    python -m pytest tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+
+import journal  # noqa: E402
+
+METHOD = {"max_frequency": 1e4, "min_frequency": 1e-1, "n_frequencies": 11, "ac_potential": 0.05}
+GRID = np.logspace(4, -1, 11)
+
+
+class ReadJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def write(self, lines, tail=""):
+        path = os.path.join(self.dir, "run_a" + journal.JOURNAL_SUFFIX)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(line) + "\n" for line in lines) + tail)
+        return path
+
+    def header(self, **fields):
+        return dict({"journal": journal.JOURNAL_VERSION, "run_id": "run_a", "started": "t0", "method": METHOD}, **fields)
+
+    def points(self, count, start=0):
+        return [{"i": i, "f": GRID[i], "re": 100.0 + i, "im": -10.0 - i, "t": float(i)} for i in range(start, start + count)]
+
+    def test_torn_last_line_is_ignored(self):
+        path = self.write([self.header()] + self.points(4), tail='{"i": 4, "f": 1.0, "re": 1')
+        sweep = journal.read_journal(path)
+        self.assertEqual(len(sweep), 4)
+        np.testing.assert_allclose(sweep.freq, GRID[:4])
+        np.testing.assert_allclose(sweep.z_real, [100.0, 101.0, 102.0, 103.0])
+
+    def test_notes_update_the_header_and_later_rows_replace_earlier_ones(self):
+        replaced = {"i": 1, "f": GRID[1], "re": 5.0, "im": -5.0, "t": 9.0}
+        path = self.write([self.header()] + self.points(3) + [{"note": {"lead_in": 2}}, replaced])
+        sweep = journal.read_journal(path)
+        self.assertEqual(sweep.lead_in, 2)
+        self.assertEqual(len(sweep), 3)
+        self.assertEqual(sweep.z_real[1], 5.0)
+
+    def test_unreadable_header_is_set_aside(self):
+        self.write([], tail="{not json\n")
+        self.assertEqual(journal.recover_journals(self.dir), [])
+        self.assertEqual(os.listdir(self.dir), ["run_a" + journal.JOURNAL_SUFFIX + ".corrupt"])
+
+
+class ResumePlanTest(unittest.TestCase):
+    def sweep(self, count, lead_in=0, estimated=()):
+        rows = {i: (GRID[i], 100.0, -10.0, float(i), i in estimated) for i in range(count)}
+        return journal.RecoveredSweep("unused", {"run_id": "run_a", "method": METHOD, "lead_in": lead_in}, rows)
+
+    def test_scan_covers_the_rest_of_the_grid(self):
+        plan = self.sweep(6).resume_plan()
+        self.assertEqual(plan.first_missing, 6)
+        self.assertEqual(plan.offset, 6)
+        self.assertEqual(plan.remaining, 5)
+        self.assertAlmostEqual(plan.max_frequency, GRID[6])
+        self.assertAlmostEqual(plan.min_frequency, GRID[-1])
+
+    def test_scan_starts_lead_in_points_above_the_first_missing_frequency(self):
+        plan = self.sweep(6, lead_in=3).resume_plan()
+        self.assertEqual(plan.offset, 3)
+        self.assertEqual(plan.scan_points, 8)
+        self.assertAlmostEqual(plan.max_frequency, GRID[3])
+
+    def test_lead_in_never_moves_the_scan_above_the_grid(self):
+        plan = self.sweep(2, lead_in=5).resume_plan()
+        self.assertEqual(plan.offset, 0)
+        self.assertAlmostEqual(plan.max_frequency, GRID[0])
+
+    def test_scan_keeps_at_least_two_points(self):
+        plan = self.sweep(10).resume_plan()
+        self.assertEqual(plan.scan_points, 2)
+        self.assertAlmostEqual(plan.max_frequency, GRID[-2])
+        self.assertEqual(plan.remaining, 1)
+
+    def test_claim_accepts_each_missing_grid_point_once(self):
+        plan = self.sweep(6).resume_plan()
+        self.assertFalse(plan.claim(GRID[2]))
+        self.assertTrue(plan.claim(GRID[7] * 1.01))
+        self.assertFalse(plan.claim(GRID[7]))
+        self.assertFalse(plan.claim(GRID[-1] / 10))  # below the grid
+        self.assertEqual(plan.remaining, 4)
+
+    def test_nothing_to_resume(self):
+        self.assertIsNone(self.sweep(11).resume_plan())
+        self.assertIsNone(self.sweep(3, estimated={0, 1, 2}).resume_plan())
+
+
+if __name__ == "__main__":
+    unittest.main()
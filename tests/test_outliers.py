@@ -0,0 +1,71 @@
+"""remeasure_groups scan planning: grouping, lead-in offset and clamping to the sweep's range.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+
+from outliers import remeasure_groups  # noqa: E402
+
+GRID = np.logspace(5, -1, 31)  # descending, like the sweep
+
+
+class RemeasureGroupsTest(unittest.TestCase):
+    def test_adjacent_points_share_one_scan(self):
+        plans = remeasure_groups(GRID, [GRID[10], GRID[11], GRID[20]])
+        self.assertEqual(len(plans), 2)
+        top, bottom, n, targets = plans[0]
+        self.assertAlmostEqual(top, GRID[9])
+        self.assertAlmostEqual(bottom, GRID[11])
+        self.assertEqual(n, 3)
+        np.testing.assert_allclose(targets, GRID[10:12])
+        np.testing.assert_allclose(plans[1][3], [GRID[20]])
+
+    def test_scan_starts_lead_in_plus_one_steps_above_its_first_point(self):
+        (top, bottom, n, targets), = remeasure_groups(GRID, [GRID[15]], lead_in=3)
+        self.assertAlmostEqual(top, GRID[11])
+        self.assertAlmostEqual(bottom, GRID[15])
+        self.assertEqual(n, 5)
+        np.testing.assert_allclose(targets, [GRID[15]])
+
+    def test_points_in_the_lead_in_at_the_top_are_left_out(self):
+        plans = remeasure_groups(GRID, [GRID[0], GRID[1], GRID[4]], lead_in=3)
+        self.assertEqual(len(plans), 1)
+        top, bottom, n, targets = plans[0]
+        self.assertAlmostEqual(top, GRID[0])
+        np.testing.assert_allclose(targets, [GRID[4]])
+        self.assertEqual(n, 5)
+        self.assertEqual(remeasure_groups(GRID, [GRID[0], GRID[1]], lead_in=3), [])
+
+    def test_scans_stay_inside_the_sweep(self):
+        for flagged in ([GRID[0]], [GRID[-1]], [GRID[-2], GRID[-1]]):
+            for top, bottom, n, targets in remeasure_groups(GRID, flagged):
+                self.assertLessEqual(top, GRID[0])
+                self.assertGreaterEqual(bottom, GRID[-1])
+                self.assertGreaterEqual(n, 2)
+                self.assertTrue(targets)
+        (top, bottom, n, _), = remeasure_groups(GRID, [GRID[0]])
+        self.assertAlmostEqual(top, GRID[0])
+        self.assertAlmostEqual(bottom, GRID[1])
+        self.assertEqual(n, 2)
+
+    def test_off_grid_flags_snap_to_the_nearest_frequency(self):
+        (_, _, _, targets), = remeasure_groups(GRID, [GRID[12] * 1.05])
+        np.testing.assert_allclose(targets, [GRID[12]])
+
+    def test_nothing_to_plan(self):
+        self.assertEqual(remeasure_groups(GRID, []), [])
+        self.assertEqual(remeasure_groups(GRID[:1], [GRID[0]]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""GridResampler against np.interp, and its weight cache.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+
+from resample import GridResampler, InterpWeights, canonical_log_freq  # noqa: E402
+
+
+def reference(target, source, values):
+    """np.interp with NaN outside the source span (GridResampler's contract)."""
+    out = np.interp(target, source, values)
+    out[(target < source[0]) | (target > source[-1])] = np.nan
+    return out
+
+
+class GridResamplerTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.resampler = GridResampler()
+
+    def test_matches_np_interp_inside_the_source_span(self):
+        target = self.resampler.target_log_freq
+        for source in (np.linspace(-1, 5, 31), np.sort(self.rng.uniform(-3, 6, 40)), np.linspace(0.05, 4.95, 9)):
+            values = self.rng.normal(size=source.size)
+            np.testing.assert_allclose(self.resampler.interp(target, source, values), reference(target, source, values))
+
+    def test_block_of_runs_matches_row_by_row(self):
+        source = np.linspace(-1, 5, 31)
+        block = self.rng.normal(size=(6, source.size))
+        out = self.resampler.interp(self.resampler.target_log_freq, source, block)
+        for row, values in zip(out, block):
+            np.testing.assert_allclose(row, reference(self.resampler.target_log_freq, source, values))
+
+    def test_resample_accepts_descending_sweeps_in_hz(self):
+        freq = np.logspace(5, -1, 31)
+        values = np.log10(freq) * 2.0
+        expected = self.resampler.target_log_freq * 2.0
+        inside = (self.resampler.target_log_freq >= -1) & (self.resampler.target_log_freq <= 5)
+        out = self.resampler.resample(freq, values)
+        np.testing.assert_allclose(out[inside], expected[inside])
+        self.assertTrue(np.isnan(out[~inside]).all())
+
+    def test_weights_are_cached_per_grid_pair(self):
+        source = np.linspace(-1, 5, 31)
+        first = self.resampler.weights(source)
+        self.assertIs(self.resampler.weights(source + 1e-12), first)
+        self.assertEqual((self.resampler.hits, self.resampler.misses), (1, 1))
+        small = GridResampler(max_cached=1)
+        small.weights(source)
+        small.weights(source[1:])
+        small.weights(source)
+        self.assertEqual(small.misses, 3)
+
+    def test_one_point_source_gives_nan(self):
+        target = canonical_log_freq()
+        self.assertTrue(np.isnan(self.resampler.interp(target, np.array([0.0]), np.array([1.0]))).all())
+        out = InterpWeights([], target).apply(np.zeros((2, 0)))
+        self.assertEqual(out.shape, (2, target.size))
+        self.assertTrue(np.isnan(out).all())
+
+
+if __name__ == "__main__":
+    unittest.main()